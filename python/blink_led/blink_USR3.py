@@ -36,7 +36,9 @@ Blinking Button that will
   - Blink the USR3 LED at 5 Hz
 
 Operations:
-  - 
+  - The blink is handed to the kernel LED "timer" trigger (see led.py), so 
+    the LED blinks with no Python wakeups; the script sleeps until Ctrl-C
+  - If the kernel LED is not available, the LED blinks from a software thread
 
 Error conditions:
   - 
@@ -44,16 +46,25 @@ Error conditions:
 --------------------------------------------------------------------------
 """
 
-import Adafruit_BBIO.GPIO as GPIO
-import time
+import sys
+import signal
+
+# Update path to correct directory for LED class     
+sys.path.append("/var/lib/cloud9/ENGI301/python/led")
+
+import led as LED
+
+usr3 = LED.LED("USR3")
+
+# On for 1/5 s, off for 1/5 s (as with the original GPIO loop)
+if usr3.blink(1/5):
+    print("Blinking USR3 in the kernel (Ctrl-C to exit)")
+else:
+    print("Blinking USR3 in software (Ctrl-C to exit)")
 
-for i in range(5):
-    GPIO.setup("USR%d" %3, GPIO.OUT)
+try:
+    signal.pause()
+except KeyboardInterrupt:
+    pass
 
-while True:
-    for i in range(1):
-        GPIO.output("USR%d" %3, GPIO.HIGH)
-        time.sleep(1/5)
-    for i in range(1):
-        GPIO.output("USR%d" %3, GPIO.LOW)
-        time.sleep(1/5)
+usr3.cleanup()
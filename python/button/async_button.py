@@ -0,0 +1,393 @@
+"""
+--------------------------------------------------------------------------
+Asyncio Button
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Asyncio Button
+
+  Asyncio front end for buttons.  The button's edge source (see 
+edge_source.py) is added to the event loop as a reader, so one event loop
+can wait on many buttons and timers without any threads:
+
+    async def main():
+        button = AsyncButton("P2_2")
+        
+        event = await button.press()
+        
+        async for event in button.events():
+            print(event.pressed, event.duration)
+
+  Each press / release produces a ButtonEvent(pressed, timestamp_ns, 
+duration), where timestamp_ns is the time.monotonic_ns() of the edge and 
+duration is the press duration in seconds (release events only).
+
+Software API:
+
+  AsyncButton(pin, active_low=True, debounce=None, edge_source=None, loop=None)
+    - Provide pin that the button monitors
+    - Optionally provide the debouncer (see debounce.py)
+    - Optionally provide the edge source (by default a GPIOEdgeSource is 
+      created for the pin)
+    - Create the button in a coroutine or provide the event loop
+    
+    await press()
+      - Wait for the next press; return the ButtonEvent
+    
+    await release()
+      - Wait for the next release; return the ButtonEvent
+    
+    async for event in events(maxsize=16):
+      - Iterate over all presses / releases.  If the consumer falls behind 
+        by more than maxsize events, the oldest events are dropped.
+    
+    is_pressed()
+      - Return the (debounced) state of the button
+    
+    close()
+      - Remove the button from the event loop; stop the edge source (if it
+        was created by the button)
+
+"""
+import time
+import select
+import asyncio
+import collections
+
+import edge_source as EDGE
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH          = EDGE.HIGH
+LOW           = EDGE.LOW
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+ButtonEvent = collections.namedtuple("ButtonEvent", ["pressed", "timestamp_ns", "duration"])
+
+
+class AsyncButton():
+    """ Asyncio Button Class """
+    pin             = None
+    
+    unpressed_value = None
+    pressed_value   = None
+    
+    loop            = None
+    edge_source     = None
+    own_edge_source = None
+    epoll           = None
+    debouncer       = None
+    timer           = None
+    raw_level       = None
+    level           = None
+    press_time_ns   = None
+    waiters         = None
+    queues          = None
+    
+    def __init__(self, pin=None, active_low=True, debounce=None, edge_source=None, loop=None):
+        """ Initialize variables and add the button to the event loop """
+        if (pin == None):
+            raise ValueError("Pin not provided for AsyncButton()")
+        else:
+            self.pin = pin
+        
+        if active_low:
+            self.unpressed_value = HIGH
+            self.pressed_value   = LOW
+        else:
+            self.unpressed_value = LOW
+            self.pressed_value   = HIGH
+        
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        
+        self.loop            = loop
+        self.debouncer       = debounce
+        self.edge_source     = edge_source
+        self.own_edge_source = False
+        self.waiters         = []
+        self.queues          = []
+        
+        if edge_source is None:
+            self.edge_source     = EDGE.GPIOEdgeSource(self.pin)
+            self.own_edge_source = True
+        
+        self._setup()
+    
+    # End def
+
+
+    def _setup(self):
+        """ Add the edge source to the event loop """
+        self.raw_level = self.edge_source.level()
+        self.level     = self.raw_level
+        
+        if self.debouncer is not None:
+            self.debouncer.reset(self.level)
+        
+        # The event loop only waits for readable file descriptors, so the 
+        # edge source is wrapped in an epoll object that becomes readable 
+        # for any of its events (e.g. POLLPRI for SysfsEdgeSource)
+        self.epoll = select.epoll()
+        self.epoll.register(self.edge_source.fileno(), self.edge_source.poll_mask)
+        
+        self.loop.add_reader(self.epoll.fileno(), self._on_edges)
+
+    # End def
+
+
+    def _on_edges(self):
+        """ Process the edges from the edge source """
+        for (level, timestamp_ns) in self.edge_source.read_edges():
+            self._process(level, timestamp_ns)
+        
+        self._schedule_debounce()
+
+    # End def
+
+
+    def _on_timer(self):
+        """ Finish a pending debounce """
+        self.timer = None
+        
+        self._process(self.raw_level, time.monotonic_ns())
+        self._schedule_debounce()
+
+    # End def
+
+
+    def _schedule_debounce(self):
+        """ Wake up when a pending debounce can finish """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        
+        if self.debouncer is None:
+            return
+        
+        next_ns = self.debouncer.next_update_ns()
+        
+        if next_ns is not None:
+            delay      = max(0.0, (next_ns - time.monotonic_ns()) / 1e9)
+            self.timer = self.loop.call_later(delay, self._on_timer)
+
+    # End def
+
+
+    def _process(self, raw_level, now_ns):
+        """ Update the button with a raw level; publish an event if the 
+           (debounced) level changed
+        """
+        self.raw_level = raw_level
+        
+        if self.debouncer is None:
+            if (raw_level == self.level):
+                return
+            
+            self.level = raw_level
+            change_ns  = now_ns
+        elif self.debouncer.update(raw_level, now_ns):
+            self.level = self.debouncer.level
+            change_ns  = self.debouncer.change_ns
+        else:
+            return
+        
+        if (self.level == self.pressed_value):
+            self.press_time_ns = change_ns
+            event              = ButtonEvent(True, change_ns, None)
+        elif self.press_time_ns is not None:
+            event              = ButtonEvent(False, change_ns, (change_ns - self.press_time_ns) / 1e9)
+        else:
+            event              = ButtonEvent(False, change_ns, None)
+        
+        self._publish(event)
+
+    # End def
+
+
+    def _publish(self, event):
+        """ Wake up the waiters for the event; add it to the event queues """
+        waiters = self.waiters
+        
+        self.waiters = []
+        
+        for (pressed, future) in waiters:
+            if future.done():
+                continue
+            
+            if (pressed == event.pressed):
+                future.set_result(event)
+            else:
+                self.waiters.append((pressed, future))
+        
+        # Full queues drop their oldest event
+        for (queue, ready) in self.queues:
+            queue.append(event)
+            ready.set()
+
+    # End def
+
+
+    async def _wait_for(self, pressed):
+        """ Wait for the next press (pressed=True) or release """
+        future = self.loop.create_future()
+        
+        self.waiters.append((pressed, future))
+        
+        return await future
+
+    # End def
+
+
+    async def press(self):
+        """ Wait for the next press; return the ButtonEvent """
+        return await self._wait_for(True)
+
+    # End def
+
+
+    async def release(self):
+        """ Wait for the next release; return the ButtonEvent """
+        return await self._wait_for(False)
+
+    # End def
+
+
+    async def events(self, maxsize=16):
+        """ Iterate over all presses / releases """
+        queue = collections.deque(maxlen=maxsize)
+        ready = asyncio.Event()
+        
+        self.queues.append((queue, ready))
+        
+        try:
+            while True:
+                while not queue:
+                    ready.clear()
+                    await ready.wait()
+                
+                yield queue.popleft()
+        finally:
+            self.queues.remove((queue, ready))
+
+    # End def
+
+
+    def is_pressed(self):
+        """ Is the Button pressed (debounced)?
+        
+           Returns:  True  - Button is pressed
+                     False - Button is not pressed
+        """
+        return self.level == self.pressed_value
+
+    # End def
+
+
+    def close(self):
+        """ Remove the button from the event loop """
+        if self.epoll is None:
+            return
+        
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        
+        self.loop.remove_reader(self.epoll.fileno())
+        self.epoll.close()
+        self.epoll = None
+        
+        for (pressed, future) in self.waiters:
+            future.cancel()
+        
+        self.waiters = []
+        
+        if self.own_edge_source:
+            self.edge_source.close()
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Asyncio Button Test")
+    
+    async def watch(name, button):
+        async for event in button.events():
+            if event.pressed:
+                print("{0} pressed".format(name))
+            else:
+                print("{0} released after {1:.3f} seconds".format(name, event.duration))
+    # End def
+    
+    async def tick():
+        while True:
+            await asyncio.sleep(5)
+            print("5 seconds")
+    # End def
+    
+    async def main():
+        button_0 = AsyncButton("P2_2")
+        button_1 = AsyncButton("P2_4")
+        
+        print("Press button 0 to start")
+        await button_0.press()
+        
+        print("Watching both buttons (Ctrl-C to exit)")
+        await asyncio.gather(watch("Button 0", button_0), 
+                             watch("Button 1", button_1), tick())
+    # End def
+    
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    
+    print("Test Complete")
+
@@ -44,11 +44,49 @@ button is not pressed) and will be connected to power when the button is pressed
   To select the pull up configuration, press_low=True.  To select the pull down
 configuration, press_low=False.
 
+  By default the button samples the pin every "sleep_time" seconds.  In 
+interrupt mode (interrupt=True or an edge_source is provided), the button 
+blocks on kernel edge events instead (see edge_source.py) and press 
+durations are timed from the edge timestamps, so short taps are not missed.
+The callback functions work in both modes; in interrupt mode the pressed /
+unpressed callbacks are still executed every "sleep_time", but the wait 
+ends as soon as an edge arrives.  See button_benchmark.py for a comparison
+of the two modes.
+
+  A debouncer (see debounce.py) can be provided so that contact bounce does
+not produce extra presses; this also allows a shorter "sleep_time" without
+false presses.  All times are measured with time.monotonic_ns().
+
+  Callbacks normally run in the sampling loop, so a slow callback makes the
+time between samples longer than "sleep_time".  If a callback is set with a
+policy (see callback_executor.py), it runs on a thread pool instead and the
+sampling loop only starts it; the callback value is the value of the last 
+call that finished.  wait_for_press() waits for all callbacks to finish 
+before it returns.  get_sample_stats() reports the measured sample period.
+
+  The last "history_size" presses (start time, duration and the number of 
+bounces the debouncer rejected) are kept in a press history (see 
+press_history.py) for tuning debounce and reset times.
+
+  By default the button uses Adafruit_BBIO.GPIO.  Any object with the same 
+setup() / input() functions can be provided as the "backend" instead, e.g.
+MmapGPIO from gpio_mmap.py, which reads the GPIO registers directly.
+
 
 Software API:
 
-  Button(pin, press_low)
+  Button(pin, press_low=True, sleep_time=0.1, interrupt=False, edge_source=None, debounce=None, executor=None,
+         history_size=256, backend=None)
     - Provide pin that the button monitors
+    - If interrupt is True, a GPIOEdgeSource is created for the pin
+    - Optionally provide the edge source (e.g. SysfsEdgeSource or 
+      FakeEdgeSource) to use for interrupt mode
+    - Optionally provide the debouncer (e.g. TimeWindowDebouncer()) used to 
+      decide when the button is pressed / released
+    - Optionally provide the CallbackExecutor for callbacks set with a 
+      policy (by default one is created when needed)
+    - The press history keeps the last history_size presses
+    - Optionally provide the GPIO backend (default Adafruit_BBIO.GPIO)
     
     wait_for_press()
       - Wait for the button to be pressed 
@@ -60,24 +98,48 @@ Software API:
     
     get_last_press_duration()
       - Return the duration the button was last pressed
+    
+    wait_for_edge(timeout=None)
+      - Wait for the button to be pressed or released
+      - Returns (pressed, timestamp_ns), or None on timeout
+      - Function consumes time
+    
+    get_last_press_edges()
+      - Return the (press, release) time.monotonic_ns() timestamps of the 
+        last press
+    
+    get_press_history()
+      - Return the PressHistory of the button (e.g. get_stats(), to_csv())
+    
+    get_sample_stats()
+      - Return a dictionary with the number of sample periods and the mean,
+        maximum and standard deviation (jitter) of the sample period in 
+        seconds, measured while waiting in wait_for_press() / 
+        wait_for_edge() in polling mode
+    
+    reset_sample_stats()
+      - Reset the sample period statistics
 
     cleanup()
-      - Clean up HW
+      - Clean up HW (stops the edge source if it was created by the button)
       
     Callback Functions:
       These functions will be called at the various times during a button 
       press cycle.  There is also a corresponding function to get the value
       from each of these callback functions in case they return something.
     
-      - set_pressed_callback(function)
+      - set_pressed_callback(function, policy=None)
         - Excuted every "sleep_time" while the button is pressed
-      - set_unpressed_callback(function)
+      - set_unpressed_callback(function, policy=None)
         - Excuted every "sleep_time" while the button is unpressed
-      - set_on_press_callback(function)
+      - set_on_press_callback(function, policy=None)
         - Executed once when the button is pressed
-      - set_on_release_callback(function)
+      - set_on_release_callback(function, policy=None)
         - Executed once when the button is released
       
+      If a policy is provided (DROP, QUEUE or LATEST from 
+      callback_executor.py), the function runs on the callback executor.
+      
       - get_pressed_callback_value()
       - get_unpressed_callback_value()
       - get_on_press_callback_value()
@@ -86,9 +148,15 @@ Software API:
 
 """
 import time
+import collections
 
 import Adafruit_BBIO.GPIO as GPIO
 
+import edge_source       as EDGE
+import debounce          as DEBOUNCE
+import callback_executor as CALLBACK
+import press_history     as PRESS_HISTORY
+
 # ------------------------------------------------------------------------
 # Constants
 # ------------------------------------------------------------------------
@@ -115,6 +183,27 @@ class Button():
     
     sleep_time                    = None
     press_duration                = None
+    press_time_ns                 = None
+    release_time_ns               = None
+    history                       = None
+    last_bounces                  = None
+    gpio                          = None
+
+    edge_source                   = None
+    own_edge_source               = None
+    edges                         = None
+    raw_level                     = None
+    level                         = None
+    edge_time_ns                  = None
+    debouncer                     = None
+    
+    executor                      = None
+    own_executor                  = None
+    last_sample_ns                = None
+    sample_count                  = None
+    sample_sum                    = None
+    sample_sum_sq                 = None
+    sample_max                    = None
 
     pressed_callback              = None
     pressed_callback_value        = None
@@ -126,7 +215,8 @@ class Button():
     on_release_callback_value     = None
     
     
-    def __init__(self, pin=None, press_low=True, sleep_time=0.1):
+    def __init__(self, pin=None, press_low=True, sleep_time=0.1, interrupt=False, edge_source=None, debounce=None, executor=None,
+                 history_size=256, backend=None):
         """ Initialize variables and set up the button """
         if (pin == None):
             raise ValueError("Pin not provided for Button()")
@@ -145,6 +235,29 @@ class Button():
         # By default sleep time is "0.1" seconds
         self.sleep_time      = sleep_time
         self.press_duration  = 0.0        
+        self.press_time_ns   = None
+        self.release_time_ns = None
+        self.history         = PRESS_HISTORY.PressHistory(history_size)
+        self.last_bounces    = 0
+        
+        if backend is None:
+            self.gpio = GPIO
+        else:
+            self.gpio = backend
+        
+        # Interrupt mode:  edges not yet processed by the button
+        self.edge_source     = edge_source
+        self.own_edge_source = False
+        self.edges           = collections.deque()
+        self.debouncer       = debounce
+        self.executor        = executor
+        self.own_executor    = False
+        
+        self.reset_sample_stats()
+        
+        if interrupt and (edge_source is None):
+            self.edge_source     = EDGE.GPIOEdgeSource(self.pin)
+            self.own_edge_source = True
 
         # Initialize the hardware components        
         self._setup()
@@ -157,7 +270,125 @@ class Button():
         # Initialize Button
         # HW#4 TODO: (one line of code)
         #   Remove "pass" and use the Adafruit_BBIO.GPIO library to set up the button
-        GPIO.setup(self.pin, GPIO.IN)
+        #   (in interrupt mode the edge source sets up the pin)
+        if self.edge_source is None:
+            self.gpio.setup(self.pin, self.gpio.IN)
+            self.raw_level = self.gpio.input(self.pin)
+        else:
+            self.raw_level = self.edge_source.level()
+        
+        self.level        = self.raw_level
+        self.edge_time_ns = time.monotonic_ns()
+        
+        if self.debouncer is not None:
+            self.debouncer.reset(self.level, self.edge_time_ns)
+
+    # End def
+
+
+    def _record_press(self, press_time_ns, release_time_ns):
+        """ Add a press to the press history; the bounces are the raw edges
+           the debouncer rejected since the last press was recorded
+        """
+        bounces = 0
+        
+        if self.debouncer is not None:
+            bounces           = self.debouncer.get_bounces() - self.last_bounces
+            self.last_bounces = self.debouncer.get_bounces()
+        
+        self.history.record(press_time_ns, release_time_ns - press_time_ns, bounces)
+
+    # End def
+
+
+    def _read_level(self):
+        """ Return the (debounced) input level; edge_time_ns is the time 
+           the level last changed.
+        
+           In interrupt mode, the edges are processed one at a time so a 
+           press and release that both happened since the last call are 
+           each seen.
+        """
+        now_ns = time.monotonic_ns()
+        
+        if self.edge_source is None:
+            self.raw_level = self.gpio.input(self.pin)
+            self._record_sample(now_ns)
+        else:
+            if not self.edges:
+                self.edges.extend(self.edge_source.read_edges())
+            
+            if self.edges:
+                (self.raw_level, now_ns) = self.edges.popleft()
+        
+        if self.debouncer is None:
+            if (self.raw_level != self.level):
+                self.level        = self.raw_level
+                self.edge_time_ns = now_ns
+        elif self.debouncer.update(self.raw_level, now_ns):
+            self.level        = self.debouncer.level
+            self.edge_time_ns = self.debouncer.change_ns
+        
+        return self.level
+
+    # End def
+
+
+    def _record_sample(self, now_ns):
+        """ Record the time since the last sample """
+        if self.last_sample_ns is not None:
+            period = (now_ns - self.last_sample_ns) / 1e9
+            
+            self.sample_count  += 1
+            self.sample_sum    += period
+            self.sample_sum_sq += period * period
+            self.sample_max     = max(self.sample_max, period)
+        
+        self.last_sample_ns = now_ns
+
+    # End def
+
+
+    def _wait(self, callback, deadline=None):
+        """ Wait before reading the input level again.  In interrupt mode, 
+           wait for the next edge (at most "sleep_time" if there is a 
+           callback to execute).  Never wait past the deadline 
+           (time.monotonic()), if provided.
+        """
+        if deadline is None:
+            remaining = None
+        else:
+            remaining = max(0.0, deadline - time.monotonic())
+        
+        if self.edge_source is None:
+            if (remaining is None) or (remaining > self.sleep_time):
+                time.sleep(self.sleep_time)
+            else:
+                time.sleep(remaining)
+            return
+        
+        if self.edges:
+            # Edges are waiting to be processed
+            return
+        
+        if callback is None:
+            timeout = remaining
+        elif (remaining is None) or (remaining > self.sleep_time):
+            timeout = self.sleep_time
+        else:
+            timeout = remaining
+        
+        # Wake up to finish a pending debounce even if no edge arrives
+        if self.debouncer is not None:
+            next_ns = self.debouncer.next_update_ns()
+            
+            if next_ns is not None:
+                remaining = max(0.0, (next_ns - time.monotonic_ns()) / 1e9)
+                
+                if (timeout is None) or (remaining < timeout):
+                    timeout = remaining
+        
+        self.edge_source.wait(timeout)
 
     # End def
 
@@ -171,7 +402,10 @@ class Button():
         # HW#4 TODO: (one line of code)
         #   Remove "pass" and return the comparison of input value of the GPIO pin of 
         #   the buton (i.e. self.pin) to the "pressed value" of the class 
-        return GPIO.input(self.pin)==self.pressed_value
+        if self.edge_source is not None:
+            return self.edge_source.level()==self.pressed_value
+        
+        return self.gpio.input(self.pin)==self.pressed_value
 
     # End def
 
@@ -188,7 +422,7 @@ class Button():
            Arguments:  None
            Returns:    None
         """
-        button_press_time = None
+        self.last_sample_ns = None
         
         # Wait for button press
         #   Execute the unpressed callback function based on the sleep time
@@ -199,15 +433,15 @@ class Button():
         #   of the class (i.e. we are executing the while loop while the 
         #   button is not being pressed)
         #
-        while(GPIO.input(self.pin)==self.unpressed_value):
+        while(self._read_level()==self.unpressed_value):
         
             if self.unpressed_callback is not None:
                 self.unpressed_callback_value = self.unpressed_callback()
             
-            time.sleep(self.sleep_time)
+            self._wait(self.unpressed_callback)
             
         # Record time
-        button_press_time = time.time()
+        self.press_time_ns = self.edge_time_ns
         
         # Executed the on press callback function
         if self.on_press_callback is not None:
@@ -222,20 +456,89 @@ class Button():
         #   of the class (i.e. we are executing the while loop while the 
         #   button is being pressed)
         #
-        while(GPIO.input(self.pin)==self.pressed_value):
+        while(self._read_level()==self.pressed_value):
         
             if self.pressed_callback is not None:
                 self.pressed_callback_value = self.pressed_callback()
                 
-            time.sleep(self.sleep_time)
+            self._wait(self.pressed_callback)
         
         # Record the press duration
-        self.press_duration = time.time() - button_press_time
+        self.release_time_ns = self.edge_time_ns
+        self.press_duration  = (self.release_time_ns - self.press_time_ns) / 1e9
+        
+        self._record_press(self.press_time_ns, self.release_time_ns)
 
         # Executed the on release callback function
         if self.on_release_callback is not None:
             self.on_release_callback_value = self.on_release_callback()        
         
+        # Wait for callbacks on the executor to finish
+        self._drain_callbacks()
+        
+    # End def
+
+
+    def _drain_callbacks(self):
+        """ Wait for the callbacks on the executor; update their values """
+        if self.executor is None:
+            return
+        
+        self.executor.drain()
+        
+        if isinstance(self.pressed_callback, CALLBACK.DispatchedCallback):
+            self.pressed_callback_value = self.pressed_callback.value
+        
+        if isinstance(self.unpressed_callback, CALLBACK.DispatchedCallback):
+            self.unpressed_callback_value = self.unpressed_callback.value
+        
+        if isinstance(self.on_press_callback, CALLBACK.DispatchedCallback):
+            self.on_press_callback_value = self.on_press_callback.value
+        
+        if isinstance(self.on_release_callback, CALLBACK.DispatchedCallback):
+            self.on_release_callback_value = self.on_release_callback.value
+
+    # End def
+
+    
+    def wait_for_edge(self, timeout=None):
+        """ Wait for the button to be pressed or released (timeout in 
+           seconds; None waits forever).  A press or release that happened
+           since the last call is returned right away.
+           
+           Returns:  (pressed, timestamp_ns) - pressed is True for a press and
+                                               False for a release
+                     None                    - Timeout
+        """
+        if timeout is None:
+            deadline = None
+        else:
+            deadline = time.monotonic() + timeout
+        
+        level               = self.level
+        self.last_sample_ns = None
+        
+        while(self._read_level()==level):
+            if (deadline is not None) and (time.monotonic() >= deadline):
+                return None
+            
+            self._wait(None, deadline)
+        
+        # Record the press time / duration
+        if (self.level==self.pressed_value):
+            self.press_time_ns   = self.edge_time_ns
+            
+            return (True, self.edge_time_ns)
+        
+        self.release_time_ns = self.edge_time_ns
+        
+        if self.press_time_ns is not None:
+            self.press_duration = (self.release_time_ns - self.press_time_ns) / 1e9
+            
+            self._record_press(self.press_time_ns, self.release_time_ns)
+        
+        return (False, self.edge_time_ns)
+    
     # End def
 
     
@@ -246,10 +549,69 @@ class Button():
     # End def
     
     
+    def get_last_press_edges(self):
+        """ Return the (press, release) timestamps of the last press """
+        return (self.press_time_ns, self.release_time_ns)
+    
+    # End def
+    
+    
+    def get_press_history(self):
+        """ Return the press history """
+        return self.history
+    
+    # End def
+    
+    
+    def get_sample_stats(self):
+        """ Return the sample period statistics (in seconds) """
+        if (self.sample_count == 0):
+            return {"samples" : 0, "mean_period" : None, "max_period" : None, "jitter" : None}
+        
+        mean     = self.sample_sum / self.sample_count
+        variance = max(0.0, (self.sample_sum_sq / self.sample_count) - (mean * mean))
+        
+        return {"samples"     : self.sample_count,
+                "mean_period" : mean,
+                "max_period"  : self.sample_max,
+                "jitter"      : variance ** 0.5}
+    
+    # End def
+    
+    
+    def reset_sample_stats(self):
+        """ Reset the sample period statistics """
+        self.last_sample_ns = None
+        self.sample_count   = 0
+        self.sample_sum     = 0.0
+        self.sample_sum_sq  = 0.0
+        self.sample_max     = 0.0
+    
+    # End def
+    
+    
     def cleanup(self):
         """ Clean up the button hardware. """
-        # Nothing to do for GPIO
-        pass
+        # Nothing to do for GPIO; stop the edge source if created here
+        if self.own_edge_source:
+            self.edge_source.close()
+        
+        if self.own_executor:
+            self.executor.shutdown()
+    
+    # End def
+    
+    
+    def _dispatch(self, function, policy):
+        """ Return the callback to use for the function and policy """
+        if (function is None) or (policy is None):
+            return function
+        
+        if self.executor is None:
+            self.executor     = CALLBACK.CallbackExecutor()
+            self.own_executor = True
+        
+        return self.executor.wrap(function, policy)
     
     # End def
     
@@ -258,9 +620,9 @@ class Button():
     # Callback Functions
     # -----------------------------------------------------
 
-    def set_pressed_callback(self, function):
+    def set_pressed_callback(self, function, policy=None):
         """ Function excuted every "sleep_time" while the button is pressed """
-        self.pressed_callback = function
+        self.pressed_callback = self._dispatch(function, policy)
     
     # End def
 
@@ -270,9 +632,9 @@ class Button():
     
     # End def
     
-    def set_unpressed_callback(self, function):
+    def set_unpressed_callback(self, function, policy=None):
         """ Function excuted every "sleep_time" while the button is unpressed """
-        self.unpressed_callback = function
+        self.unpressed_callback = self._dispatch(function, policy)
     
     # End def
 
@@ -282,9 +644,9 @@ class Button():
     
     # End def
 
-    def set_on_press_callback(self, function):
+    def set_on_press_callback(self, function, policy=None):
         """ Function excuted once when the button is pressed """
-        self.on_press_callback = function
+        self.on_press_callback = self._dispatch(function, policy)
     
     # End def
 
@@ -294,9 +656,9 @@ class Button():
     
     # End def
 
-    def set_on_release_callback(self, function):
+    def set_on_release_callback(self, function, policy=None):
         """ Function excuted once when the button is released """
-        self.on_release_callback = function
+        self.on_release_callback = self._dispatch(function, policy)
     
     # End def
 
@@ -374,6 +736,12 @@ if __name__ == '__main__':
         print("    Button on press callback return value   = {0} ".format(button.get_on_press_callback_value()))
         print("    Button on release callback return value = {0} ".format(button.get_on_release_callback_value()))        
         
+        print("Waiting for button press in interrupt mode ...")
+        button = Button("P2_4", interrupt=True, debounce=DEBOUNCE.TimeWindowDebouncer())
+        button.wait_for_press()
+        print("    Button pressed for {0} seconds. ".format(button.get_last_press_duration()))
+        button.cleanup()
+        
     except KeyboardInterrupt:
         pass
 
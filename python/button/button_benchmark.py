@@ -0,0 +1,259 @@
+"""
+--------------------------------------------------------------------------
+Button Benchmark
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Benchmark
+
+  Compare the press latency and CPU use of the polling and interrupt modes
+of Button.wait_for_press().  For each mode, a driver thread waits idle_time
+seconds (plus a random part of a second so the presses do not line up with
+the polling period), presses the button for hold_time seconds and releases
+it.  The benchmark reports:
+  - latency:  time from the press to the on press callback (mean / max)
+  - cpu:      process CPU time per second of waiting
+  - wakeups:  voluntary context switches per second of waiting
+
+  "hardware" mode needs a jumper wire from OUTPUT_PIN to INPUT_PIN; the 
+output pin is driven to press the button (the button is configured with 
+press_low=False).  It compares polling at 0.1 s and 0.01 s with interrupt 
+mode (GPIOEdgeSource).
+  
+  "fake" mode (the default) does not need hardware; it makes the same 
+comparison, pressing the button through a FakeGPIO input (the button 
+"backend") in polling mode and through a FakeEdgeSource in interrupt mode.
+
+Usage:
+
+  python3 button_benchmark.py [fake | hardware] [presses]
+
+"""
+import sys
+import time
+import random
+import resource
+import threading
+
+import Adafruit_BBIO.GPIO as GPIO
+
+import button as BUTTON
+import edge_source as EDGE
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+INPUT_PIN                   = "P2_2"
+OUTPUT_PIN                  = "P2_6"
+
+DEFAULT_PRESSES             = 10
+IDLE_TIME                   = 0.5        # Seconds between presses
+HOLD_TIME                   = 0.2        # Seconds the button is held
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class FakeGPIO():
+    """ GPIO backend with one input level shared by all pins """
+    IN    = GPIO.IN
+    OUT   = GPIO.OUT
+    level = None
+    
+    def __init__(self, level=GPIO.LOW):
+        """ Initialize variables """
+        self.level = level
+    
+    # End def
+
+
+    def setup(self, pin, direction):
+        """ Nothing to set up """
+        pass
+
+    # End def
+
+
+    def input(self, pin):
+        """ Return the input level """
+        return self.level
+
+    # End def
+
+# End class
+
+
+def get_usage():
+    """Return (CPU seconds, voluntary context switches) of the process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    
+    return (usage.ru_utime + usage.ru_stime, usage.ru_nvcsw)
+
+# End def
+
+
+def benchmark(name, button, press, release, presses):
+    """Press the button presses times with press() / release(); print the
+    latency, CPU use and wakeups of wait_for_press()
+    """
+    press_times = []
+    latencies   = []
+    
+    def on_press():
+        latencies.append((time.monotonic_ns() - press_times[-1]) / 1e6)
+    # End def
+    
+    def driver():
+        for i in range(presses):
+            time.sleep(IDLE_TIME + random.random())
+            press_times.append(time.monotonic_ns())
+            press()
+            time.sleep(HOLD_TIME)
+            release()
+    # End def
+    
+    button.set_on_press_callback(on_press)
+    
+    thread = threading.Thread(target=driver)
+    
+    (cpu_start, wakeups_start) = get_usage()
+    start                      = time.monotonic()
+    
+    thread.start()
+    
+    for i in range(presses):
+        button.wait_for_press()
+    
+    elapsed              = time.monotonic() - start
+    (cpu, wakeups)       = get_usage()
+    
+    thread.join()
+    
+    print("    {0:12s} {1:10.2f} {2:10.2f} {3:10.2f} {4:10.1f}".format(
+          name, sum(latencies) / len(latencies), max(latencies),
+          100 * (cpu - cpu_start) / elapsed, (wakeups - wakeups_start) / elapsed))
+
+# End def
+
+
+def print_header():
+    """Print the column headings"""
+    print("    {0:12s} {1:>10s} {2:>10s} {3:>10s} {4:>10s}".format(
+          "mode", "mean (ms)", "max (ms)", "cpu (%)", "wakeups/s"))
+
+# End def
+
+
+def benchmark_hardware(presses):
+    """Compare polling and interrupt modes using a loopback wire"""
+    GPIO.setup(OUTPUT_PIN, GPIO.OUT)
+    GPIO.output(OUTPUT_PIN, GPIO.LOW)
+    
+    def press():
+        GPIO.output(OUTPUT_PIN, GPIO.HIGH)
+    # End def
+    
+    def release():
+        GPIO.output(OUTPUT_PIN, GPIO.LOW)
+    # End def
+    
+    print_header()
+    
+    for sleep_time in [0.1, 0.01]:
+        button = BUTTON.Button(INPUT_PIN, press_low=False, sleep_time=sleep_time)
+        benchmark("poll {0}".format(sleep_time), button, press, release, presses)
+        button.cleanup()
+    
+    button = BUTTON.Button(INPUT_PIN, press_low=False, interrupt=True)
+    benchmark("interrupt", button, press, release, presses)
+    button.cleanup()
+
+# End def
+
+
+def benchmark_fake(presses):
+    """Compare polling and interrupt modes with a fake input / edge source"""
+    gpio = FakeGPIO()
+    
+    def press():
+        gpio.level = GPIO.HIGH
+    # End def
+    
+    def release():
+        gpio.level = GPIO.LOW
+    # End def
+    
+    print_header()
+    
+    for sleep_time in [0.1, 0.01]:
+        button = BUTTON.Button(INPUT_PIN, press_low=False, sleep_time=sleep_time, backend=gpio)
+        benchmark("poll {0}".format(sleep_time), button, press, release, presses)
+        button.cleanup()
+    
+    source = EDGE.FakeEdgeSource(EDGE.LOW)
+    button = BUTTON.Button(INPUT_PIN, press_low=False, edge_source=source)
+    
+    benchmark("interrupt", button, lambda: source.inject(EDGE.HIGH), 
+              lambda: source.inject(EDGE.LOW), presses)
+    
+    button.cleanup()
+    source.close()
+
+# End def
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    presses = DEFAULT_PRESSES
+    
+    if (len(sys.argv) > 2):
+        presses = int(sys.argv[2])
+    
+    print("Button Benchmark")
+    
+    if ((len(sys.argv) > 1) and (sys.argv[1] == "hardware")):
+        benchmark_hardware(presses)
+    else:
+        benchmark_fake(presses)
+    
+    print("Benchmark Complete")
+
@@ -0,0 +1,550 @@
+"""
+--------------------------------------------------------------------------
+Button Poller
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Poller
+
+  Watch many buttons from a single thread instead of one ThreadedButton 
+thread per button.  Buttons with an edge source (see edge_source.py) are 
+waited on together with one epoll() call, so they cost nothing while idle.
+Buttons without an edge source are all sampled in one pass every 
+"sleep_time" seconds (one wakeup per tick for all of them, instead of one 
+per button).  Press / release callbacks are executed by the poller thread.
+If the GPIO backend has an input_pins() function (e.g. MmapGPIO from 
+gpio_mmap.py), the sampled buttons are read together with one register read
+per GPIO bank.
+See button_poller_benchmark.py for the thread count and wakeups per second 
+as the number of buttons grows.
+
+Software API:
+
+  ButtonPoller(sleep_time=0.01, backend=None)
+    - The sleep_time is the time between samples of buttons that do not 
+      have an edge source
+    - Optionally provide the GPIO backend (default Adafruit_BBIO.GPIO)
+    
+    add_button(pin, active_low=True, debounce=None, edge_source=None, history_size=256)
+      - Add a button; return the PolledButton
+      - The press history (see press_history.py) of the button keeps the 
+        last history_size presses
+      - Buttons can be added while the poller is running
+    
+    start()
+      - Starts the poller thread
+    
+    get_stats()
+      - Return a dictionary with the number of buttons, wakeups and ticks
+    
+    cleanup(timeout=None)
+      - Stops the poller thread and waits for it to exit; returns True if
+        the thread has exited
+
+  PolledButton
+    is_pressed()
+      - Return the (debounced) state of the button from the last sample
+    
+    get_last_press_duration()
+      - Return the duration the button was last pressed
+    
+    get_press_history()
+      - Return the PressHistory of the button (e.g. get_stats(), to_csv())
+    
+    Callback Functions:
+      - set_on_press_callback(function)
+        - Executed by the poller thread when the button is pressed
+      - set_on_release_callback(function)
+        - Executed by the poller thread when the button is released
+      
+      - get_on_press_callback_value()
+      - get_on_release_callback_value()
+
+"""
+import os
+import time
+import select
+import threading
+
+import Adafruit_BBIO.GPIO as GPIO
+
+import press_history as PRESS_HISTORY
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH          = GPIO.HIGH
+LOW           = GPIO.LOW
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class PolledButton():
+    """ Button watched by a ButtonPoller """
+    pin                           = None
+    
+    unpressed_value               = None
+    pressed_value                 = None
+    
+    edge_source                   = None
+    debouncer                     = None
+    raw_level                     = None
+    level                         = None
+    press_time_ns                 = None
+    press_duration                = None
+    history                       = None
+    last_bounces                  = None
+    gpio                          = None
+    
+    on_press_callback             = None
+    on_press_callback_value       = None
+    on_release_callback           = None
+    on_release_callback_value     = None
+    
+    def __init__(self, pin=None, active_low=True, debounce=None, edge_source=None, history_size=256, backend=None):
+        """ Initialize variables and set up the button """
+        if (pin == None):
+            raise ValueError("Pin not provided for PolledButton()")
+        else:
+            self.pin = pin
+        
+        if active_low:
+            self.unpressed_value = HIGH
+            self.pressed_value   = LOW
+        else:
+            self.unpressed_value = LOW
+            self.pressed_value   = HIGH
+        
+        self.edge_source    = edge_source
+        self.debouncer      = debounce
+        self.press_duration = 0.0
+        self.history        = PRESS_HISTORY.PressHistory(history_size)
+        self.last_bounces   = 0
+        
+        if backend is None:
+            self.gpio = GPIO
+        else:
+            self.gpio = backend
+        
+        self._setup()
+    
+    # End def
+
+
+    def _setup(self):
+        """ Setup the hardware components. """
+        # In interrupt mode the edge source sets up the pin
+        if self.edge_source is None:
+            self.gpio.setup(self.pin, self.gpio.IN)
+            self.raw_level = self.gpio.input(self.pin)
+        else:
+            self.raw_level = self.edge_source.level()
+        
+        self.level = self.raw_level
+        
+        if self.debouncer is not None:
+            self.debouncer.reset(self.level)
+
+    # End def
+
+
+    def _record_press(self, press_time_ns, release_time_ns):
+        """ Add a press to the press history; the bounces are the raw edges
+           the debouncer rejected since the last press was recorded
+        """
+        bounces = 0
+        
+        if self.debouncer is not None:
+            bounces           = self.debouncer.get_bounces() - self.last_bounces
+            self.last_bounces = self.debouncer.get_bounces()
+        
+        self.history.record(press_time_ns, release_time_ns - press_time_ns, bounces)
+
+    # End def
+
+
+    def _process(self, raw_level, now_ns):
+        """ Update the button with a raw level; execute the callbacks if the
+           (debounced) level changed
+        """
+        self.raw_level = raw_level
+        
+        if self.debouncer is None:
+            if (raw_level == self.level):
+                return
+            
+            self.level = raw_level
+            change_ns  = now_ns
+        elif self.debouncer.update(raw_level, now_ns):
+            self.level = self.debouncer.level
+            change_ns  = self.debouncer.change_ns
+        else:
+            return
+        
+        if (self.level == self.pressed_value):
+            self.press_time_ns = change_ns
+            
+            if self.on_press_callback is not None:
+                self.on_press_callback_value = self.on_press_callback()
+        else:
+            if self.press_time_ns is not None:
+                self.press_duration = (change_ns - self.press_time_ns) / 1e9
+                self._record_press(self.press_time_ns, change_ns)
+            
+            if self.on_release_callback is not None:
+                self.on_release_callback_value = self.on_release_callback()
+
+    # End def
+
+
+    def _sample(self, now_ns):
+        """ Sample the pin """
+        self._process(self.gpio.input(self.pin), now_ns)
+
+    # End def
+
+
+    def _read_edges(self, now_ns):
+        """ Process the edges from the edge source; finish any pending 
+           debounce at now_ns
+        """
+        for (level, timestamp_ns) in self.edge_source.read_edges():
+            self._process(level, timestamp_ns)
+        
+        if self._next_update_ns() is not None:
+            self._process(self.raw_level, now_ns)
+
+    # End def
+
+
+    def _next_update_ns(self):
+        """ Return when the button needs to be updated to finish a pending 
+           debounce (None if nothing is pending)
+        """
+        if self.debouncer is None:
+            return None
+        
+        return self.debouncer.next_update_ns()
+
+    # End def
+
+
+    def is_pressed(self):
+        """ Is the Button pressed (as of the last sample)?
+        
+           Returns:  True  - Button is pressed
+                     False - Button is not pressed
+        """
+        return self.level == self.pressed_value
+
+    # End def
+
+
+    def get_press_history(self):
+        """ Return the press history """
+        return self.history
+    
+    # End def
+    
+    
+    def get_last_press_duration(self):
+        """ Return the last press duration """
+        return self.press_duration
+    
+    # End def
+    
+    
+    # -----------------------------------------------------
+    # Callback Functions
+    # -----------------------------------------------------
+
+    def set_on_press_callback(self, function):
+        """ Function excuted once when the button is pressed """
+        self.on_press_callback = function
+    
+    # End def
+
+    def get_on_press_callback_value(self):
+        """ Return value from on_press_callback function """
+        return self.on_press_callback_value
+    
+    # End def
+
+    def set_on_release_callback(self, function):
+        """ Function excuted once when the button is released """
+        self.on_release_callback = function
+    
+    # End def
+
+    def get_on_release_callback_value(self):
+        """ Return value from on_release_callback function """
+        return self.on_release_callback_value
+    
+    # End def    
+
+# End class
+
+
+class ButtonPoller(threading.Thread):
+    """ Single thread that watches many buttons """
+    sleep_time      = None
+    edge_buttons    = None
+    sampled_buttons = None
+    fd_buttons      = None
+    lock            = None
+    epoll           = None
+    stop_event      = None
+    wake_read       = None
+    wake_write      = None
+    wakeups         = None
+    ticks           = None
+    gpio            = None
+    
+    def __init__(self, sleep_time=0.01, backend=None):
+        """ Initialize variables """
+        threading.Thread.__init__(self)
+        
+        self.sleep_time      = sleep_time
+        self.edge_buttons    = []
+        self.sampled_buttons = []
+        self.fd_buttons      = {}
+        self.lock            = threading.Lock()
+        self.stop_event      = threading.Event()
+        self.wakeups         = 0
+        self.ticks           = 0
+        
+        if backend is None:
+            self.gpio = GPIO
+        else:
+            self.gpio = backend
+        
+        # Wait on every edge source and on a pipe that is written to wake
+        # the thread (to stop, or when a button is added)
+        (self.wake_read, self.wake_write) = os.pipe()
+        os.set_blocking(self.wake_read, False)
+        
+        self.epoll = select.epoll()
+        self.epoll.register(self.wake_read, select.EPOLLIN)
+    
+    # End def
+
+
+    def add_button(self, pin=None, active_low=True, debounce=None, edge_source=None, history_size=256):
+        """ Add a button; return the PolledButton """
+        button = PolledButton(pin, active_low, debounce, edge_source, history_size, self.gpio)
+        
+        with self.lock:
+            if edge_source is None:
+                self.sampled_buttons.append(button)
+            else:
+                self.edge_buttons.append(button)
+                self.fd_buttons[edge_source.fileno()] = button
+                
+                # poll() and epoll() event masks have the same values
+                self.epoll.register(edge_source.fileno(), edge_source.poll_mask)
+        
+        self._wake()
+        
+        return button
+
+    # End def
+
+
+    def _wake(self):
+        """ Wake up the poller thread """
+        if self.wake_write is not None:
+            os.write(self.wake_write, b"\x00")
+
+    # End def
+
+
+    def _get_timeout(self, now_ns, next_tick_ns):
+        """ Return the time (in seconds) until the poller needs to wake up 
+           without an edge (-1 to wait for an edge)
+        """
+        wake_ns = None
+        
+        if self.sampled_buttons:
+            wake_ns = next_tick_ns
+        
+        for button in self.edge_buttons:
+            next_ns = button._next_update_ns()
+            
+            if (next_ns is not None) and ((wake_ns is None) or (next_ns < wake_ns)):
+                wake_ns = next_ns
+        
+        if wake_ns is None:
+            return -1
+        
+        return max(0.0, (wake_ns - now_ns) / 1e9)
+
+    # End def
+
+
+    def run(self):
+        """ Run the poller thread.  Execute callbacks as appropriate. """
+        sleep_time_ns = int(self.sleep_time * 1e9)
+        next_tick_ns  = time.monotonic_ns()
+        
+        while not self.stop_event.is_set():
+            with self.lock:
+                timeout = self._get_timeout(time.monotonic_ns(), next_tick_ns)
+            
+            events = self.epoll.poll(timeout)
+            
+            if self.stop_event.is_set():
+                break
+            
+            self.wakeups += 1
+            now_ns        = time.monotonic_ns()
+            
+            with self.lock:
+                # Buttons with edges
+                for (fd, event) in events:
+                    if fd in self.fd_buttons:
+                        self.fd_buttons[fd]._read_edges(now_ns)
+                    elif (fd == self.wake_read):
+                        os.read(self.wake_read, 4096)
+                
+                # Buttons with a pending debounce
+                for button in self.edge_buttons:
+                    next_ns = button._next_update_ns()
+                    
+                    if (next_ns is not None) and (next_ns <= now_ns):
+                        button._read_edges(now_ns)
+                
+                # Sample all buttons without an edge source in one pass
+                if self.sampled_buttons and (now_ns >= next_tick_ns):
+                    self._sample_buttons(now_ns)
+                    
+                    self.ticks   += 1
+                    next_tick_ns += sleep_time_ns
+                    
+                    # Skip ticks that were missed
+                    if (next_tick_ns <= now_ns):
+                        next_tick_ns = now_ns + sleep_time_ns
+
+    # End def
+
+
+    def _sample_buttons(self, now_ns):
+        """ Sample all buttons without an edge source """
+        if not hasattr(self.gpio, "input_pins"):
+            for button in self.sampled_buttons:
+                button._sample(now_ns)
+            return
+        
+        # Read all pins at once
+        levels = self.gpio.input_pins([button.pin for button in self.sampled_buttons])
+        
+        for button in self.sampled_buttons:
+            button._process(levels[button.pin], now_ns)
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return the number of buttons, wakeups and ticks """
+        with self.lock:
+            return {"buttons" : len(self.edge_buttons) + len(self.sampled_buttons),
+                    "wakeups" : self.wakeups,
+                    "ticks"   : self.ticks}
+
+    # End def
+
+
+    def cleanup(self, timeout=None):
+        """ Stop the poller thread and wait for it to exit """
+        self.stop_event.set()
+        self._wake()
+        
+        if self.is_alive():
+            self.join(timeout)
+        
+        if self.is_alive():
+            return False
+        
+        if self.wake_read is not None:
+            self.epoll.close()
+            os.close(self.wake_read)
+            os.close(self.wake_write)
+            
+            self.wake_read  = None
+            self.wake_write = None
+        
+        return True
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import edge_source as EDGE
+
+    print("Button Poller Test")
+    
+    poller = ButtonPoller()
+    
+    # One sampled button and one interrupt button
+    buttons = [poller.add_button("P2_2"), 
+               poller.add_button("P2_4", edge_source=EDGE.GPIOEdgeSource("P2_4"))]
+    
+    for (i, button) in enumerate(buttons):
+        button.set_on_press_callback(lambda i=i: print("Button {0} pressed".format(i)))
+        button.set_on_release_callback(lambda i=i: print("Button {0} released".format(i)))
+    
+    poller.start()
+    
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    try:
+        while (True):
+            time.sleep(1)
+        
+    except KeyboardInterrupt:
+        poller.cleanup(timeout=1.0)
+    
+    print("    {0}".format(poller.get_stats()))
+    
+    print("Test Complete")
+
@@ -0,0 +1,228 @@
+"""
+--------------------------------------------------------------------------
+Button Poller Benchmark
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Poller Benchmark
+
+  Compare one ThreadedButton thread per button with a single ButtonPoller
+as the number of buttons grows.  For each configuration the benchmark 
+reports:
+  - threads:    number of threads in the process
+  - wakeups/s:  context switches per second summed over all threads of the
+                process (from /proc/self/task/*/status)
+  - cpu (%):    process CPU time per second
+
+  While measuring, a driver thread presses and releases every button once
+per second (the driver's own wakeups are included in every configuration).
+
+  "fake" mode (the default) uses a FakeEdgeSource per button (interrupt 
+mode).  "hardware" mode also compares polling (sleep_time=0.01) of 
+INPUT_PIN by every button, which does not need any wiring.
+
+Usage:
+
+  python3 button_poller_benchmark.py [fake | hardware] [seconds]
+
+"""
+import sys
+import glob
+import time
+import resource
+import threading
+
+import edge_source     as EDGE
+import threaded_button as THREADED_BUTTON
+import button_poller   as BUTTON_POLLER
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+INPUT_PIN                   = "P2_2"
+
+BUTTON_COUNTS               = [1, 8, 16, 64, 128]
+SLEEP_TIME                  = 0.01
+DEFAULT_SECONDS             = 2.0
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def get_context_switches():
+    """Return the context switches summed over all threads of the process"""
+    switches = 0
+    
+    for filename in glob.glob("/proc/self/task/*/status"):
+        try:
+            with open(filename, "r") as f:
+                for line in f:
+                    if line.startswith(("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches")):
+                        switches += int(line.split()[1])
+        except OSError:
+            # Thread exited
+            pass
+    
+    return switches
+
+# End def
+
+
+def get_cpu_time():
+    """Return the CPU time of the process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    
+    return usage.ru_utime + usage.ru_stime
+
+# End def
+
+
+def measure(name, count, sources, seconds):
+    """Press every source once per second for seconds; print the results"""
+    stop_event = threading.Event()
+    
+    def driver():
+        while not stop_event.wait(1.0):
+            for source in sources:
+                source.inject(EDGE.LOW)
+            for source in sources:
+                source.inject(EDGE.HIGH)
+    # End def
+    
+    thread = threading.Thread(target=driver)
+    thread.start()
+    
+    threads        = threading.active_count()
+    switches_start = get_context_switches()
+    cpu_start      = get_cpu_time()
+    
+    time.sleep(seconds)
+    
+    switches = get_context_switches() - switches_start
+    cpu      = get_cpu_time() - cpu_start
+    
+    stop_event.set()
+    thread.join()
+    
+    print("    {0:24s} {1:8d} {2:8d} {3:12.1f} {4:8.2f}".format(
+          name, count, threads, switches / seconds, 100 * cpu / seconds))
+
+# End def
+
+
+def benchmark_threaded(count, seconds, interrupt):
+    """One ThreadedButton per button"""
+    if interrupt:
+        sources = [EDGE.FakeEdgeSource(EDGE.HIGH) for i in range(count)]
+        buttons = [THREADED_BUTTON.ThreadedButton(INPUT_PIN, edge_source=source) for source in sources]
+        name    = "ThreadedButton (edges)"
+    else:
+        sources = []
+        buttons = [THREADED_BUTTON.ThreadedButton(INPUT_PIN, sleep_time=SLEEP_TIME) for i in range(count)]
+        name    = "ThreadedButton (poll)"
+    
+    for button in buttons:
+        button.start()
+    
+    measure(name, count, sources, seconds)
+    
+    for button in buttons:
+        button.cleanup()
+    
+    for source in sources:
+        source.close()
+
+# End def
+
+
+def benchmark_poller(count, seconds, interrupt):
+    """One ButtonPoller for all buttons"""
+    poller = BUTTON_POLLER.ButtonPoller(sleep_time=SLEEP_TIME)
+    
+    if interrupt:
+        sources = [EDGE.FakeEdgeSource(EDGE.HIGH) for i in range(count)]
+        name    = "ButtonPoller (edges)"
+        
+        for source in sources:
+            poller.add_button(INPUT_PIN, edge_source=source)
+    else:
+        sources = []
+        name    = "ButtonPoller (poll)"
+        
+        for i in range(count):
+            poller.add_button(INPUT_PIN)
+    
+    poller.start()
+    
+    measure(name, count, sources, seconds)
+    
+    poller.cleanup()
+    
+    for source in sources:
+        source.close()
+
+# End def
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    seconds = DEFAULT_SECONDS
+    
+    if (len(sys.argv) > 2):
+        seconds = float(sys.argv[2])
+    
+    modes = [True]
+    
+    if ((len(sys.argv) > 1) and (sys.argv[1] == "hardware")):
+        modes.append(False)
+    
+    print("Button Poller Benchmark")
+    print("    {0:24s} {1:>8s} {2:>8s} {3:>12s} {4:>8s}".format(
+          "configuration", "buttons", "threads", "wakeups/s", "cpu (%)"))
+    
+    for interrupt in modes:
+        for count in BUTTON_COUNTS:
+            benchmark_threaded(count, seconds, interrupt)
+            benchmark_poller(count, seconds, interrupt)
+    
+    print("Benchmark Complete")
+
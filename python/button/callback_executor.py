@@ -0,0 +1,292 @@
+"""
+--------------------------------------------------------------------------
+Button Callback Executor
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Callback Executor
+
+  Run button callbacks on a thread pool so that slow callbacks (e.g. an ADC
+read plus a display update) do not stretch the time between button 
+samples.  Each callback has a policy for what happens when it is called
+while a previous call is still running:
+  - DROP:    the new call is dropped
+  - QUEUE:   the new call runs after the calls before it (every call 
+             runs, one at a time)
+  - LATEST:  the call runs once more after the current one finishes, no 
+             matter how many calls were made in the meantime (latest wins)
+
+  wrap() returns a DispatchedCallback that can be called like the function.
+Calling it starts the function on the pool and returns the value of the 
+last call that finished, so the Button callback code does not change.
+
+Software API:
+
+  CallbackExecutor(max_workers=2)
+    - Provide the number of worker threads
+    
+    wrap(function, policy=QUEUE)
+      - Return a DispatchedCallback for the function
+    
+    drain(timeout=None)
+      - Wait for all calls to finish; returns True if they finished.  If a
+        callback raised an exception, it is raised again here.
+    
+    shutdown(wait=True)
+      - Stop the worker threads
+
+  DispatchedCallback
+    value
+      - Return value of the last call that finished
+    
+    get_stats()
+      - Return a dictionary with the number of calls, runs, dropped calls
+        and superseded calls (LATEST calls that were merged)
+
+"""
+import threading
+import concurrent.futures
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DROP          = "drop"
+QUEUE         = "queue"
+LATEST        = "latest"
+
+POLICIES      = [DROP, QUEUE, LATEST]
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class DispatchedCallback():
+    """ Callback that runs on a CallbackExecutor """
+    function   = None
+    policy     = None
+    executor   = None
+    running    = None
+    pending    = None
+    value      = None
+    calls      = None
+    runs       = None
+    dropped    = None
+    superseded = None
+    
+    def __init__(self, executor, function, policy):
+        """ Initialize variables """
+        if policy not in POLICIES:
+            raise ValueError("Policy must be one of {0}".format(POLICIES))
+        
+        self.executor   = executor
+        self.function   = function
+        self.policy     = policy
+        self.running    = False
+        self.pending    = 0       # Calls waiting for the running call
+        self.calls      = 0
+        self.runs       = 0
+        self.dropped    = 0
+        self.superseded = 0
+    
+    # End def
+
+
+    def __call__(self):
+        """ Start the function; return the value of the last finished call """
+        self.executor._dispatch(self)
+        
+        return self.value
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return the call statistics """
+        with self.executor.condition:
+            return {"calls"      : self.calls,
+                    "runs"       : self.runs,
+                    "dropped"    : self.dropped,
+                    "superseded" : self.superseded}
+
+    # End def
+
+# End class
+
+
+class CallbackExecutor():
+    """ Thread pool for button callbacks """
+    pool      = None
+    condition = None
+    in_flight = None
+    error     = None
+    
+    def __init__(self, max_workers=2):
+        """ Initialize variables; Create the thread pool """
+        self.pool      = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.condition = threading.Condition()
+        self.in_flight = 0
+    
+    # End def
+
+
+    def wrap(self, function, policy=QUEUE):
+        """ Return a DispatchedCallback for the function """
+        return DispatchedCallback(self, function, policy)
+
+    # End def
+
+
+    def _dispatch(self, callback):
+        """ Start the callback according to its policy """
+        with self.condition:
+            callback.calls += 1
+            
+            if callback.running and (callback.policy == DROP):
+                callback.dropped += 1
+                return
+            
+            if callback.running and (callback.policy == LATEST):
+                if callback.pending:
+                    callback.superseded += 1
+                
+                callback.pending = 1
+                return
+            
+            # QUEUE:  run after the calls before it, on the same worker
+            if callback.running:
+                callback.pending += 1
+                return
+            
+            callback.running  = True
+            self.in_flight   += 1
+        
+        self.pool.submit(self._run, callback)
+
+    # End def
+
+
+    def _run(self, callback):
+        """ Run the callback (worker thread) """
+        while True:
+            try:
+                value = callback.function()
+            except Exception as error:
+                value = callback.value
+                
+                with self.condition:
+                    if self.error is None:
+                        self.error = error
+            
+            with self.condition:
+                callback.value = value
+                callback.runs += 1
+                
+                # Run again for the calls made while running
+                if callback.pending:
+                    callback.pending -= 1
+                    continue
+                
+                callback.running  = False
+                self.in_flight   -= 1
+                
+                if (self.in_flight == 0):
+                    self.condition.notify_all()
+                
+                return
+
+    # End def
+
+
+    def drain(self, timeout=None):
+        """ Wait for all calls to finish """
+        with self.condition:
+            done = self.condition.wait_for(lambda: self.in_flight == 0, timeout)
+            
+            error      = self.error
+            self.error = None
+        
+        if error is not None:
+            raise error
+        
+        return done
+
+    # End def
+
+
+    def shutdown(self, wait=True):
+        """ Stop the worker threads """
+        self.pool.shutdown(wait=wait)
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    print("Callback Executor Test")
+    
+    executor = CallbackExecutor()
+    
+    def slow():
+        time.sleep(0.1)
+        return time.time()
+    # End def
+    
+    # Call each callback every 10 ms for 1 second
+    callbacks = [executor.wrap(slow, policy) for policy in POLICIES]
+    
+    for i in range(100):
+        for callback in callbacks:
+            callback()
+        time.sleep(0.01)
+    
+    executor.drain()
+    
+    for callback in callbacks:
+        print("    {0:8s} {1}".format(callback.policy, callback.get_stats()))
+    
+    executor.shutdown()
+    
+    print("Test Complete")
+
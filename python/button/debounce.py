@@ -0,0 +1,322 @@
+"""
+--------------------------------------------------------------------------
+Button Debounce
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Debounce
+
+  Debouncers turn raw input samples (or edges) into stable levels so that
+contact bounce does not produce extra presses.  Samples are timestamped 
+with time.monotonic_ns(), so clock changes (e.g. NTP) do not affect the 
+debounce or the press timing.  The time of a stable change is the time of
+the first sample of the run that was accepted (i.e. when the contact first
+moved), not the time it was accepted.
+
+  IntegratorDebouncer counts samples:  each HIGH sample counts up and each 
+LOW sample counts down (between 0 and samples); the level changes when the
+count reaches the end.  A faster sample rate needs more samples.
+
+  TimeWindowDebouncer accepts a new level once it has been read for the 
+whole window, independent of the sample rate.
+
+Software API:
+
+  IntegratorDebouncer(samples=3, sample_time=0.005)
+    - The level changes after "samples" more samples of the new level than
+      of the old level
+    - In interrupt mode (no regular samples), the input is sampled every 
+      sample_time seconds while a change is pending
+  
+  TimeWindowDebouncer(window=0.02)
+    - The level changes after the new level has been read for window seconds
+  
+  Both debouncers provide:
+  
+    update(level, now_ns=None)
+      - Provide a raw sample (and the time.monotonic_ns() it was read)
+      - Returns True if the stable level changed
+    
+    next_update_ns()
+      - Return the time.monotonic_ns() at which update() should be called
+        again to finish a pending change (None if no change is pending)
+    
+    reset(level, now_ns=None)
+      - Set the stable level
+    
+    get_bounces()
+      - Return the number of raw changes that did not change the stable 
+        level
+    
+    level / change_ns
+      - The stable level and the time it last changed
+
+"""
+import time
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH          = 1
+LOW           = 0
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class Debouncer():
+    """ Debouncer Base Class """
+    level          = None
+    change_ns      = None
+    candidate_ns   = None
+    raw_level      = None
+    last_update_ns = None
+    raw_edges      = None
+    edges          = None
+    
+    def __init__(self):
+        """ Initialize variables """
+        self.raw_edges = 0
+        self.edges     = 0
+    
+    # End def
+
+
+    def reset(self, level, now_ns=None):
+        """Set the stable level"""
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        
+        self.level          = level
+        self.raw_level      = level
+        self.change_ns      = now_ns
+        self.candidate_ns   = None
+        self.last_update_ns = now_ns
+
+    # End def
+
+
+    def _accept(self, level, now_ns):
+        """Return True if the stable level should change to level"""
+        raise NotImplementedError
+
+    # End def
+
+
+    def _settled(self):
+        """Return True if no change is pending"""
+        return True
+
+    # End def
+
+
+    def update(self, level, now_ns=None):
+        """Provide a raw sample; return True if the stable level changed"""
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        
+        if self.level is None:
+            self.reset(level, now_ns)
+            return False
+        
+        if (level != self.raw_level):
+            self.raw_edges += 1
+            self.raw_level  = level
+        
+        # Time the contact first moved towards the new level
+        if ((level != self.level) and (self.candidate_ns is None)):
+            self.candidate_ns = now_ns
+        
+        self.last_update_ns = now_ns
+        
+        if self._accept(level, now_ns):
+            self.level        = level
+            self.change_ns    = self.candidate_ns
+            self.candidate_ns = None
+            self.edges       += 1
+            return True
+        
+        if ((level == self.level) and self._settled()):
+            self.candidate_ns = None
+        
+        return False
+
+    # End def
+
+
+    def next_update_ns(self):
+        """Return when update() should be called again (None if no change
+        is pending)
+        """
+        return None
+
+    # End def
+
+
+    def get_bounces(self):
+        """Return the number of raw changes that were rejected"""
+        return self.raw_edges - self.edges
+
+    # End def
+
+# End class
+
+
+class IntegratorDebouncer(Debouncer):
+    """ Debouncer that counts samples of each level """
+    samples        = None
+    sample_time_ns = None
+    count          = None
+    
+    def __init__(self, samples=3, sample_time=0.005):
+        """ Initialize variables """
+        if (samples < 1):
+            raise ValueError("Samples must be at least 1")
+        
+        Debouncer.__init__(self)
+        
+        self.samples        = samples
+        self.sample_time_ns = int(sample_time * 1e9)
+    
+    # End def
+
+
+    def reset(self, level, now_ns=None):
+        """Set the stable level"""
+        Debouncer.reset(self, level, now_ns)
+        
+        if (level == HIGH):
+            self.count = self.samples
+        else:
+            self.count = 0
+
+    # End def
+
+
+    def _accept(self, level, now_ns):
+        """Count the sample; the level changes when the count reaches the end"""
+        if (level == HIGH):
+            self.count = min(self.count + 1, self.samples)
+        else:
+            self.count = max(self.count - 1, 0)
+        
+        if (self.level == HIGH):
+            return (self.count == 0)
+        else:
+            return (self.count == self.samples)
+
+    # End def
+
+
+    def _settled(self):
+        """Return True if the count is at the end of the stable level"""
+        if (self.level == HIGH):
+            return (self.count == self.samples)
+        else:
+            return (self.count == 0)
+
+    # End def
+
+
+    def next_update_ns(self):
+        """Return when the next sample should be taken"""
+        if self._settled():
+            return None
+        
+        return self.last_update_ns + self.sample_time_ns
+
+    # End def
+
+# End class
+
+
+class TimeWindowDebouncer(Debouncer):
+    """ Debouncer that accepts a level once it has been read for a window """
+    window_ns = None
+    
+    def __init__(self, window=0.02):
+        """ Initialize variables """
+        Debouncer.__init__(self)
+        
+        self.window_ns = int(window * 1e9)
+    
+    # End def
+
+
+    def _accept(self, level, now_ns):
+        """Accept the level once it has been read for the whole window"""
+        return ((level != self.level) and (now_ns - self.candidate_ns >= self.window_ns))
+
+    # End def
+
+
+    def next_update_ns(self):
+        """Return when the pending level has been read for the window"""
+        if self.candidate_ns is None:
+            return None
+        
+        return self.candidate_ns + self.window_ns
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Debounce Test")
+    
+    # Button press with bounce; one sample per millisecond
+    samples = [1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 1, 1, 1]
+    
+    for debouncer in [IntegratorDebouncer(samples=3), TimeWindowDebouncer(window=0.003)]:
+        print("{0}:".format(type(debouncer).__name__))
+        
+        for (i, level) in enumerate(samples):
+            if debouncer.update(level, i * 1000000):
+                print("    {0} ms:  level {1} (changed at {2} ms)".format(
+                      i, debouncer.level, debouncer.change_ns // 1000000))
+        
+        print("    Bounces = {0}".format(debouncer.get_bounces()))
+    
+    print("Test Complete")
+
@@ -0,0 +1,424 @@
+"""
+--------------------------------------------------------------------------
+Button Edge Sources
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Edge Sources
+
+  An edge source lets a button block on kernel edge events instead of 
+sampling the pin every sleep_time.  Each edge is recorded as a 
+(level, timestamp) pair, where the timestamp is time.monotonic_ns() when 
+the edge was seen, so the button can time presses from the edges 
+themselves and short taps are not lost between samples.
+
+  Every edge source has a file descriptor (fileno()) that becomes readable
+when there are edges to read, so many sources can be waited on with one 
+select / poll / epoll call.
+
+Software API:
+
+  EdgeSource()
+    - Base class for the edge sources below
+    
+    fileno()
+      - Return the file descriptor to wait on (poll_mask gives the events)
+    
+    wait(timeout=None)
+      - Wait for edges; return True if there are edges to read
+      - Function consumes time
+    
+    read_edges()
+      - Return a list of the (level, timestamp_ns) edges since the last call
+    
+    level()
+      - Return the current input level (HIGH / LOW)
+    
+    close()
+      - Stop watching the pin
+
+  GPIOEdgeSource(pin)
+    - Uses the edge detection of the Adafruit_BBIO.GPIO library (the kernel
+      interrupt wakes the library thread, which records the edge)
+
+  SysfsEdgeSource(gpio, root="/sys/class/gpio")
+    - Uses the sysfs GPIO interface (/sys/class/gpio/gpio<N>/value); the 
+      value file is polled directly for edge interrupts (POLLPRI), so no 
+      extra thread is needed.  If both edges of a press happen before the 
+      value is read, the press is not seen.
+
+  FakeEdgeSource(level=HIGH)
+    - Edge source for testing without hardware
+    
+    inject(level, timestamp_ns=None)
+      - Record an edge to the given level (at the current time by default)
+
+"""
+import os
+import time
+import select
+import threading
+import collections
+
+try:
+    import Adafruit_BBIO.GPIO as GPIO
+except ImportError:
+    # Only SysfsEdgeSource / FakeEdgeSource can be used
+    GPIO = None
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH          = 1
+LOW           = 0
+
+SYSFS_GPIO_PATH = "/sys/class/gpio"
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class EdgeSource():
+    """ Edge Source Base Class
+    
+    Edges are kept in a queue; a byte is written to a pipe (the doorbell) 
+    for each edge so the read end of the pipe can be waited on.
+    """
+    poll_mask      = select.POLLIN
+    edges          = None
+    lock           = None
+    doorbell_read  = None
+    doorbell_write = None
+    poller         = None
+    
+    def __init__(self):
+        """ Initialize variables """
+        self.edges = collections.deque()
+        self.lock  = threading.Lock()
+        
+        (self.doorbell_read, self.doorbell_write) = os.pipe()
+        os.set_blocking(self.doorbell_read, False)
+        os.set_blocking(self.doorbell_write, False)
+        
+        self.poller = select.poll()
+        self.poller.register(self.fileno(), self.poll_mask)
+    
+    # End def
+
+
+    def fileno(self):
+        """Return the file descriptor to wait on for edges"""
+        return self.doorbell_read
+
+    # End def
+
+
+    def _push(self, level, timestamp_ns=None):
+        """Record an edge and ring the doorbell"""
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        
+        with self.lock:
+            self.edges.append((level, timestamp_ns))
+            
+            try:
+                os.write(self.doorbell_write, b"\x00")
+            except BlockingIOError:
+                # Pipe is full, so the doorbell is already ringing
+                pass
+
+    # End def
+
+
+    def wait(self, timeout=None):
+        """Wait for edges (timeout in seconds; None waits forever).
+        
+           Returns:  True  - There are edges to read
+                     False - Timeout
+        """
+        if timeout is None:
+            events = self.poller.poll()
+        else:
+            # Round up so the wait is never shorter than the timeout
+            events = self.poller.poll(max(0, int(-(-timeout * 1000 // 1))))
+        
+        return (len(events) > 0)
+
+    # End def
+
+
+    def read_edges(self):
+        """Return a list of the (level, timestamp_ns) edges since the last call"""
+        with self.lock:
+            try:
+                while os.read(self.doorbell_read, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            
+            edges = list(self.edges)
+            self.edges.clear()
+        
+        return edges
+
+    # End def
+
+
+    def level(self):
+        """Return the current input level"""
+        raise NotImplementedError
+
+    # End def
+
+
+    def close(self):
+        """Stop watching the pin; close the doorbell"""
+        if self.doorbell_read is not None:
+            self.poller.unregister(self.doorbell_read)
+            os.close(self.doorbell_read)
+            os.close(self.doorbell_write)
+            
+            self.doorbell_read  = None
+            self.doorbell_write = None
+
+    # End def
+
+# End class
+
+
+class GPIOEdgeSource(EdgeSource):
+    """ Edge source using Adafruit_BBIO.GPIO edge detection """
+    pin = None
+    
+    def __init__(self, pin=None):
+        """ Initialize variables; Start edge detection on the pin """
+        if (pin == None):
+            raise ValueError("Pin not provided for GPIOEdgeSource()")
+        
+        if GPIO is None:
+            raise RuntimeError("Adafruit_BBIO.GPIO is not available")
+        
+        EdgeSource.__init__(self)
+        
+        self.pin = pin
+        
+        GPIO.setup(self.pin, GPIO.IN)
+        GPIO.add_event_detect(self.pin, GPIO.BOTH, callback=self._callback)
+    
+    # End def
+
+
+    def _callback(self, channel):
+        """Record the edge (called by the GPIO library thread)"""
+        timestamp_ns = time.monotonic_ns()
+        
+        self._push(GPIO.input(self.pin), timestamp_ns)
+
+    # End def
+
+
+    def level(self):
+        """Return the current input level"""
+        return GPIO.input(self.pin)
+
+    # End def
+
+
+    def close(self):
+        """Stop edge detection on the pin"""
+        if self.doorbell_read is not None:
+            GPIO.remove_event_detect(self.pin)
+        
+        EdgeSource.close(self)
+
+    # End def
+
+# End class
+
+
+class SysfsEdgeSource(EdgeSource):
+    """ Edge source using the sysfs GPIO value file
+    
+    The value file itself is polled (POLLPRI) instead of a doorbell.
+    """
+    poll_mask  = select.POLLPRI | select.POLLERR
+    gpio       = None
+    path       = None
+    value_fd   = None
+    last_level = None
+    
+    def __init__(self, gpio=None, root=SYSFS_GPIO_PATH):
+        """ Initialize variables; Enable edge interrupts on the GPIO """
+        if (gpio == None):
+            raise ValueError("GPIO not provided for SysfsEdgeSource()")
+        
+        self.gpio  = gpio
+        self.path  = os.path.join(root, "gpio{0}".format(gpio))
+        self.edges = collections.deque()
+        self.lock  = threading.Lock()
+        
+        # Export the GPIO if needed; interrupt on both edges
+        if not os.path.exists(self.path):
+            with open(os.path.join(root, "export"), "w") as f:
+                f.write(str(gpio))
+        
+        with open(os.path.join(self.path, "direction"), "w") as f:
+            f.write("in")
+        
+        with open(os.path.join(self.path, "edge"), "w") as f:
+            f.write("both")
+        
+        self.value_fd = os.open(os.path.join(self.path, "value"), os.O_RDONLY)
+        
+        # Reading the value clears the pending interrupt
+        self.last_level = self.level()
+        
+        self.poller = select.poll()
+        self.poller.register(self.value_fd, self.poll_mask)
+    
+    # End def
+
+
+    def fileno(self):
+        """Return the file descriptor to wait on for edges"""
+        return self.value_fd
+
+    # End def
+
+
+    def read_edges(self):
+        """Return a list of the (level, timestamp_ns) edges since the last call"""
+        timestamp_ns = time.monotonic_ns()
+        level        = self.level()
+        
+        with self.lock:
+            edges = list(self.edges)
+            self.edges.clear()
+            
+            if (level != self.last_level):
+                edges.append((level, timestamp_ns))
+                self.last_level = level
+        
+        return edges
+
+    # End def
+
+
+    def level(self):
+        """Return the current input level"""
+        os.lseek(self.value_fd, 0, os.SEEK_SET)
+        
+        return int(os.read(self.value_fd, 2)[:1])
+
+    # End def
+
+
+    def close(self):
+        """Stop watching the GPIO"""
+        if self.value_fd is not None:
+            self.poller.unregister(self.value_fd)
+            os.close(self.value_fd)
+            
+            self.value_fd = None
+
+    # End def
+
+# End class
+
+
+class FakeEdgeSource(EdgeSource):
+    """ Edge source for testing without hardware """
+    current_level = None
+    
+    def __init__(self, level=HIGH):
+        """ Initialize variables """
+        EdgeSource.__init__(self)
+        
+        self.current_level = level
+    
+    # End def
+
+
+    def inject(self, level, timestamp_ns=None):
+        """Record an edge to the given level"""
+        self.current_level = level
+        self._push(level, timestamp_ns)
+
+    # End def
+
+
+    def level(self):
+        """Return the current input level"""
+        return self.current_level
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Edge Source Test")
+    
+    source = FakeEdgeSource()
+    
+    def press():
+        time.sleep(0.5)
+        source.inject(LOW)
+        time.sleep(0.05)
+        source.inject(HIGH)
+    # End def
+    
+    threading.Thread(target=press).start()
+    
+    print("Waiting for edges ...")
+    source.wait()
+    time.sleep(0.1)
+    
+    edges = source.read_edges()
+    print("    Edges = {0}".format(edges))
+    print("    Press duration = {0} seconds".format((edges[1][1] - edges[0][1]) / 1e9))
+    
+    source.close()
+    
+    print("Test Complete")
+
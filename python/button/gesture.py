@@ -0,0 +1,310 @@
+"""
+--------------------------------------------------------------------------
+Button Gestures
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Gestures
+
+  Classify the presses of a Button as they happen:
+  - Clicks:      single, double, triple ... clicks (presses released within
+                 click_time of each other)
+  - Long press:  reported as soon as the button has been held for 
+                 long_press_time, while it is still held
+  - Repeat:      reported every repeat_time while the button is still held 
+                 after a long press (e.g. to step a value)
+  - Release:     the release after a long press
+
+  The press timestamps of the current gesture are kept in a ring buffer 
+(collections.deque with max_clicks entries).  A click gesture is reported
+once click_time has passed after the last release (so it is not the start
+of a double click), or right away once max_clicks presses have been seen;
+with max_clicks=1 every click is reported on release.
+
+Software API:
+
+  GestureRecognizer(button, click_time=0.3, long_press_time=2.0, 
+                    repeat_time=None, max_clicks=3)
+    - Provide the Button (uses Button.wait_for_edge())
+    - Times are in seconds; repeat_time=None turns off repeat
+    
+    wait_for_gesture(timeout=None)
+      - Wait for the next gesture; return a Gesture (None on timeout)
+      - Function consumes time
+    
+    reset()
+      - Forget the presses of the current gesture
+
+  Gesture(kind, count, timestamp_ns, duration)
+    - kind:          CLICK, LONG_PRESS, REPEAT or RELEASE
+    - count:         number of clicks (CLICK), presses including the long 
+                     press (LONG_PRESS) or repeats so far (REPEAT)
+    - timestamp_ns:  time.monotonic_ns() of the first press (CLICK), or 
+                     when the gesture happened (others)
+    - duration:      seconds the button has been held (0 for CLICK)
+
+"""
+import time
+import collections
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+CLICK         = "click"
+LONG_PRESS    = "long_press"
+REPEAT        = "repeat"
+RELEASE       = "release"
+
+# Recognizer states
+IDLE          = 0
+PRESSED       = 1
+RELEASED      = 2
+HELD          = 3
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+Gesture = collections.namedtuple("Gesture", ["kind", "count", "timestamp_ns", "duration"])
+
+
+class GestureRecognizer():
+    """ Gesture Recognizer Class """
+    button             = None
+    click_time_ns      = None
+    long_press_time_ns = None
+    repeat_time_ns     = None
+    max_clicks         = None
+    
+    state              = None
+    presses            = None
+    press_ns           = None
+    next_ns            = None
+    repeats            = None
+    pending_edge       = None
+    
+    def __init__(self, button, click_time=0.3, long_press_time=2.0, repeat_time=None, max_clicks=3):
+        """ Initialize variables """
+        if (max_clicks < 1):
+            raise ValueError("max_clicks must be at least 1")
+        
+        self.button             = button
+        self.click_time_ns      = int(click_time * 1e9)
+        self.long_press_time_ns = int(long_press_time * 1e9)
+        self.max_clicks         = max_clicks
+        
+        if repeat_time is not None:
+            self.repeat_time_ns = int(repeat_time * 1e9)
+        
+        self.presses            = collections.deque(maxlen=max_clicks)
+        
+        self.reset()
+    
+    # End def
+
+
+    def reset(self):
+        """ Forget the presses of the current gesture """
+        self.state        = IDLE
+        self.next_ns      = None
+        self.repeats      = 0
+        self.pending_edge = None
+        
+        self.presses.clear()
+
+    # End def
+
+
+    def _on_edge(self, pressed, timestamp_ns):
+        """ Process a press / release; return a Gesture or None """
+        if pressed:
+            if self.state in (IDLE, RELEASED):
+                self.presses.append(timestamp_ns)
+                
+                self.state    = PRESSED
+                self.press_ns = timestamp_ns
+                self.next_ns  = timestamp_ns + self.long_press_time_ns
+            
+            return None
+        
+        if (self.state == PRESSED):
+            if (len(self.presses) < self.max_clicks):
+                # Wait to see if this is the start of a double click
+                self.state   = RELEASED
+                self.next_ns = timestamp_ns + self.click_time_ns
+                return None
+            
+            gesture = Gesture(CLICK, len(self.presses), self.presses[0], 0)
+            
+            self.reset()
+            return gesture
+        
+        if (self.state == HELD):
+            gesture = Gesture(RELEASE, 0, timestamp_ns, (timestamp_ns - self.press_ns) / 1e9)
+            
+            self.reset()
+            return gesture
+        
+        return None
+
+    # End def
+
+
+    def _on_timeout(self, now_ns):
+        """ Process the deadline at now_ns; return a Gesture or None """
+        if (self.state == PRESSED):
+            # Long press fires while the button is still held
+            gesture = Gesture(LONG_PRESS, len(self.presses), now_ns, (now_ns - self.press_ns) / 1e9)
+            
+            self.state   = HELD
+            self.repeats = 0
+            self.presses.clear()
+            
+            if self.repeat_time_ns is None:
+                self.next_ns = None
+            else:
+                self.next_ns = now_ns + self.repeat_time_ns
+            
+            return gesture
+        
+        if (self.state == HELD):
+            self.repeats += 1
+            self.next_ns += self.repeat_time_ns
+            
+            # Skip repeats that were missed
+            if (self.next_ns <= time.monotonic_ns()):
+                self.next_ns = time.monotonic_ns() + self.repeat_time_ns
+            
+            return Gesture(REPEAT, self.repeats, now_ns, (now_ns - self.press_ns) / 1e9)
+        
+        if (self.state == RELEASED):
+            gesture = Gesture(CLICK, len(self.presses), self.presses[0], 0)
+            
+            self.state   = IDLE
+            self.next_ns = None
+            self.presses.clear()
+            
+            return gesture
+        
+        return None
+
+    # End def
+
+
+    def wait_for_gesture(self, timeout=None):
+        """ Wait for the next gesture (timeout in seconds; None waits forever)
+        
+           Returns:  Gesture - The gesture
+                     None    - Timeout
+        """
+        if timeout is None:
+            deadline_ns = None
+        else:
+            deadline_ns = time.monotonic_ns() + int(timeout * 1e9)
+        
+        while True:
+            # An edge that happened after a deadline was kept for later
+            if (self.pending_edge is not None):
+                if (self.next_ns is not None) and (self.pending_edge[1] >= self.next_ns):
+                    gesture = self._on_timeout(self.next_ns)
+                else:
+                    edge              = self.pending_edge
+                    self.pending_edge = None
+                    gesture           = self._on_edge(edge[0], edge[1])
+                
+                if gesture is not None:
+                    return gesture
+                
+                continue
+            
+            # Wait for an edge until the next gesture / caller deadline
+            wait_ns = self.next_ns
+            
+            if (deadline_ns is not None) and ((wait_ns is None) or (deadline_ns < wait_ns)):
+                wait_ns = deadline_ns
+            
+            if wait_ns is None:
+                edge = self.button.wait_for_edge()
+            else:
+                edge = self.button.wait_for_edge(max(0.0, (wait_ns - time.monotonic_ns()) / 1e9))
+            
+            if edge is not None:
+                self.pending_edge = edge
+                continue
+            
+            now_ns = time.monotonic_ns()
+            
+            if (self.next_ns is not None) and (now_ns >= self.next_ns):
+                gesture = self._on_timeout(self.next_ns)
+                
+                if gesture is not None:
+                    return gesture
+            
+            if (deadline_ns is not None) and (now_ns >= deadline_ns):
+                return None
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import button as BUTTON
+
+    print("Gesture Test")
+    
+    button   = BUTTON.Button("P2_2", interrupt=True)
+    gestures = GestureRecognizer(button, long_press_time=1.0, repeat_time=0.25)
+    
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    try:
+        while True:
+            gesture = gestures.wait_for_gesture()
+            print("    {0} {1} ({2:.2f} s)".format(gesture.kind, gesture.count, gesture.duration))
+        
+    except KeyboardInterrupt:
+        pass
+    
+    button.cleanup()
+    
+    print("Test Complete")
+
@@ -0,0 +1,259 @@
+"""
+--------------------------------------------------------------------------
+Button Press Events
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Press Events
+
+  A bounded queue of press / release events from a button thread to the 
+threads that use it.  Each edge is a small PressEvent record; consumers pull
+events at their own pace instead of reading attributes that the button 
+thread may be overwriting.
+
+  The queue does not use a lock:  appending to and popping from a 
+collections.deque are atomic, and each counter is only written by one side
+(produced by the button thread, consumed by the consumer), so the number of
+dropped events is produced - consumed - pending.  A threading.Event wakes
+up consumers waiting for an event.  There should be one producer.  The 
+counters are read without a lock, so get_stats() is only a snapshot:  while 
+the producer is calling put(), an event being added can already be counted 
+as produced but not yet be pending (or the other way round), and with more 
+than one consumer the consumed count can also miss events.  The statistics 
+are exact once the producer is idle and there is one consumer.
+
+  When the queue is full, the overflow policy decides which event is lost:
+  - DROP_OLDEST:  the oldest queued event is dropped (consumers always see 
+                  the most recent events)
+  - DROP_NEWEST:  the new event is dropped (consumers see the events in the
+                  queue without gaps)
+
+Software API:
+
+  PressEventQueue(maxsize=64, overflow=DROP_OLDEST)
+    - Provide the maximum number of queued events and the overflow policy
+    
+    put(pressed, timestamp_ns, duration=None)
+      - Add an event (called by the button thread)
+    
+    get(timeout=None)
+      - Return the next PressEvent; None on timeout
+      - Function consumes time
+    
+    get_all()
+      - Return a list of all queued events (does not wait)
+    
+    get_stats()
+      - Return a dictionary with the number of events produced, consumed, 
+        dropped and pending
+
+  PressEvent(sequence, pressed, timestamp_ns, duration)
+    - sequence:      event number (gaps show dropped events)
+    - pressed:       True for a press, False for a release
+    - timestamp_ns:  time.monotonic_ns() of the edge
+    - duration:      press duration in seconds (releases only)
+
+"""
+import time
+import threading
+import collections
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DROP_OLDEST   = "drop_oldest"
+DROP_NEWEST   = "drop_newest"
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+PressEvent = collections.namedtuple("PressEvent", ["sequence", "pressed", "timestamp_ns", "duration"])
+
+
+class PressEventQueue():
+    """ Bounded press event queue """
+    maxsize  = None
+    overflow = None
+    events   = None
+    ready    = None
+    produced = None
+    consumed = None
+    
+    def __init__(self, maxsize=64, overflow=DROP_OLDEST):
+        """ Initialize variables """
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError("Overflow must be DROP_OLDEST or DROP_NEWEST")
+        
+        if (maxsize < 1):
+            raise ValueError("Maxsize must be at least 1")
+        
+        self.maxsize  = maxsize
+        self.overflow = overflow
+        self.ready    = threading.Event()
+        self.produced = 0
+        self.consumed = 0
+        
+        # A full deque with a maxlen drops its oldest entry on append
+        if (overflow == DROP_OLDEST):
+            self.events = collections.deque(maxlen=maxsize)
+        else:
+            self.events = collections.deque()
+    
+    # End def
+
+
+    def put(self, pressed, timestamp_ns, duration=None):
+        """ Add an event (button thread) """
+        event          = PressEvent(self.produced, pressed, timestamp_ns, duration)
+        self.produced += 1
+        
+        if (self.overflow == DROP_NEWEST) and (len(self.events) >= self.maxsize):
+            return
+        
+        self.events.append(event)
+        self.ready.set()
+
+    # End def
+
+
+    def _pop(self):
+        """ Return the next event (None if the queue is empty) """
+        try:
+            event = self.events.popleft()
+        except IndexError:
+            return None
+        
+        self.consumed += 1
+        
+        return event
+
+    # End def
+
+
+    def get(self, timeout=None):
+        """ Return the next event; None on timeout """
+        # Another consumer may take the event that woke us up, so wait only
+        # for the time left rather than the full timeout again
+        deadline = None
+        
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        
+        while True:
+            event = self._pop()
+            
+            if event is not None:
+                return event
+            
+            # Clear, then check again so an event added in between is not missed
+            self.ready.clear()
+            
+            event = self._pop()
+            
+            if event is not None:
+                return event
+            
+            if deadline is None:
+                self.ready.wait()
+            else:
+                remaining = deadline - time.monotonic()
+                
+                if (remaining <= 0) or not self.ready.wait(remaining):
+                    return None
+
+    # End def
+
+
+    def get_all(self):
+        """ Return a list of all queued events """
+        events = []
+        event  = self._pop()
+        
+        while event is not None:
+            events.append(event)
+            event = self._pop()
+        
+        return events
+
+    # End def
+
+
+    def __len__(self):
+        """ Return the number of queued events """
+        return len(self.events)
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return the event statistics """
+        produced = self.produced
+        consumed = self.consumed
+        pending  = len(self.events)
+        
+        return {"produced" : produced,
+                "consumed" : consumed,
+                "dropped"  : max(0, produced - consumed - pending),
+                "pending"  : pending}
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Press Event Queue Test")
+    
+    for overflow in [DROP_OLDEST, DROP_NEWEST]:
+        queue = PressEventQueue(maxsize=4, overflow=overflow)
+        
+        for i in range(10):
+            queue.put((i % 2) == 0, time.monotonic_ns())
+        
+        print("{0}:".format(overflow))
+        print("    Sequence = {0}".format([event.sequence for event in queue.get_all()]))
+        print("    {0}".format(queue.get_stats()))
+    
+    print("Test Complete")
+
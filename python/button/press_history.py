@@ -0,0 +1,301 @@
+"""
+--------------------------------------------------------------------------
+Button Press History
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Press History
+
+  A fixed size history of button presses for tuning debounce and reset 
+times on a running system.  Each press is stored as (start time, duration,
+bounce count) in preallocated arrays used as a ring buffer, so recording a 
+press takes the same short time no matter how many presses there have been,
+and the oldest press is overwritten when the history is full.
+
+  The sum of the durations in the history is kept up to date as presses are 
+recorded, so the mean is available without a pass over the history.  The 
+median / 95th percentile are computed from a copy of the durations.
+
+  The button thread only holds the lock while it writes one entry, and 
+readers only hold it while they copy the arrays, so the history can be 
+read or exported while the button is running.
+
+Software API:
+
+  PressHistory(size=256)
+    - Provide the number of presses kept
+    
+    record(start_ns, duration_ns, bounces=0)
+      - Add a press (start in time.monotonic_ns(), duration in nanoseconds)
+    
+    get_presses()
+      - Return a list of (start_ns, duration, bounces) tuples, oldest first
+        (duration in seconds)
+    
+    get_stats(window=60.0)
+      - Return a dictionary with the number of presses in the history, 
+        the total number recorded, the mean / p50 / p95 press duration (in 
+        seconds), the mean number of bounces and the presses per minute 
+        over the last "window" seconds
+    
+    to_csv(file=None) / to_json(file=None)
+      - Return the history as CSV / JSON text; if a file name is provided,
+        also write it to the file
+    
+    clear()
+      - Remove all presses
+
+"""
+import io
+import csv
+import json
+import time
+import array
+import threading
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+CSV_HEADER    = ["start_ns", "duration", "bounces"]
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def _percentile(values, fraction):
+    """ Return the percentile of a sorted list (nearest rank) """
+    index = max(0, int(-(-fraction * len(values) // 1)) - 1)
+    
+    return values[index]
+
+# End def
+
+
+class PressHistory():
+    """ Ring buffer of button presses """
+    size           = None
+    start_ns       = None
+    duration_ns    = None
+    bounces        = None
+    index          = None    # Next entry to write
+    count          = None    # Number of valid entries
+    total          = None    # Number of presses recorded
+    duration_sum   = None
+    bounce_sum     = None
+    lock           = None
+    
+    def __init__(self, size=256):
+        """ Initialize variables """
+        if (size < 1):
+            raise ValueError("Size must be at least 1")
+        
+        self.size        = size
+        self.start_ns    = array.array("q", bytes(8 * size))
+        self.duration_ns = array.array("q", bytes(8 * size))
+        self.bounces     = array.array("l", [0] * size)
+        self.lock        = threading.Lock()
+        
+        self.clear()
+    
+    # End def
+
+
+    def clear(self):
+        """ Remove all presses """
+        with self.lock:
+            self.index        = 0
+            self.count        = 0
+            self.total        = 0
+            self.duration_sum = 0
+            self.bounce_sum   = 0
+
+    # End def
+
+
+    def record(self, start_ns, duration_ns, bounces=0):
+        """ Add a press """
+        with self.lock:
+            i = self.index
+            
+            # Remove the entry being overwritten from the sums
+            if (self.count == self.size):
+                self.duration_sum -= self.duration_ns[i]
+                self.bounce_sum   -= self.bounces[i]
+            else:
+                self.count += 1
+            
+            self.start_ns[i]     = start_ns
+            self.duration_ns[i]  = duration_ns
+            self.bounces[i]      = bounces
+            
+            self.duration_sum   += duration_ns
+            self.bounce_sum     += bounces
+            self.total          += 1
+            self.index           = (i + 1) % self.size
+
+    # End def
+
+
+    def _snapshot(self):
+        """ Return copies of the arrays (oldest first) and the sums """
+        with self.lock:
+            start_ns    = self.start_ns.tolist()
+            duration_ns = self.duration_ns.tolist()
+            bounces     = self.bounces.tolist()
+            index       = self.index
+            count       = self.count
+            total       = self.total
+            sums        = (self.duration_sum, self.bounce_sum)
+        
+        if (count == self.size):
+            order = list(range(index, self.size)) + list(range(index))
+        else:
+            order = list(range(count))
+        
+        return ([start_ns[i] for i in order], 
+                [duration_ns[i] for i in order], 
+                [bounces[i] for i in order], total, sums)
+
+    # End def
+
+
+    def get_presses(self):
+        """ Return a list of (start_ns, duration, bounces), oldest first """
+        (start_ns, duration_ns, bounces, total, sums) = self._snapshot()
+        
+        return [(start_ns[i], duration_ns[i] / 1e9, bounces[i]) 
+                for i in range(len(start_ns))]
+
+    # End def
+
+
+    def get_stats(self, window=60.0):
+        """ Return the press statistics (durations in seconds) """
+        (start_ns, duration_ns, bounces, total, sums) = self._snapshot()
+        
+        count = len(start_ns)
+        
+        if (count == 0):
+            return {"count" : 0, "total" : total, "mean" : None, "p50" : None, 
+                    "p95" : None, "mean_bounces" : None, "per_minute" : 0.0}
+        
+        durations = sorted(duration_ns)
+        
+        # Presses that started in the window
+        first_ns = time.monotonic_ns() - int(window * 1e9)
+        recent   = sum(1 for start in start_ns if start >= first_ns)
+        
+        return {"count"        : count,
+                "total"        : total,
+                "mean"         : (sums[0] / count) / 1e9,
+                "p50"          : _percentile(durations, 0.50) / 1e9,
+                "p95"          : _percentile(durations, 0.95) / 1e9,
+                "mean_bounces" : sums[1] / count,
+                "per_minute"   : recent * 60.0 / window}
+
+    # End def
+
+
+    def to_csv(self, file=None):
+        """ Return the history as CSV text (optionally write it to a file) """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        writer.writerow(CSV_HEADER)
+        writer.writerows(self.get_presses())
+        
+        text = output.getvalue()
+        
+        if file is not None:
+            with open(file, "w") as f:
+                f.write(text)
+        
+        return text
+
+    # End def
+
+
+    def to_json(self, file=None):
+        """ Return the history as JSON text (optionally write it to a file) """
+        data = {"stats"   : self.get_stats(),
+                "presses" : [dict(zip(CSV_HEADER, press)) for press in self.get_presses()]}
+        
+        text = json.dumps(data, indent=2)
+        
+        if file is not None:
+            with open(file, "w") as f:
+                f.write(text)
+        
+        return text
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import random
+
+    print("Press History Test")
+    
+    history = PressHistory(size=100)
+    now_ns  = time.monotonic_ns()
+    
+    # 150 presses of 50 - 500 ms over the last 30 seconds
+    for i in range(150):
+        history.record(now_ns - (150 - i) * 200000000, 
+                       random.randint(50, 500) * 1000000, 
+                       random.randint(0, 3))
+    
+    print("    Stats = {0}".format(history.get_stats()))
+    print(history.to_csv()[:120])
+    
+    # Time recording a press
+    start = time.perf_counter()
+    
+    for i in range(100000):
+        history.record(now_ns, 100000000, 1)
+    
+    print("    Record time = {0:.2f} us".format((time.perf_counter() - start) * 10))
+    
+    print("Test Complete")
+
@@ -45,12 +45,42 @@ button is not pressed) and will be connected to power when the button is pressed
 
   To select the pull up configuration, active_low=True.  To select the pull down
 configuration, active_low=False.
+
+  A debouncer (see debounce.py) can be provided so that contact bounce does
+not produce extra presses.  All times are measured with time.monotonic_ns().
+
+  The button thread waits on events rather than timers where it can:
+  - Stopping the button (cleanup()) wakes the thread immediately and joins
+    it, instead of waiting for the next sample
+  - In interrupt mode (interrupt=True or an edge_source is provided, see
+    edge_source.py), the thread blocks on kernel edge events and only wakes
+    up every "sleep_time" if there is a pressed / unpressed callback to 
+    execute, so an idle button uses no CPU
+  - Other threads can wait for a press with wait_for_press() instead of 
+    polling is_pressed()
+
+  Each press and release is also added to a bounded event queue (see 
+press_events.py) as a timestamped PressEvent.  Consumers pull events with
+get_event() at their own pace, so a slow consumer does not miss or mix up
+presses the way it can when reading get_last_press_duration() or the 
+callback values while the button thread is writing them.
+
+  The last "history_size" presses (start time, duration and the number of 
+bounces the debouncer rejected) are kept in a press history (see 
+press_history.py), which can be read or exported while the thread runs.
+
+  By default the button uses Adafruit_BBIO.GPIO.  Any object with the same 
+setup() / input() functions can be provided as the "backend" instead, e.g.
+MmapGPIO from gpio_mmap.py, which reads the GPIO registers directly.
+
+  To watch many buttons from one thread, see button_poller.py.
   
 
   
 Software API:
 
-  ThreadedButton(pin, sleep_time=0.1, active_low=True)
+  ThreadedButton(pin, sleep_time=0.1, active_low=True, debounce=None, interrupt=False, edge_source=None,
+                 event_queue_size=64, event_overflow=DROP_OLDEST, history_size=256, backend=None)
     - Provide pin that the button monitors
     - The sleep_time is the time between calls to the callback functions
       while the button is waiting in either the pressed or unpressed state
@@ -60,6 +90,15 @@ Software API:
       input is "High"/"1" when the button is not pressed, and the 
       input is "Low" / "0" when the button is pressed).  If false, 
       the button has the opposite polarity.
+    - Optionally provide the debouncer (e.g. TimeWindowDebouncer()) used to 
+      decide when the button is pressed / released
+    - If interrupt is True, a GPIOEdgeSource is created for the pin
+    - Optionally provide the edge source to use for interrupt mode
+    - The event queue holds at most event_queue_size events; when it is 
+      full, event_overflow (DROP_OLDEST or DROP_NEWEST) selects the event
+      that is dropped
+    - The press history keeps the last history_size presses
+    - Optionally provide the GPIO backend (default Adafruit_BBIO.GPIO)
     
     start()
       - Starts the button thread
@@ -70,9 +109,30 @@ Software API:
     
     get_last_press_duration()
       - Return the duration the button was last pressed
+    
+    wait_for_press(timeout=None)
+      - Wait until the button thread sees a press (timeout in seconds)
+      - Returns True if the button was pressed, False on timeout
+      - Function consumes time
+
+    get_event(timeout=None)
+      - Return the next PressEvent (pressed, timestamp_ns, duration) from
+        the event queue; None on timeout
+      - Function consumes time
+    
+    get_events()
+      - Return a list of all queued PressEvents (does not wait)
+    
+    get_event_stats()
+      - Return the number of events produced, consumed, dropped and pending
+    
+    get_press_history()
+      - Return the PressHistory of the button (e.g. get_stats(), to_csv())
 
-    cleanup()
-      - Stops the button so thread can exit
+    cleanup(timeout=None)
+      - Stops the button thread and waits for it to exit (timeout in 
+        seconds); returns True if the thread has exited
+      - The thread cannot be restarted; create a new ThreadedButton
       
     Callback Functions:
       These functions will be called at the various times during a button 
@@ -94,11 +154,19 @@ Software API:
       - get_on_release_callback_value()      
 
 """
+import os
 import time
+import select
 import threading
+import collections
 
 import Adafruit_BBIO.GPIO as GPIO
 
+import debounce      as DEBOUNCE
+import edge_source   as EDGE
+import press_events  as EVENTS
+import press_history as PRESS_HISTORY
+
 # ------------------------------------------------------------------------
 # Constants
 # ------------------------------------------------------------------------
@@ -106,6 +174,9 @@ import Adafruit_BBIO.GPIO as GPIO
 HIGH          = GPIO.HIGH
 LOW           = GPIO.LOW
 
+DROP_OLDEST   = EVENTS.DROP_OLDEST
+DROP_NEWEST   = EVENTS.DROP_NEWEST
+
 # ------------------------------------------------------------------------
 # Global variables
 # ------------------------------------------------------------------------
@@ -124,8 +195,25 @@ class ThreadedButton(threading.Thread):
     pressed_value                 = None
 
     sleep_time                    = None
-    stop_button                   = None
+    stop_event                    = None
+    press_event                   = None
     press_duration                = None
+    events                        = None
+    history                       = None
+    last_bounces                  = None
+    gpio                          = None
+
+    edge_source                   = None
+    own_edge_source               = None
+    edges                         = None
+    poller                        = None
+    stop_read                     = None
+    stop_write                    = None
+
+    raw_level                     = None
+    level                         = None
+    edge_time_ns                  = None
+    debouncer                     = None
 
     pressed_callback              = None
     pressed_callback_value        = None
@@ -136,7 +224,8 @@ class ThreadedButton(threading.Thread):
     on_release_callback           = None
     on_release_callback_value     = None
     
-    def __init__(self, pin=None, sleep_time=0.1, active_low=True):
+    def __init__(self, pin=None, sleep_time=0.1, active_low=True, debounce=None, interrupt=False, edge_source=None,
+                 event_queue_size=64, event_overflow=DROP_OLDEST, history_size=256, backend=None):
         """ Initialize variables and set up the button """
         # Call parent class constructor
         threading.Thread.__init__(self)
@@ -158,8 +247,27 @@ class ThreadedButton(threading.Thread):
 
         # Initialize Class Variables      
         self.sleep_time      = sleep_time
-        self.stop_button     = False
+        self.stop_event      = threading.Event()
+        self.press_event     = threading.Event()
         self.press_duration  = 0.0
+        self.events          = EVENTS.PressEventQueue(event_queue_size, event_overflow)
+        self.history         = PRESS_HISTORY.PressHistory(history_size)
+        self.last_bounces    = 0
+        self.debouncer       = debounce
+        
+        if backend is None:
+            self.gpio = GPIO
+        else:
+            self.gpio = backend
+        
+        # Interrupt mode:  edges not yet processed by the button
+        self.edge_source     = edge_source
+        self.own_edge_source = False
+        self.edges           = collections.deque()
+        
+        if interrupt and (edge_source is None):
+            self.edge_source     = EDGE.GPIOEdgeSource(self.pin)
+            self.own_edge_source = True
 
         # All callback functions and values set to None if not used        
         
@@ -171,8 +279,108 @@ class ThreadedButton(threading.Thread):
     
     def _setup(self):
         """ Setup the hardware components. """
-        # Initialize Button
-        GPIO.setup(self.pin, GPIO.IN)
+        # Initialize Button (in interrupt mode the edge source sets up the pin)
+        if self.edge_source is None:
+            self.gpio.setup(self.pin, self.gpio.IN)
+            self.raw_level = self.gpio.input(self.pin)
+        else:
+            self.raw_level = self.edge_source.level()
+            
+            # Wait on edges and on a pipe that is written to stop the thread
+            (self.stop_read, self.stop_write) = os.pipe()
+            
+            self.poller = select.poll()
+            self.poller.register(self.edge_source.fileno(), self.edge_source.poll_mask)
+            self.poller.register(self.stop_read, select.POLLIN)
+        
+        self.level        = self.raw_level
+        self.edge_time_ns = time.monotonic_ns()
+        
+        if self.debouncer is not None:
+            self.debouncer.reset(self.level, self.edge_time_ns)
+
+    # End def
+
+
+    def _record_press(self, press_time_ns, release_time_ns):
+        """ Add a press to the press history; the bounces are the raw edges
+           the debouncer rejected since the last press was recorded
+        """
+        bounces = 0
+        
+        if self.debouncer is not None:
+            bounces           = self.debouncer.get_bounces() - self.last_bounces
+            self.last_bounces = self.debouncer.get_bounces()
+        
+        self.history.record(press_time_ns, release_time_ns - press_time_ns, bounces)
+
+    # End def
+
+
+    def _read_level(self):
+        """ Return the (debounced) input level; edge_time_ns is the time 
+           the level last changed.
+        """
+        now_ns = time.monotonic_ns()
+        
+        if self.edge_source is None:
+            self.raw_level = self.gpio.input(self.pin)
+        else:
+            if not self.edges:
+                self.edges.extend(self.edge_source.read_edges())
+            
+            if self.edges:
+                (self.raw_level, now_ns) = self.edges.popleft()
+        
+        if self.debouncer is None:
+            if (self.raw_level != self.level):
+                self.level        = self.raw_level
+                self.edge_time_ns = now_ns
+        elif self.debouncer.update(self.raw_level, now_ns):
+            self.level        = self.debouncer.level
+            self.edge_time_ns = self.debouncer.change_ns
+        
+        return self.level
+
+    # End def
+
+
+    def _wait(self, callback):
+        """ Wait before reading the input level again.  In interrupt mode, 
+           wait for the next edge (at most "sleep_time" if there is a 
+           callback to execute).
+        
+           Returns:  True  - The button is being stopped
+                     False - Read the input level again
+        """
+        if self.edge_source is None:
+            return self.stop_event.wait(self.sleep_time)
+        
+        if self.edges:
+            # Edges are waiting to be processed
+            return self.stop_event.is_set()
+        
+        if callback is None:
+            timeout = None
+        else:
+            timeout = self.sleep_time
+        
+        # Wake up to finish a pending debounce even if no edge arrives
+        if self.debouncer is not None:
+            next_ns = self.debouncer.next_update_ns()
+            
+            if next_ns is not None:
+                remaining = max(0.0, (next_ns - time.monotonic_ns()) / 1e9)
+                
+                if (timeout is None) or (remaining < timeout):
+                    timeout = remaining
+        
+        if timeout is None:
+            self.poller.poll()
+        else:
+            self.poller.poll(int(-(-timeout * 1000 // 1)))
+        
+        return self.stop_event.is_set()
 
     # End def
 
@@ -183,65 +391,110 @@ class ThreadedButton(threading.Thread):
            Returns:  True  - Button is pressed
                      False - Button is not pressed
         """
-        return GPIO.input(self.pin) == self.pressed_value
+        if self.edge_source is not None:
+            return self.edge_source.level() == self.pressed_value
+        
+        return self.gpio.input(self.pin) == self.pressed_value
 
     # End def
 
 
     def run(self):
         """ Run the button thread.  Execute callbacks as appropriate. """
-        button_press_time     = None
+        button_press_time_ns  = None
 
         # Run button monitor until told to stop        
-        while(self.stop_button):
+        while not self.stop_event.is_set():
         
             # Wait for button press
             #   Execute the unpressed callback function based on the sleep time
             #
-            while(GPIO.input(self.pin) == self.unpressed_value):
+            while(self._read_level() == self.unpressed_value):
             
                 if self.unpressed_callback is not None:
                     self.unpressed_callback_value = self.unpressed_callback()
                 
-                if self.stop_button:
-                    break
-                
-                time.sleep(self.sleep_time)
+                if self._wait(self.unpressed_callback):
+                    return
             
             # Record time
-            button_press_time = time.time()
+            button_press_time_ns = self.edge_time_ns
+            
+            self.events.put(True, button_press_time_ns)
             
-            # Executed the on press callback function
+            # Executed the on press callback function; wake up any waiters
             if self.on_press_callback is not None:
                 self.on_press_callback_value = self.on_press_callback()
             
+            self.press_event.set()
+            
             # Wait for button release
             #   Execute the pressed callback function based on the sleep time
             #
-            while(GPIO.input(self.pin) == self.pressed_value):
+            while(self._read_level() == self.pressed_value):
             
                 if self.pressed_callback is not None:
                     self.pressed_callback_value = self.pressed_callback()
                     
-                if self.stop_button:
-                    break
-                    
-                time.sleep(self.sleep_time)
+                if self._wait(self.pressed_callback):
+                    return
             
             # Record the press duration
-            self.press_duration = time.time() - button_press_time
+            self.press_duration = (self.edge_time_ns - button_press_time_ns) / 1e9
+            
+            self.events.put(False, self.edge_time_ns, self.press_duration)
+            self._record_press(button_press_time_ns, self.edge_time_ns)
 
             # Executed the on release callback function
             if self.on_release_callback is not None:
                 self.on_release_callback_value = self.on_release_callback()        
         
-        # Set the flag and press duration to allow the button thread to restart
-        self.stop_button    = False
-        self.press_duration = 0.0
+    # End def
+
+
+    def wait_for_press(self, timeout=None):
+        """ Wait until the button thread sees a press.
+        
+           Returns:  True  - Button was pressed
+                     False - Timeout
+        """
+        if self.press_event.wait(timeout):
+            self.press_event.clear()
+            return True
         
+        return False
+
     # End def
 
     
+    def get_event(self, timeout=None):
+        """ Return the next press / release event; None on timeout """
+        return self.events.get(timeout)
+    
+    # End def
+    
+    
+    def get_events(self):
+        """ Return a list of all queued press / release events """
+        return self.events.get_all()
+    
+    # End def
+    
+    
+    def get_event_stats(self):
+        """ Return the event queue statistics """
+        return self.events.get_stats()
+    
+    # End def
+    
+    
+    def get_press_history(self):
+        """ Return the press history """
+        return self.history
+    
+    # End def
+    
+    
     def get_last_press_duration(self):
         """ Return the last press duration """
         return self.press_duration
@@ -249,14 +502,32 @@ class ThreadedButton(threading.Thread):
     # End def
     
     
-    def cleanup(self):
+    def cleanup(self, timeout=None):
         """ Clean up the button hardware. """
         # Nothing to do for GPIO; stop the thread and wait for completion
+        self.stop_event.set()
+        
+        if self.stop_write is not None:
+            os.write(self.stop_write, b"\x00")
+        
+        if self.is_alive():
+            self.join(timeout)
         
-        self.stop_button = True
+        if self.is_alive():
+            return False
         
-        while (self.stop_button):
-            time.sleep(self.sleep_time)
+        if self.own_edge_source:
+            self.edge_source.close()
+            self.own_edge_source = False
+        
+        if self.stop_read is not None:
+            os.close(self.stop_read)
+            os.close(self.stop_write)
+            
+            self.stop_read  = None
+            self.stop_write = None
+        
+        return True
     
     # End def
     
@@ -336,8 +607,8 @@ if __name__ == '__main__':
     print("Threaded Button Test")
 
     # Create instantiation of the buttons and LEDs
-    button_0 = ThreadedButton("P2_2")
-    button_1 = ThreadedButton("P2_8")
+    button_0 = ThreadedButton("P2_2", sleep_time=0.01, debounce=DEBOUNCE.TimeWindowDebouncer())
+    button_1 = ThreadedButton("P2_8", sleep_time=0.01, debounce=DEBOUNCE.IntegratorDebouncer(), interrupt=True)
 
     try:
         # Set up the LEDs
@@ -375,19 +646,17 @@ if __name__ == '__main__':
     button_0.start()
     button_1.start()
     
-    # Get the main thread
-    main_thread = threading.currentThread()
-    
     # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
     try:
         while (True):
-            # Do nothing in the main thread
-            time.sleep(1)
+            # Wait for presses in the main thread
+            if button_0.wait_for_press(1.0):
+                print("Button 0 pressed")
         
     except KeyboardInterrupt:
-        # Clean up the hardware
-        button_0.cleanup()
-        button_1.cleanup()
+        # Clean up the hardware; wait for the threads to complete
+        button_0.cleanup(timeout=1.0)
+        button_1.cleanup(timeout=1.0)
 
         try:
             led_0.cleanup()
@@ -395,10 +664,5 @@ if __name__ == '__main__':
         except:
             pass
 
-    # Wait for threads to complete        
-    for t in threading.enumerate():
-        if t is not main_thread:
-            t.join()
-
     print("Test Complete")
 
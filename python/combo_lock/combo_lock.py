@@ -62,12 +62,14 @@ Uses:
 """
 import time
 
-import ht16k33       as HT16K33
-import button        as BUTTON
-import potentiometer as POT
-import servo         as SERVO
-import led           as LED
-import buzzer_music  as MUSIC
+import ht16k33           as HT16K33
+import button            as BUTTON
+import gesture           as GESTURE
+import callback_executor as CALLBACK
+import potentiometer     as POT
+import servo             as SERVO
+import led               as LED
+import buzzer_music      as MUSIC
 
 # ------------------------------------------------------------------------
 # Constants
@@ -92,8 +94,10 @@ class CombinationLock():
     """ CombinationLock """
     reset_time     = None
     button         = None
+    gestures       = None
     red_led        = None
     green_led      = None
+    leds           = None
     potentiometer  = None
     servo          = None
     display        = None
@@ -109,11 +113,14 @@ class CombinationLock():
 
         self.reset_time     = reset_time
         self.button         = BUTTON.Button(button)
+        self.gestures       = GESTURE.GestureRecognizer(self.button, long_press_time=reset_time, max_clicks=1)
         self.red_led        = LED.LED(red_led)
         self.green_led      = LED.LED(green_led)
+        self.leds           = LED.LEDGroup({"red" : self.red_led, "green" : self.green_led})
         self.potentiometer  = POT.Potentiometer(potentiometer)
         self.servo          = SERVO.Servo(servo, default_position=SERVO_LOCK)
-        self.display        = HT16K33.HT16K33(i2c_bus, i2c_address)
+        self.display        = HT16K33.HT16K33(i2c_bus, i2c_address, asynchronous=True, lazy=True,
+                                              state_file=HT16K33.HT16K33_STATE_FILE)
         self.buzzer         = MUSIC.BuzzerMusic(buzzer)
         self.debug          = debug
         
@@ -143,8 +150,7 @@ class CombinationLock():
             print("lock()")
         
         # Set LEDs
-        self.red_led.on()
-        self.green_led.off()
+        self.leds.set({"red" : True, "green" : False})
         
         # Set servo to "locked"
         self.servo.turn(SERVO_LOCK)
@@ -161,8 +167,7 @@ class CombinationLock():
             print("unlock()")
             
         # Set LEDs
-        self.red_led.off()
-        self.green_led.on()
+        self.leds.set({"red" : False, "green" : True})
         # Set servo to "unlocked"
         self.servo.turn(SERVO_UNLOCK)
         
@@ -214,7 +219,10 @@ class CombinationLock():
             # Wait for button press (do nothing)
             self.button.wait_for_press()
             # Set button unpressed callback function
-            self.button.set_unpressed_callback(self.show_analog_value)
+            #   - Runs on the callback executor so the slow ADC read / display 
+            #     update does not delay sampling the button; only the latest
+            #     value is shown
+            self.button.set_unpressed_callback(self.show_analog_value, policy=CALLBACK.LATEST)
             # Wait for button press (show analog value)
             self.button.wait_for_press()
             # Get callback function value from button
@@ -284,13 +292,14 @@ class CombinationLock():
                     print("Combination Passed")
                 # Unlock the lock
                 self.unlock()
-                # Wait for button press
-                self.button.wait_for_press()
-                # Get press duration
-                press_duration = self.button.get_last_press_duration()
-                # If greater than reset_time, program lock, else lock the lock
-                if press_duration > self.reset_time:
+                # Wait for a click or a long press
+                gesture = self.gestures.wait_for_gesture()
+                # If held for reset_time, program lock, else lock the lock
+                if (gesture.kind == GESTURE.LONG_PRESS):
                     program = True
+                    # Show "Prog" while the button is still held; wait for release
+                    self.set_display_prog()
+                    self.gestures.wait_for_gesture()
                 else:
                     self.lock()
                     
@@ -332,6 +341,7 @@ class CombinationLock():
         
         # Set Display to show program is complete
         self.display.text("done")
+        self.display.close()
 
         # Clean up hardware
         self.button.cleanup()
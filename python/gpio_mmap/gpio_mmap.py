@@ -0,0 +1,441 @@
+"""
+--------------------------------------------------------------------------
+GPIO Memory Mapped Registers
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+GPIO Memory Mapped Registers
+
+  A GPIO backend that reads and writes the AM335x GPIO bank registers 
+directly through a memory map of /dev/mem, instead of one Adafruit_BBIO.GPIO
+call per pin.  Each of the four GPIO banks controls 32 pins:
+  - Setting bits in SETDATAOUT / CLEARDATAOUT drives output pins high / low;
+    pins whose bit is 0 are not changed, so several pins on one bank change
+    in a single atomic write without a read-modify-write of DATAOUT
+  - DATAIN holds the level of all 32 pins, so many inputs on one bank are 
+    sampled with a single read
+  - OE (output enable) selects the direction of each pin (1 = input)
+
+  MmapGPIO has the same setup() / input() / output() / cleanup() functions
+and IN / OUT / HIGH / LOW constants as Adafruit_BBIO.GPIO, so it can be 
+passed as the "backend" of an LED, Button or ButtonPoller.  Pins are given
+by header name (e.g. "P2_2" or "P2_02", "USR3") or GPIO number.
+
+  The pins must still be configured as GPIO (e.g. with config-pin in 
+configure_pins.sh), and the program must be able to open /dev/mem (i.e. 
+run as root).
+
+  If the path is a regular file instead of /dev/mem, the banks are mapped 
+one after another at the start of the file (bank N at N * GPIO_BANK_SIZE) 
+and the hardware is emulated:  writes to SETDATAOUT / CLEARDATAOUT update 
+DATAOUT, and DATAIN follows DATAOUT for output pins.  Input levels can be 
+changed with set_input() (the file can also be shared with another 
+process).  This allows the backend to be tested without hardware.
+
+Software API:
+
+  MmapGPIO(path="/dev/mem")
+    - Provide the path of /dev/mem or of a file to emulate the hardware 
+      (the file is created / extended as needed; a missing /dev/mem is an 
+      error)
+    
+    setup(pin, direction)
+      - Set the direction of the pin (IN or OUT)
+    
+    input(pin)
+      - Return the level of the pin (HIGH or LOW)
+    
+    output(pin, value)
+      - Set the level of an output pin (HIGH or LOW)
+    
+    output_pins(values)
+      - Set the levels of many output pins from a dictionary {pin : value}
+      - Pins on the same bank change in one atomic write
+    
+    input_pins(pins)
+      - Return a dictionary {pin : level} of many pins with one read of 
+        each bank used
+    
+    set_input(pin, value)
+      - Emulation only:  set the level of an input pin
+    
+    cleanup()
+      - Unmap the registers and close the file
+
+  get_gpio_number(pin)
+    - Return the GPIO number of a header pin name
+
+"""
+import os
+import mmap
+import stat
+import threading
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH                  = 1
+LOW                   = 0
+IN                    = 1
+OUT                   = 0
+
+DEV_MEM               = "/dev/mem"
+
+# AM335x GPIO bank base addresses (physical)
+GPIO_BANKS            = [0x44E07000, 0x4804C000, 0x481AC000, 0x481AE000]
+GPIO_BANK_SIZE        = 0x1000
+
+# GPIO register offsets
+GPIO_OE               = 0x134
+GPIO_DATAIN           = 0x138
+GPIO_DATAOUT          = 0x13C
+GPIO_CLEARDATAOUT     = 0x190
+GPIO_SETDATAOUT       = 0x194
+
+# PocketBeagle header pin to GPIO number (bank = gpio // 32, bit = gpio % 32)
+POCKETBEAGLE_PINS     = {
+    "P1_02" :  87, "P1_04" :  89, "P1_06" :   5, "P1_08" :   2, 
+    "P1_10" :   3, "P1_12" :   4, "P1_20" :  20, "P1_26" :  12, 
+    "P1_28" :  13, "P1_29" : 117, "P1_30" :  43, "P1_31" : 114, 
+    "P1_32" :  42, "P1_33" : 111, "P1_34" :  26, "P1_35" :  88, 
+    "P1_36" : 110, 
+    "P2_01" :  50, "P2_02" :  59, "P2_03" :  23, "P2_04" :  58, 
+    "P2_05" :  30, "P2_06" :  57, "P2_07" :  31, "P2_08" :  60, 
+    "P2_09" :  15, "P2_10" :  52, "P2_11" :  14, "P2_17" :  65, 
+    "P2_18" :  47, "P2_19" :  27, "P2_20" :  64, "P2_22" :  46, 
+    "P2_24" :  44, "P2_25" :  41, "P2_27" :  40, "P2_28" : 116, 
+    "P2_29" :   7, "P2_30" : 113, "P2_31" :  19, "P2_32" : 112, 
+    "P2_33" :  45, "P2_34" : 115, "P2_35" :  86, 
+    "USR0"  :  53, "USR1"  :  54, "USR2"  :  55, "USR3"  :  56
+}
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def get_gpio_number(pin):
+    """ Return the GPIO number of a pin name (e.g. "P2_2", "USR3") """
+    if isinstance(pin, int):
+        return pin
+    
+    name = pin.upper()
+    
+    # Allow "P2_2" as well as "P2_02"
+    if name.startswith("P") and ("_" in name):
+        (header, number) = name.split("_", 1)
+        name = "{0}_{1:02d}".format(header, int(number))
+    
+    if name not in POCKETBEAGLE_PINS:
+        raise ValueError("Unknown GPIO pin: {0}".format(pin))
+    
+    return POCKETBEAGLE_PINS[name]
+
+# End def
+
+
+class MmapGPIO():
+    """ GPIO backend using the GPIO bank registers """
+    HIGH        = HIGH
+    LOW         = LOW
+    IN          = IN
+    OUT         = OUT
+    
+    path        = None
+    emulate     = None
+    fd          = None
+    maps        = None
+    registers   = None    # 32 bit views of the bank maps
+    pins        = None    # Cache of pin -> (bank, mask)
+    lock        = None
+    
+    def __init__(self, path=DEV_MEM):
+        """ Initialize variables and map the GPIO banks """
+        self.path      = path
+        self.maps      = []
+        self.registers = []
+        self.pins      = {}
+        self.lock      = threading.Lock()
+        
+        self._setup()
+    
+    # End def
+
+
+    def _setup(self):
+        """ Map the GPIO banks """
+        flags = os.O_RDWR | os.O_SYNC
+        
+        if os.path.exists(self.path):
+            self.emulate = stat.S_ISREG(os.stat(self.path).st_mode)
+        elif (self.path == DEV_MEM):
+            raise ValueError("{0} not found; provide a file path to emulate the GPIO banks".format(DEV_MEM))
+        else:
+            # Only an emulation file may be created
+            self.emulate = True
+            flags       |= os.O_CREAT
+        
+        self.fd = os.open(self.path, flags)
+        new     = False
+        
+        if self.emulate:
+            size = len(GPIO_BANKS) * GPIO_BANK_SIZE
+            
+            if (os.fstat(self.fd).st_size < size):
+                os.ftruncate(self.fd, size)
+                new = True
+        
+        for (bank, address) in enumerate(GPIO_BANKS):
+            if self.emulate:
+                offset = bank * GPIO_BANK_SIZE
+            else:
+                offset = address
+            
+            bank_map = mmap.mmap(self.fd, GPIO_BANK_SIZE, offset=offset)
+            
+            self.maps.append(bank_map)
+            self.registers.append(memoryview(bank_map).cast("I"))
+        
+        # As after reset, all pins of a new emulated bank are inputs
+        if new:
+            for registers in self.registers:
+                registers[GPIO_OE // 4] = 0xFFFFFFFF
+
+    # End def
+
+
+    def _get_pin(self, pin):
+        """ Return the (bank, mask) of a pin """
+        if pin not in self.pins:
+            gpio           = get_gpio_number(pin)
+            self.pins[pin] = (gpio // 32, 1 << (gpio % 32))
+        
+        return self.pins[pin]
+
+    # End def
+
+
+    def _write(self, bank, set_mask, clear_mask):
+        """ Set / clear output bits of a bank """
+        registers = self.registers[bank]
+        
+        if not self.emulate:
+            if set_mask:
+                registers[GPIO_SETDATAOUT // 4]   = set_mask
+            if clear_mask:
+                registers[GPIO_CLEARDATAOUT // 4] = clear_mask
+            return
+        
+        # Emulate the set / clear registers and the DATAIN of output pins
+        with self.lock:
+            dataout = (registers[GPIO_DATAOUT // 4] | set_mask) & ~clear_mask
+            outputs = ~registers[GPIO_OE // 4] & 0xFFFFFFFF
+            datain  = registers[GPIO_DATAIN // 4]
+            
+            registers[GPIO_DATAOUT // 4] = dataout
+            registers[GPIO_DATAIN // 4]  = (datain & ~outputs) | (dataout & outputs)
+
+    # End def
+
+
+    def setup(self, pin, direction):
+        """ Set the direction of the pin """
+        (bank, mask) = self._get_pin(pin)
+        registers    = self.registers[bank]
+        
+        with self.lock:
+            if (direction == IN):
+                registers[GPIO_OE // 4] = registers[GPIO_OE // 4] | mask
+            else:
+                registers[GPIO_OE // 4] = registers[GPIO_OE // 4] & ~mask
+
+    # End def
+
+
+    def input(self, pin):
+        """ Return the level of the pin """
+        (bank, mask) = self._get_pin(pin)
+        
+        if (self.registers[bank][GPIO_DATAIN // 4] & mask):
+            return HIGH
+        
+        return LOW
+
+    # End def
+
+
+    def output(self, pin, value):
+        """ Set the level of an output pin """
+        (bank, mask) = self._get_pin(pin)
+        
+        if value:
+            self._write(bank, mask, 0)
+        else:
+            self._write(bank, 0, mask)
+
+    # End def
+
+
+    def output_pins(self, values):
+        """ Set the levels of many output pins (one write per bank) """
+        masks = {}
+        
+        for (pin, value) in values.items():
+            (bank, mask)           = self._get_pin(pin)
+            (set_mask, clear_mask) = masks.get(bank, (0, 0))
+            
+            if value:
+                set_mask   |= mask
+            else:
+                clear_mask |= mask
+            
+            masks[bank] = (set_mask, clear_mask)
+        
+        for (bank, (set_mask, clear_mask)) in masks.items():
+            self._write(bank, set_mask, clear_mask)
+
+    # End def
+
+
+    def input_pins(self, pins):
+        """ Return {pin : level} of many pins (one read per bank) """
+        datain = {}
+        levels = {}
+        
+        for pin in pins:
+            (bank, mask) = self._get_pin(pin)
+            
+            if bank not in datain:
+                datain[bank] = self.registers[bank][GPIO_DATAIN // 4]
+            
+            if (datain[bank] & mask):
+                levels[pin] = HIGH
+            else:
+                levels[pin] = LOW
+        
+        return levels
+
+    # End def
+
+
+    def set_input(self, pin, value):
+        """ Set the level of an input pin (emulation only) """
+        if not self.emulate:
+            raise ValueError("set_input() is only available when emulating the hardware")
+        
+        (bank, mask) = self._get_pin(pin)
+        registers    = self.registers[bank]
+        
+        with self.lock:
+            if value:
+                registers[GPIO_DATAIN // 4] = registers[GPIO_DATAIN // 4] | mask
+            else:
+                registers[GPIO_DATAIN // 4] = registers[GPIO_DATAIN // 4] & ~mask
+
+    # End def
+
+
+    def cleanup(self):
+        """ Unmap the registers and close the file """
+        for registers in self.registers:
+            registers.release()
+        
+        for bank_map in self.maps:
+            bank_map.close()
+        
+        self.registers = []
+        self.maps      = []
+        
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    # Use /dev/mem on hardware; otherwise emulate with a file
+    if os.path.exists(DEV_MEM) and (os.geteuid() == 0) and ("--emulate" not in sys.argv):
+        path = DEV_MEM
+    else:
+        path = "/tmp/gpio_mmap_test.bin"
+
+    print("GPIO Memory Map Test ({0})".format(path))
+    
+    gpio = MmapGPIO(path)
+    leds = ["USR0", "USR1", "USR2", "USR3"]
+    
+    for led in leds:
+        gpio.setup(led, OUT)
+    
+    # Count in binary on the USR LEDs:  all four change in one write
+    for count in range(16):
+        gpio.output_pins({led : (count >> i) & 1 for (i, led) in enumerate(leds)})
+        print("    {0:2d}: {1}".format(count, gpio.input_pins(leds)))
+        time.sleep(0.1)
+    
+    # Time one write of four pins vs. four writes
+    start = time.perf_counter()
+    
+    for i in range(10000):
+        gpio.output_pins({led : i & 1 for led in leds})
+    
+    batch = (time.perf_counter() - start) / 10000
+    start = time.perf_counter()
+    
+    for i in range(10000):
+        for led in leds:
+            gpio.output(led, i & 1)
+    
+    single = (time.perf_counter() - start) / 10000
+    
+    print("    4 pins:  output_pins() = {0:.1f} us, output() x 4 = {1:.1f} us".format(batch * 1e6, single * 1e6))
+    
+    gpio.output_pins({led : LOW for led in leds})
+    gpio.cleanup()
+    
+    print("Test Complete")
+
@@ -33,9 +33,29 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 --------------------------------------------------------------------------
 Software API:
 
-  HT16K33(bus, address=0x70)
+  HT16K33(bus, address=0x70, transport=None, asynchronous=False, auto_flush=True, lazy=False, state_file=None)
     - Provide i2c bus that dispaly is on
     - Provide i2c address for the display
+    - Optionally provide the transport used to talk to the display (by 
+      default an I2CBus() is opened for the given bus)
+    - If asynchronous is True, display writes are done by a background 
+      writer thread so the functions below return without waiting on the
+      bus.  The writer always sends the most recent display contents, so 
+      intermediate updates that were overwritten before they could be 
+      sent are skipped.
+    - If auto_flush is False, the functions below only update the buffer 
+      and the display is written by flush() (or by a HT16K33Manager)
+    - If lazy is True, the display is not blanked when it is created.  The
+      first render writes all of the display RAM, which also clears the 
+      rest of the display.  Use this when the program draws on the 
+      display right away.
+    - If a state_file is provided, the blink / brightness settings sent to
+      the display are saved in that file along with the kernel boot id.  
+      On the next start during the same boot, setup commands that would 
+      not change the display are skipped.  Only use this if the display 
+      is powered with the board (i.e. it keeps its settings between runs).
+      HT16K33_STATE_FILE can be used as a default state file.
+      See ht16k33_benchmark.py for the startup time of each mode.
     
     clear()
       - Sets value of display to "0000"
@@ -49,10 +69,128 @@ Software API:
     update(value)
       - Update the value on the display.  Value must be between 0 and 9999.
 
+    update_signed(value)
+      - Update the value on the display.  Value must be between -999 and 9999.
+        Negative values are shown with a leading "-".
+
+    update_float(value, decimals=None)
+      - Update the value on the display with a decimal point.  If decimals 
+        is None, the most decimal places that fit on the display are used.
+        The rounded value must be between -999 and 9999.
+
+    update_hex(value)
+      - Update the value on the display in hex.  Value must be between 
+        0x0000 and 0xFFFF.
+
+    set_digits_raw(data)
+      - Update all four digits of the display using raw data values
+
     text(value)
       - Update the value on the display with text.
         The following characters are supported:
             "abcdefghijlnopqrstuyABCDEFGHIJLNOPQRSTUY? -"
+        A "." turns on the decimal point of the previous character, so 
+        "1.2.3.4" is valid text.
+
+    The display keeps a copy of the display RAM (buffer) and a copy of 
+    what the chip is known to show.  Only registers that differ are sent.
+    
+    flush()
+      - Send any registers that differ from what the display shows.  All
+        of the functions above flush automatically unless inside batch().
+      - In asynchronous mode, wait until the writer thread has sent the 
+        current display contents.
+    
+    batch()
+      - Context manager that defers the flush until the end of the block:
+          with display.batch():
+              display.set_digit(0, 1)
+              display.set_colon(True)
+    
+    invalidate()
+      - Forget what the display shows so the next flush rewrites all RAM
+    
+    get_stats()
+      - Return a dictionary with the number of RAM bytes written, RAM 
+        bytes skipped (unchanged, so not sent), flush transactions and 
+        commands written / skipped (unchanged, so not sent).
+        In asynchronous mode, the number of frames requested and the 
+        number of frames written by the writer thread are also included.
+    
+    reset_stats()
+      - Reset the statistics counters
+
+  Brightness / blink:
+    The current brightness and blink settings are remembered, so commands
+    that would not change the display are not sent.  Each function returns
+    True if a command was sent.  See ht16k33_effects.py for fades, pulses
+    and alerts.
+    
+    set_brightness(brightness)
+      - Set the brightness (HT16K33_BRIGHTNESS_DARKEST (0) to 
+        HT16K33_BRIGHTNESS_HIGHEST (15))
+    
+    set_blink(blink)
+      - Set the hardware blink rate (HT16K33_BLINK_OFF, HT16K33_BLINK_2HZ,
+        HT16K33_BLINK_1HZ or HT16K33_BLINK_HALFHZ)
+    
+    set_display_on(enable)
+      - Turn the display on / off (display RAM is kept)
+
+  Key scan:
+    The HT16K33 scans a key matrix of up to 39 keys (K1 - K3 x KS0 - KS12)
+    on its own.  Key number = (13 * K) + KS, where K is 0 - 2 for K1 - K3.
+    See ht16k33_keypad.py for debounced press / release events.
+    
+    set_row_int(mode)
+      - Set the ROW15/INT pin to be a row driver (HT16K33_ROWINT_ROW) or a 
+        key interrupt output (HT16K33_ROWINT_INT_LOW / _INT_HIGH)
+    
+    read_keys()
+      - Read the key RAM in one transaction and return a bit mask of the
+        pressed keys (bit n set = key n pressed)
+    
+    read_key_interrupt()
+      - Return True if the chip has latched a key press since the key RAM
+        was last read
+
+    close()
+      - Wait for any pending writes; stop the writer thread (if any); 
+        save the display settings (if a state_file was provided); close 
+        the transport (if it was not provided to the display)
+
+  Transports:
+    All register access goes through a transport object that provides:
+      write_byte(address, value)
+      write_byte_data(address, register, value)
+      write_block_data(address, register, data)
+      read_block_data(address, register, length)
+      write_many(messages)
+        - Write a list of (address, data) messages in one bus pass
+      close()
+
+    I2CBus(bus)
+      - Native transport; holds /dev/i2c-<bus> open and selects the 
+        device with the I2C_SLAVE ioctl (no process per transaction)
+      - write_many() sends all messages with a single I2C_RDWR ioctl
+
+    I2CSetBus(bus)
+      - Legacy transport using the i2c-tools programs (i2cset / i2cget);
+        one process per byte
+
+    FakeI2CBus(filename=None)
+      - Memory backed bus for testing without hardware.  If a filename is 
+        provided, the register space is kept in that file (via mmap) so it
+        can be inspected by another process.
+      - get_ram(address, register=0x00, length=16) returns the register
+        contents written to a device
+
+  Segment tables:
+    Numbers are rendered with a lookup in precomputed segment tables (built
+    the first time they are used) and text is compiled once per string by
+    compile_text(value), which returns the four raw digit values.
+    text_segments(value) returns the raw digit values for text of any 
+    length (e.g. for scrolling messages).
   
 --------------------------------------------------------------------------
 Background Information: 
@@ -74,6 +212,14 @@ Background Information:
         
 """
 import os
+import json
+import mmap
+import ctypes
+import functools
+import contextlib
+import fcntl
+import threading
+import subprocess
 
 
 # ------------------------------------------------------------------------
@@ -141,6 +287,9 @@ HT16K33_BLINK_2HZ           = 0x02
 HT16K33_BLINK_1HZ           = 0x04
 HT16K33_BLINK_HALFHZ        = 0x06
 
+HT16K33_BLINK_RATES         = [HT16K33_BLINK_OFF, HT16K33_BLINK_2HZ, 
+                               HT16K33_BLINK_1HZ, HT16K33_BLINK_HALFHZ]
+
 HT16K33_SYSTEM_SETUP        = 0x20
 HT16K33_OSCILLATOR          = 0x01
 
@@ -148,48 +297,723 @@ HT16K33_BRIGHTNESS_CMD      = 0xE0
 HT16K33_BRIGHTNESS_HIGHEST  = 0x0F
 HT16K33_BRIGHTNESS_DARKEST  = 0x00
 
+HT16K33_ROWINT_CMD          = 0xA0
+HT16K33_ROWINT_ROW          = 0x00       # ROW15/INT pin is a row driver
+HT16K33_ROWINT_INT_LOW      = 0x01       # ROW15/INT pin is an active low interrupt
+HT16K33_ROWINT_INT_HIGH     = 0x03       # ROW15/INT pin is an active high interrupt
+
+HT16K33_RAM_SIZE            = 16         # Display RAM:  0x00 - 0x0F
+
+HT16K33_KEY_RAM_ADDR        = 0x40       # Key RAM:      0x40 - 0x45
+HT16K33_KEY_RAM_SIZE        = 6
+HT16K33_KEY_INT_ADDR        = 0x60       # Interrupt flag
+HT16K33_KEYS_PER_ROW        = 13         # KS0 - KS12
+HT16K33_KEY_COUNT           = 39         # K1 - K3 x KS0 - KS12
+
 # Maximum decimal value that can be displayed on 4 digit Hex Display
 HT16K33_MAX_VALUE           = 9999
+HT16K33_MIN_VALUE           = -999
+HT16K33_MAX_HEX_VALUE       = 0xFFFF
 
+HT16K33_DIGITS              = 4
+MINUS_VALUE                 = LETTERS["-"]
+
+# Linux I2C interface (see linux/i2c-dev.h)
+I2C_SLAVE                   = 0x0703     # ioctl to set the slave address
+I2C_RDWR                    = 0x0707     # ioctl for combined transactions
+I2C_RDWR_MAX_MSGS           = 42         # Maximum messages per I2C_RDWR ioctl
+
+# Kernel boot id; saved display state is only valid during the same boot
+BOOT_ID_PATH                = "/proc/sys/kernel/random/boot_id"
+HT16K33_STATE_FILE          = "/tmp/ht16k33_state.json"
+
+# Size of the register space emulated per device by FakeI2CBus
+FAKE_I2C_REGISTERS          = 0x100
+FAKE_I2C_ADDRESSES          = 0x80
+
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# Segment tables (see _decimal_table() / _hex_table())
+_DECIMAL_TABLE              = None
+_HEX_TABLE                  = None
 
 # ------------------------------------------------------------------------
 # Functions / Classes
 # ------------------------------------------------------------------------
-class HT16K33():
-    """ Class to manage a HT16K33 I2C display """
+class _I2CMsg(ctypes.Structure):
+    """ struct i2c_msg (see linux/i2c.h) """
+    _fields_ = [("addr",  ctypes.c_uint16),
+                ("flags", ctypes.c_uint16),
+                ("len",   ctypes.c_uint16),
+                ("buf",   ctypes.POINTER(ctypes.c_uint8))]
+
+# End class
+
+
+class _I2CRdwrData(ctypes.Structure):
+    """ struct i2c_rdwr_ioctl_data (see linux/i2c-dev.h) """
+    _fields_ = [("msgs",  ctypes.POINTER(_I2CMsg)),
+                ("nmsgs", ctypes.c_uint32)]
+
+# End class
+
+
+class I2CBus():
+    """ Native I2C transport using a persistent /dev/i2c-N file descriptor """
     bus     = None
+    fd      = None
     address = None
-    command = None
+    lock    = None
+    
+    def __init__(self, bus):
+        """ Open the I2C bus device """
+        self.bus     = bus
+        self.fd      = os.open("/dev/i2c-{0}".format(bus), os.O_RDWR)
+        self.address = None
+        self.lock    = threading.Lock()
+    
+    # End def
+    
+    
+    def _select(self, address):
+        """Select the device to talk to (ioctl only issued on a change)"""
+        if (address != self.address):
+            fcntl.ioctl(self.fd, I2C_SLAVE, address)
+            self.address = address
+
+    # End def
+
+
+    def write_byte(self, address, value):
+        """Write a single command byte to the device"""
+        with self.lock:
+            self._select(address)
+            os.write(self.fd, bytes([value]))
+
+    # End def
+
+
+    def write_byte_data(self, address, register, value):
+        """Write a single byte to the given register of the device"""
+        with self.lock:
+            self._select(address)
+            os.write(self.fd, bytes([register, value]))
+
+    # End def
+
+
+    def write_block_data(self, address, register, data):
+        """Write a block of bytes starting at the given register in one 
+        transaction (the HT16K33 auto-increments the RAM address)
+        """
+        with self.lock:
+            self._select(address)
+            os.write(self.fd, bytes([register]) + bytes(data))
+
+    # End def
+
+
+    def read_block_data(self, address, register, length):
+        """Read a block of bytes starting at the given register"""
+        with self.lock:
+            self._select(address)
+            os.write(self.fd, bytes([register]))
+            return os.read(self.fd, length)
+
+    # End def
+
+
+    def write_many(self, messages):
+        """Write a list of (address, data) messages.  The messages are sent
+        as combined transactions with the I2C_RDWR ioctl, so a bus pass to 
+        several devices is a single system call.
+        """
+        for i in range(0, len(messages), I2C_RDWR_MAX_MSGS):
+            chunk   = messages[i:i + I2C_RDWR_MAX_MSGS]
+            msgs    = (_I2CMsg * len(chunk))()
+            buffers = []
+            
+            for j, (address, data) in enumerate(chunk):
+                buf = (ctypes.c_uint8 * len(data)).from_buffer_copy(bytes(data))
+                buffers.append(buf)
+                
+                msgs[j].addr  = address
+                msgs[j].flags = 0
+                msgs[j].len   = len(data)
+                msgs[j].buf   = ctypes.cast(buf, ctypes.POINTER(ctypes.c_uint8))
+            
+            rdwr = _I2CRdwrData(msgs, len(chunk))
+            
+            # Pass the structure (not its address, which may not fit in the
+            # C int that fcntl converts integer arguments to)
+            with self.lock:
+                fcntl.ioctl(self.fd, I2C_RDWR, rdwr)
+
+    # End def
+
+
+    def close(self):
+        """Close the I2C bus device"""
+        with self.lock:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd      = None
+                self.address = None
+
+    # End def
+
+# End class
+
+
+class I2CSetBus():
+    """ Legacy I2C transport using the i2c-tools command line programs """
+    bus     = None
+    
+    def __init__(self, bus):
+        """ Initialize class variables """
+        self.bus = bus
+    
+    # End def
+
+
+    def write_byte(self, address, value):
+        """Write a single command byte to the device"""
+        # i2cset -y 1 0x70 0x21
+        os.system("/usr/sbin/i2cset -y {0} {1} {2}".format(self.bus, address, value))
+
+    # End def
+
+
+    def write_byte_data(self, address, register, value):
+        """Write a single byte to the given register of the device"""
+        # i2cset -y 1 0x70 0x00 0x3f
+        os.system("/usr/sbin/i2cset -y {0} {1} {2} {3}".format(self.bus, address, register, value))
+
+    # End def
+
+
+    def write_block_data(self, address, register, data):
+        """Write a block of bytes starting at the given register"""
+        for i, value in enumerate(data):
+            self.write_byte_data(address, register + i, value)
+
+    # End def
+
+
+    def read_block_data(self, address, register, length):
+        """Read a block of bytes starting at the given register"""
+        data = bytearray()
+        
+        for i in range(length):
+            # i2cget -y 1 0x70 0x00
+            output = subprocess.check_output(["/usr/sbin/i2cget", "-y", str(self.bus), 
+                                              str(address), str(register + i)])
+            data.append(int(output, 16))
+        
+        return bytes(data)
+
+    # End def
+
+
+    def write_many(self, messages):
+        """Write a list of (address, data) messages"""
+        for (address, data) in messages:
+            if (len(data) == 1):
+                self.write_byte(address, data[0])
+            else:
+                self.write_block_data(address, data[0], data[1:])
+
+    # End def
+
+
+    def close(self):
+        """Nothing to close"""
+        pass
+
+    # End def
+
+# End class
+
+
+class FakeI2CBus():
+    """ Memory (or file) backed I2C bus for use without hardware """
+    filename     = None
+    memory       = None
+    commands     = None
+    transactions = None
+    lock         = None
+    
+    def __init__(self, filename=None):
+        """ Create the register space for all I2C addresses """
+        size = FAKE_I2C_ADDRESSES * FAKE_I2C_REGISTERS
+        
+        self.filename     = filename
+        self.commands     = []
+        self.transactions = 0
+        self.lock         = threading.Lock()
+        
+        if filename is None:
+            self.memory = bytearray(size)
+        else:
+            with open(filename, "a+b") as f:
+                if (os.path.getsize(filename) < size):
+                    f.truncate(size)
+                self.memory = mmap.mmap(f.fileno(), size)
+    
+    # End def
+
+
+    def _offset(self, address, register, length):
+        """Return the offset of the register in memory"""
+        if ((address < 0) or (address >= FAKE_I2C_ADDRESSES)):
+            raise ValueError("Address 0x{0:x} is not a valid I2C address".format(address))
+        
+        if ((register < 0) or (register + length > FAKE_I2C_REGISTERS)):
+            raise ValueError("Register range is not valid")
+        
+        return (address * FAKE_I2C_REGISTERS) + register
+
+    # End def
+
+
+    def write_byte(self, address, value):
+        """Record a single command byte sent to the device"""
+        with self.lock:
+            self.commands.append((address, value))
+            self.transactions += 1
+
+    # End def
+
+
+    def write_byte_data(self, address, register, value):
+        """Write a single byte to the given register of the device"""
+        self.write_block_data(address, register, [value])
+
+    # End def
+
+
+    def write_block_data(self, address, register, data):
+        """Write a block of bytes starting at the given register"""
+        data = bytes(data)
+        
+        with self.lock:
+            offset = self._offset(address, register, len(data))
+            self.memory[offset:offset + len(data)] = data
+            self.transactions += 1
+
+    # End def
+
+
+    def read_block_data(self, address, register, length):
+        """Read a block of bytes starting at the given register"""
+        with self.lock:
+            offset = self._offset(address, register, length)
+            self.transactions += 1
+            return bytes(self.memory[offset:offset + length])
+
+    # End def
+
+
+    def write_many(self, messages):
+        """Write a list of (address, data) messages in one transaction"""
+        with self.lock:
+            for (address, data) in messages:
+                if (len(data) == 1):
+                    self.commands.append((address, data[0]))
+                else:
+                    offset = self._offset(address, data[0], len(data) - 1)
+                    self.memory[offset:offset + len(data) - 1] = bytes(data[1:])
+            
+            self.transactions += 1
+
+    # End def
+
+
+    def get_ram(self, address, register=0x00, length=HT16K33_RAM_SIZE):
+        """Return the register contents of a device (not counted as a 
+        bus transaction)
+        """
+        with self.lock:
+            offset = self._offset(address, register, length)
+            return bytes(self.memory[offset:offset + length])
+
+    # End def
+
+
+    def close(self):
+        """Release the backing file, if any"""
+        with self.lock:
+            if self.filename is not None and not self.memory.closed:
+                self.memory.close()
+
+    # End def
+
+# End class
+
+
+def _boot_id():
+    """Return the kernel boot id (None if it is not available)"""
+    try:
+        with open(BOOT_ID_PATH, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+# End def
+
+
+def _decimal_table():
+    """Return the segment table for the decimal values 0 - 9999.
+    
+    The table holds four bytes (one per digit) for each value, so the 
+    digits for value are table[4 * value : 4 * value + 4].
+    """
+    global _DECIMAL_TABLE
+    
+    if _DECIMAL_TABLE is None:
+        pairs          = [bytes([HEX_DIGITS[i // 10], HEX_DIGITS[i % 10]]) for i in range(100)]
+        _DECIMAL_TABLE = b"".join([high + low for high in pairs for low in pairs])
+    
+    return _DECIMAL_TABLE
+
+# End def
+
+
+def _hex_table():
+    """Return the segment table for the byte values 0x00 - 0xFF.
+    
+    The table holds two bytes (one per digit) for each byte value, so a 
+    16 bit value is rendered with two lookups.
+    """
+    global _HEX_TABLE
+    
+    if _HEX_TABLE is None:
+        _HEX_TABLE = b"".join([bytes([HEX_DIGITS[i >> 4], HEX_DIGITS[i & 0x0F]]) for i in range(256)])
+    
+    return _HEX_TABLE
+
+# End def
+
+
+def text_segments(value):
+    """Return the raw digit values for text of any length.
+    
+    A "." turns on the decimal point of the previous character (or of a 
+    blank digit if there is no previous character).
+    
+    Will throw a ValueError if characters are used that are not supported.
+    """
+    digits = bytearray()
+    
+    for i, char in enumerate(value):
+        if (char == "."):
+            if ((i > 0) and (value[i - 1] != ".")):
+                digits[-1] |= POINT_VALUE
+            else:
+                digits.append(POINT_VALUE)
+        else:
+            try:
+                digits.append(LETTERS[char])
+            except KeyError:
+                raise ValueError("Character {0} not supported".format(char))
+    
+    return digits
+
+# End def
+
+
+@functools.lru_cache(maxsize=256)
+def compile_text(value):
+    """Compile text into the four raw digit values for the display.
+    
+    Will throw a ValueError if the text does not fit on the display or if 
+    characters are used that are not supported.
+    """
+    digits = text_segments(value)
+    
+    if ((len(digits) < 1) or (len(digits) > HT16K33_DIGITS)):
+        raise ValueError("Must have between 1 and 4 characters")
+    
+    # Pad with blank digits
+    digits.extend(bytes(HT16K33_DIGITS - len(digits)))
+    
+    return bytes(digits)
+
+# End def
+
+
+class HT16K33():
+    """ Class to manage a HT16K33 I2C display """
+    bus              = None
+    address          = None
+    transport        = None
+    buffer           = None
+    display_ram      = None
+    touched          = None
+    batch_depth      = None
+    batch_thread     = None
+    lock             = None
+    writer           = None
+    auto_flush       = None
+    own_transport    = None
+    point_value      = POINT_VALUE
+    brightness       = None
+    blink            = None
+    display_on       = None
+    commands_written = None
+    commands_skipped = None
+    state_file       = None
+    state_saved      = False
+    bytes_written    = None
+    bytes_skipped    = None
+    transactions     = None
     
-    def __init__(self, bus, address=0x70, blink=HT16K33_BLINK_OFF, brightness=HT16K33_BRIGHTNESS_HIGHEST):
+    def __init__(self, bus, address=0x70, blink=HT16K33_BLINK_OFF, brightness=HT16K33_BRIGHTNESS_HIGHEST, transport=None, asynchronous=False, auto_flush=True, lazy=False, state_file=None):
         """ Initialize class variables; Set up display; Set display to blank """
         
         # Initialize class variables
-        self.bus     = bus
-        self.address = address
-        self.command = "/usr/sbin/i2cset -y {0} {1}".format(bus, address)
+        self.bus          = bus
+        self.address      = address
+        self.buffer       = bytearray(HT16K33_RAM_SIZE)
+        self.display_ram  = None                       # Unknown until first flush
+        self.touched      = 0                          # Bit mask of registers set since last flush
+        self.batch_depth  = 0
+        self.batch_thread = None
+        self.lock         = threading.RLock()          # Protects buffer / display_ram
+        self.auto_flush   = auto_flush
+        self.state_file   = state_file
+        
+        self.reset_stats()
+        
+        # Only close the transport on close() if it was opened here
+        if transport is None:
+            self.transport     = I2CBus(bus)
+            self.own_transport = True
+        else:
+            self.transport     = transport
+            self.own_transport = False
+        
+        if asynchronous:
+            self.writer = HT16K33Writer(self)
+            self.writer.start()
 
         # Set up display        
         self.setup(blink, brightness)
         
-        # Set display to blank
-        self.blank()
+        # Set display to blank (lazy: the first render writes all of RAM
+        # since what the display shows is unknown)
+        if not lazy:
+            self.blank()
     
     # End def
     
     
     def setup(self, blink, brightness):
         """Initialize the display itself"""
-        # i2cset -y 1 0x70 0x21
-        os.system("{0} {1}".format(self.command, (HT16K33_SYSTEM_SETUP | HT16K33_OSCILLATOR)))
-        # i2cset -y 1 0x70 0x81
-        os.system("{0} {1}".format(self.command, (HT16K33_BLINK_CMD | blink | HT16K33_BLINK_DISPLAYON)))
-        # i2cset -y 1 0x70 0xEF
-        os.system("{0} {1}".format(self.command, (HT16K33_BRIGHTNESS_CMD | brightness)))
+        self._check_blink(blink)
+        self._check_brightness(brightness)
+        
+        with self.lock:
+            state = self._load_state()
+            
+            if state is None:
+                # i2cset -y 1 0x70 0x21
+                self._write_command(HT16K33_SYSTEM_SETUP | HT16K33_OSCILLATOR)
+                # i2cset -y 1 0x70 0x81
+                self._write_command(HT16K33_BLINK_CMD | blink | HT16K33_BLINK_DISPLAYON)
+                # i2cset -y 1 0x70 0xEF
+                self._write_command(HT16K33_BRIGHTNESS_CMD | brightness)
+                
+                self.blink      = blink
+                self.display_on = True
+                self.brightness = brightness
+            else:
+                # Display was set up earlier in this boot; the oscillator is
+                # already on so only send the settings that change
+                self.blink      = state["blink"]
+                self.display_on = state["display_on"]
+                self.brightness = state["brightness"]
+                
+                self.commands_skipped += 1
+                
+                sent  = self._set_display_setup(blink, True)
+                sent |= self.set_brightness(brightness)
+                
+                # Saved settings still match the display
+                self.state_saved = not sent
+            
+            if not self.state_saved:
+                self._save_state()
 
     # End def    
 
 
+    def _state_key(self):
+        """Return the key of the display in the state file"""
+        return "{0}:0x{1:02x}".format(self.bus, self.address)
+
+    # End def
+
+
+    def _read_state_file(self, boot_id):
+        """Return the saved display states for the given boot id"""
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+            
+            if (state["boot_id"] == boot_id):
+                return state["displays"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        return {}
+
+    # End def
+
+
+    def _load_state(self):
+        """Return the saved settings of the display (None if the display 
+        has not been set up during this boot)
+        """
+        if self.state_file is None:
+            return None
+        
+        boot_id = _boot_id()
+        
+        if boot_id is None:
+            return None
+        
+        return self._read_state_file(boot_id).get(self._state_key())
+
+    # End def
+
+
+    def _save_state(self, valid=True):
+        """Save the settings of the display to the state file.  If valid is
+        False, the settings are removed so the next start sends all of the 
+        setup commands.
+        """
+        if self.state_file is None:
+            return
+        
+        boot_id = _boot_id()
+        
+        if boot_id is None:
+            return
+        
+        displays = self._read_state_file(boot_id)
+        
+        if valid:
+            displays[self._state_key()] = {"blink"      : self.blink,
+                                           "brightness" : self.brightness,
+                                           "display_on" : self.display_on}
+        else:
+            displays.pop(self._state_key(), None)
+        
+        # Write a new file and rename it so the file is never partially written
+        try:
+            filename = "{0}.{1}".format(self.state_file, os.getpid())
+            
+            with open(filename, "w") as f:
+                json.dump({"boot_id" : boot_id, "displays" : displays}, f)
+            
+            os.replace(filename, self.state_file)
+        except OSError:
+            return
+        
+        self.state_saved = valid
+
+    # End def
+
+
+    def _write_command(self, command):
+        """Send a command byte to the display"""
+        # Saved settings no longer match the display until close()
+        if self.state_saved:
+            self._save_state(valid=False)
+        
+        self.transport.write_byte(self.address, command)
+        self.commands_written += 1
+
+    # End def
+
+
+    def _check_blink(self, blink):
+        """Check that the blink rate is valid"""
+        if blink not in HT16K33_BLINK_RATES:
+            raise ValueError("Blink rate is not valid")
+
+    # End def
+
+
+    def _check_brightness(self, brightness):
+        """Check that the brightness is valid"""
+        if ((brightness < HT16K33_BRIGHTNESS_DARKEST) or (brightness > HT16K33_BRIGHTNESS_HIGHEST)):
+            raise ValueError("Brightness is not between 0 and 15")
+
+    # End def
+
+
+    def set_brightness(self, brightness):
+        """Set the brightness of the display (0 - 15).  Returns True if a 
+        command was sent (i.e. the brightness changed).
+        """
+        self._check_brightness(brightness)
+        
+        with self.lock:
+            if (brightness == self.brightness):
+                self.commands_skipped += 1
+                return False
+            
+            self._write_command(HT16K33_BRIGHTNESS_CMD | brightness)
+            self.brightness = brightness
+        
+        return True
+
+    # End def
+
+
+    def _set_display_setup(self, blink, display_on):
+        """Send the display setup command if it changes blink / display on"""
+        with self.lock:
+            if ((blink == self.blink) and (display_on == self.display_on)):
+                self.commands_skipped += 1
+                return False
+            
+            if display_on:
+                self._write_command(HT16K33_BLINK_CMD | blink | HT16K33_BLINK_DISPLAYON)
+            else:
+                self._write_command(HT16K33_BLINK_CMD | blink)
+            
+            self.blink      = blink
+            self.display_on = display_on
+        
+        return True
+
+    # End def
+
+
+    def set_blink(self, blink):
+        """Set the hardware blink rate of the display.  Returns True if a 
+        command was sent (i.e. the blink rate changed).
+        """
+        self._check_blink(blink)
+        
+        return self._set_display_setup(blink, self.display_on)
+
+    # End def
+
+
+    def set_display_on(self, enable):
+        """Turn the display on / off.  Returns True if a command was sent."""
+        return self._set_display_setup(self.blink, bool(enable))
+
+    # End def
+
+
     def encode(self, data, double_point=False):
         """Encode data to TM1637 format.
         
@@ -217,44 +1041,278 @@ class HT16K33():
 
     def set_digit(self, digit_number, data, double_point=False):
         """Update the given digit of the display."""
-        os.system("{0} {1} {2}".format(self.command, DIGIT_ADDR[digit_number], self.encode(data, double_point)))    
+        self.set_digit_raw(digit_number, self.encode(data, double_point))
 
     # End def
 
 
     def set_digit_raw(self, digit_number, data, double_point=False):
         """Update the given digit of the display using raw data value"""
-        os.system("{0} {1} {2}".format(self.command, DIGIT_ADDR[digit_number], data))    
+        with self.batch():
+            self._set_register(DIGIT_ADDR[digit_number], data)
 
     # End def
 
 
     def set_colon(self, enable):
         """Set the colon on the display."""
-        if enable:
-            os.system("{0} {1} {2}".format(self.command, COLON_ADDR, 0x02))
-        else:
-            os.system("{0} {1} {2}".format(self.command, COLON_ADDR, 0x00))
+        with self.batch():
+            if enable:
+                self._set_register(COLON_ADDR, 0x02)
+            else:
+                self._set_register(COLON_ADDR, 0x00)
 
     # End def        
 
 
+    def _set_register(self, register, value):
+        """Set a register in the buffer and record that it was touched"""
+        self.buffer[register] = value
+        self.touched         |= (1 << register)
+
+    # End def
+
+
+    def _commit(self):
+        """Flush the buffer to the display unless inside of a batch"""
+        if ((self.batch_depth == 0) and self.auto_flush):
+            if self.writer is None:
+                self._write_pending()
+            else:
+                self.writer.request()
+
+    # End def
+
+
+    def _dirty_span(self):
+        """Return (first, last) register that differs from the display or 
+        None if the display is already up to date
+        """
+        if self.display_ram is None:
+            return (0, HT16K33_RAM_SIZE - 1)
+        
+        first = None
+        last  = None
+        
+        for i in range(HT16K33_RAM_SIZE):
+            if self.buffer[i] != self.display_ram[i]:
+                if first is None:
+                    first = i
+                last = i
+        
+        if first is None:
+            return None
+        
+        return (first, last)
+
+    # End def
+
+
+    def _take_pending(self):
+        """Return (first register, data, touched) for the registers that
+        differ from the display or None if the display is up to date
+        """
+        with self.lock:
+            span    = self._dirty_span()
+            touched = self.touched
+            
+            self.touched = 0
+            
+            if span is None:
+                self.bytes_skipped += bin(touched).count("1")
+                return None
+            
+            (first, last) = span
+            
+            return (first, bytes(self.buffer[first:last + 1]), touched)
+
+    # End def
+
+
+    def _pending_written(self, first, data, touched):
+        """Record that data was written to the display starting at first"""
+        last = first + len(data) - 1
+        
+        # Registers set by the caller that were not part of the transaction
+        sent = ((1 << (last + 1)) - 1) ^ ((1 << first) - 1)
+        
+        with self.lock:
+            if self.display_ram is None:
+                self.display_ram = bytearray(HT16K33_RAM_SIZE)
+            
+            self.display_ram[first:last + 1] = data
+            
+            self.bytes_written += len(data)
+            self.bytes_skipped += bin(touched & ~sent).count("1")
+            self.transactions  += 1
+
+    # End def
+
+
+    def _write_pending(self):
+        """Send the registers that differ from what the display shows.
+        
+        All changed registers are sent in a single transaction covering 
+        the span from the first to the last changed register.
+        """
+        pending = self._take_pending()
+        
+        if pending is None:
+            return
+        
+        (first, data, touched) = pending
+        
+        if (len(data) == 1):
+            self.transport.write_byte_data(self.address, first, data[0])
+        else:
+            self.transport.write_block_data(self.address, first, data)
+        
+        self._pending_written(first, data, touched)
+
+    # End def
+
+
+    def flush(self):
+        """Send the registers that differ from what the display shows.  In
+        asynchronous mode, wait for the writer thread to send them.
+        """
+        if self.writer is None:
+            self._write_pending()
+        else:
+            self.writer.request()
+            
+            # The writer cannot take the lock while this thread is in a 
+            # batch; the data is written once the batch is done
+            if (self.batch_thread != threading.get_ident()):
+                self.writer.drain()
+
+    # End def
+
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defer flushing the display until the end of the with block"""
+        with self.lock:
+            self.batch_depth += 1
+            self.batch_thread = threading.get_ident()
+            
+            try:
+                yield self
+            finally:
+                self.batch_depth -= 1
+                
+                if (self.batch_depth == 0):
+                    self.batch_thread = None
+                
+                self._commit()
+
+    # End def
+
+
+    def set_row_int(self, mode):
+        """Set the ROW15/INT pin to be a row driver or a key interrupt"""
+        self.transport.write_byte(self.address, (HT16K33_ROWINT_CMD | mode))
+
+    # End def
+
+
+    def read_keys(self):
+        """Read the key RAM (one transaction) and return a bit mask of the
+        pressed keys; bit (13 * K) + KS is set if the key is pressed
+        """
+        data = self.transport.read_block_data(self.address, HT16K33_KEY_RAM_ADDR, HT16K33_KEY_RAM_SIZE)
+        keys = 0
+        
+        for k in range(HT16K33_KEY_RAM_SIZE // 2):
+            row   = (data[2 * k] | (data[(2 * k) + 1] << 8)) & ((1 << HT16K33_KEYS_PER_ROW) - 1)
+            keys |= row << (k * HT16K33_KEYS_PER_ROW)
+        
+        return keys
+
+    # End def
+
+
+    def read_key_interrupt(self):
+        """Return True if a key press has been latched by the chip"""
+        data = self.transport.read_block_data(self.address, HT16K33_KEY_INT_ADDR, 1)
+        return (data[0] != 0)
+
+    # End def
+
+
+    def invalidate(self):
+        """Forget what the display shows; next flush rewrites all of RAM"""
+        self.display_ram = None
+
+    # End def
+
+
+    def get_stats(self):
+        """Return the write statistics for the display"""
+        stats = {"bytes_written"    : self.bytes_written,
+                 "bytes_skipped"    : self.bytes_skipped,
+                 "transactions"     : self.transactions,
+                 "commands_written" : self.commands_written,
+                 "commands_skipped" : self.commands_skipped}
+        
+        if self.writer is not None:
+            stats["frames_requested"] = self.writer.frames_requested
+            stats["frames_written"]   = self.writer.frames_written
+        
+        return stats
+
+    # End def
+
+
+    def reset_stats(self):
+        """Reset the write statistics for the display"""
+        self.bytes_written    = 0
+        self.bytes_skipped    = 0
+        self.transactions     = 0
+        self.commands_written = 0
+        self.commands_skipped = 0
+
+    # End def
+
+
     def blank(self):
         """Clear the display to read nothing"""
-        self.set_colon(False)
-
-        self.set_digit_raw(3, 0x00)
-        self.set_digit_raw(2, 0x00)
-        self.set_digit_raw(1, 0x00)
-        self.set_digit_raw(0, 0x00)
+        with self.batch():
+            for i in range(HT16K33_RAM_SIZE):
+                self._set_register(i, 0x00)
 
     # End def
 
 
     def clear(self):
         """Clear the display to read '0000'"""
-        self.set_colon(False)
-        self.update(0)
+        with self.batch():
+            self.set_colon(False)
+            self.update(0)
+
+    # End def
+
+
+    def set_digits_raw(self, data):
+        """Update all four digits of the display using raw data values"""
+        with self.batch():
+            for i in range(HT16K33_DIGITS):
+                self._set_register(DIGIT_ADDR[i], data[i])
+
+    # End def
+
+
+    def _signed_digits(self, value):
+        """Return the raw digit values for a value between -999 and 9999"""
+        if ((value < HT16K33_MIN_VALUE) or (value > HT16K33_MAX_VALUE)):
+            raise ValueError("Value is not between -999 and 9999")
+        
+        if (value < 0):
+            offset = -4 * value
+            return bytes([MINUS_VALUE]) + _decimal_table()[offset + 1:offset + 4]
+        
+        offset = 4 * value
+        return _decimal_table()[offset:offset + 4]
 
     # End def
 
@@ -271,34 +1329,236 @@ class HT16K33():
         if ((value < 0) or (value > 9999)):
             raise ValueError("Value is not between 0 and 9999")
         
-        self.set_digit(3, (value % 10))
-        self.set_digit(2, (value // 10) % 10)
-        self.set_digit(1, (value // 100) % 10)
-        self.set_digit(0, (value // 1000) % 10)
+        self.set_digits_raw(self._signed_digits(value))
+
+    # End def
+
+
+    def update_signed(self, value):
+        """Update the value on the display; negative values are shown with
+        a leading "-"
+        
+        :param value: Value must be between -999 and 9999.
+        
+        Will throw a ValueError if number is not between -999 and 9999.
+        """
+        self.set_digits_raw(self._signed_digits(value))
+
+    # End def
+
+
+    def update_float(self, value, decimals=None):
+        """Update the value on the display with a decimal point.
+        
+        :param value:    Value once rounded must be between -999 and 9999.
+        :param decimals: Number of decimal places (0 - 3; 0 - 2 for negative
+                         values).  If None, the most decimal places that 
+                         fit on the display are used.
+        
+        Will throw a ValueError if the value does not fit on the display.
+        """
+        # Keep at least one digit before the decimal point (the "-" of a 
+        # negative value uses one of the digits)
+        if (value < 0):
+            max_decimals = HT16K33_DIGITS - 2
+        else:
+            max_decimals = HT16K33_DIGITS - 1
+        
+        if decimals is None:
+            decimals = 0
+            
+            for places in range(max_decimals, 0, -1):
+                scaled = int(round(value * (10 ** places)))
+                
+                if (HT16K33_MIN_VALUE <= scaled <= HT16K33_MAX_VALUE):
+                    decimals = places
+                    break
+        
+        if ((decimals < 0) or (decimals > max_decimals)):
+            raise ValueError("Decimals must be between 0 and {0}".format(max_decimals))
+        
+        digits = list(self._signed_digits(int(round(value * (10 ** decimals)))))
+        
+        if (decimals > 0):
+            digits[HT16K33_DIGITS - 1 - decimals] |= self.point_value
+        
+        self.set_digits_raw(digits)
+
+    # End def
+
+
+    def update_hex(self, value):
+        """Update the value on the display in hex.
+        
+        :param value: Value must be between 0x0000 and 0xFFFF.
+        
+        Will throw a ValueError if number is not between 0x0000 and 0xFFFF.
+        """
+        if ((value < 0) or (value > HT16K33_MAX_HEX_VALUE)):
+            raise ValueError("Value is not between 0x0000 and 0xFFFF")
+        
+        self.set_digits_raw(self._hex_digits(value))
 
     # End def
+
+
+    def _hex_digits(self, value):
+        """Return the raw digit values for a value between 0x0000 and 0xFFFF"""
+        table = _hex_table()
+        high  = 2 * (value >> 8)
+        low   = 2 * (value & 0xFF)
+        
+        return table[high:high + 2] + table[low:low + 2]
+
+    # End def
+
+
+    def _compile_text(self, value):
+        """Return the raw digit values for the text"""
+        return compile_text(value)
+
+    # End def
+
     
     def text(self, value):
         """ Update the value on the display with text
         
-        :param value:  Value must have between 1 and 4 characters
+        :param value:  Value must have between 1 and 4 characters (not 
+                       counting "." which are shown as decimal points)
         
         Will throw a ValueError if there are not the appropriate number of 
         characters or if characters are used that are not supported.
         """
-        if ((len(value) < 1) or (len(value) > 4)):
-            raise ValueError("Must have between 1 and 4 characters")        
+        digits = self._compile_text(value)
+        
+        # Clear the display and set the display to the correct characters
+        #   - Only the registers that change are sent to the display
+        with self.batch():
+            self.blank()
+            self.set_digits_raw(digits)
+
+    # End def
+
+
+    def close(self):
+        """Wait for pending writes; stop the writer thread; close the 
+        transport (if it was opened by the display)
+        """
+        if self.writer is not None:
+            self.writer.stop()
+            self.writer = None
+        
+        with self.lock:
+            if not self.state_saved:
+                self._save_state()
+        
+        if self.own_transport:
+            self.transport.close()
+
+    # End def
+
+# End class
+
+
+class HT16K33Writer(threading.Thread):
+    """ Background writer thread for an asynchronous HT16K33 display.
+    
+    Requests only mark the display as needing a write; each time the thread
+    wakes up it sends the most recent display contents, so requests made 
+    while a write is in progress are coalesced into a single write.
+    """
+    display          = None
+    condition        = None
+    pending          = None
+    busy             = None
+    stopped          = None
+    error            = None
+    frames_requested = None
+    frames_written   = None
+    
+    def __init__(self, display):
+        """ Initialize class variables """
+        threading.Thread.__init__(self, name="HT16K33Writer-0x{0:x}".format(display.address))
         
-        # Clear the display
-        self.blank()
+        self.daemon           = True
+        self.display          = display
+        self.condition        = threading.Condition()
+        self.pending          = False
+        self.busy             = False
+        self.stopped          = False
+        self.error            = None
+        self.frames_requested = 0
+        self.frames_written   = 0
+    
+    # End def
 
-        # Set the display to the correct characters        
-        for i, char in enumerate(value):
+
+    def request(self):
+        """Request that the current display contents be written"""
+        with self.condition:
+            self.pending           = True
+            self.frames_requested += 1
+            self.condition.notify_all()
+
+    # End def
+
+
+    def run(self):
+        """Write the display each time a write is requested"""
+        while True:
+            with self.condition:
+                while not (self.pending or self.stopped):
+                    self.condition.wait()
+                
+                if not self.pending:
+                    break
+                
+                self.pending = False
+                self.busy    = True
+            
             try:
-                char_value = LETTERS[char]
-                self.set_digit_raw(i, char_value)
-            except:
-                raise ValueError("Character {0} not supported".format(char))
+                self.display._write_pending()
+            except Exception as e:
+                self.error = e
+            
+            with self.condition:
+                self.busy            = False
+                self.frames_written += 1
+                self.condition.notify_all()
+
+    # End def
+
+
+    def drain(self, timeout=None):
+        """Wait until all requested writes are done.
+        
+        Will raise any exception from the writer thread since the last drain.
+        """
+        with self.condition:
+            done = self.condition.wait_for(lambda: not (self.pending or self.busy), timeout)
+        
+        if self.error is not None:
+            (error, self.error) = (self.error, None)
+            raise error
+        
+        return done
+
+    # End def
+
+
+    def stop(self, timeout=None):
+        """Write any pending data and stop the writer thread"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        
+        self.join(timeout)
+        
+        if self.error is not None:
+            (error, self.error) = (self.error, None)
+            raise error
+
+    # End def
 
 # End class
 
@@ -332,6 +1592,18 @@ if __name__ == '__main__':
         display.update(i)
         time.sleep(delay)
 
+    for value in [-999, -10, -1]:
+        display.update_signed(value)
+        time.sleep(delay)
+
+    for value in [0.125, 3.14159, 42.5, -1.5]:
+        display.update_float(value)
+        time.sleep(delay)
+
+    for value in [0x0000, 0x00FF, 0xBEEF, 0xFFFF]:
+        display.update_hex(value)
+        time.sleep(delay)
+
     for value in [0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x00]:
         display.set_digit_raw(0, value)
         time.sleep(delay)
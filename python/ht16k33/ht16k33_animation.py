@@ -0,0 +1,358 @@
+"""
+--------------------------------------------------------------------------
+HT16K33 Animation Engine
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+HT16K33 Animation Engine
+
+  Messages and animations are compiled once into a sequence of frames 
+(four raw digit values per frame) and then played on a HT16K33 display by a
+drift-free scheduler:  the deadline of frame n is start + n / frame_rate, so
+the time taken to write a frame does not accumulate.  Frames that are more 
+than one frame period late are dropped to stay on time.
+
+Software API:
+
+  Animation(frames)
+    - Provide a list of frames; each frame is four raw digit values
+    - Animations can be concatenated with "+" and repeated with "*"
+    
+    get_frame(n)
+      - Return the raw digit values for frame n
+      
+    Functions to create animations:
+    
+      marquee(text)
+        - Scroll text of any length across the display
+      
+      spinner()
+        - A segment running around the outside of the display
+      
+      blink(text, count=3)
+        - Alternate between text and a blank display count times
+      
+      countdown(start, stop=0)
+        - Count down from start to stop (one frame per value)
+
+  AnimationPlayer(display, frame_rate=10, late_tolerance=0.5)
+    - Provide the HT16K33 display to play animations on
+    - Provide the frame rate (frames per second)
+    - A frame more than late_tolerance frame periods late counts as a 
+      missed deadline
+    
+    play(animation, loops=1)
+      - Play the animation; loops=None plays until stop() is called
+      - Function consumes time
+    
+    start(animation, loops=None)
+      - Play the animation in a background thread
+    
+    stop()
+      - Stop the animation
+    
+    get_stats()
+      - Return a dictionary with the number of frames shown, missed 
+        deadlines and dropped frames for the last animation played
+
+"""
+import time
+import threading
+
+import ht16k33 as HT16K33
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# Segments visited by spinner():  (digit, segment)
+SPINNER_PATH       = [(0, 0x01), (1, 0x01), (2, 0x01), (3, 0x01),     # Top
+                      (3, 0x02), (3, 0x04),                             # Right
+                      (3, 0x08), (2, 0x08), (1, 0x08), (0, 0x08),     # Bottom
+                      (0, 0x10), (0, 0x20)]                             # Left
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class Animation():
+    """ Sequence of precompiled display frames """
+    frames       = None
+    frame_count  = None
+    
+    def __init__(self, frames):
+        """ Compile the frames into a single block of raw digit values """
+        data = bytearray()
+        
+        for frame in frames:
+            if (len(frame) != HT16K33.HT16K33_DIGITS):
+                raise ValueError("Each frame must have 4 digits")
+            data.extend(frame)
+        
+        self.frames      = bytes(data)
+        self.frame_count = len(data) // HT16K33.HT16K33_DIGITS
+    
+    # End def
+
+
+    def __len__(self):
+        """ Return the number of frames """
+        return self.frame_count
+    
+    # End def
+
+
+    def __add__(self, other):
+        """ Return the animation followed by other """
+        return Animation(list(self) + list(other))
+    
+    # End def
+
+
+    def __mul__(self, count):
+        """ Return the animation repeated count times """
+        return Animation(list(self) * count)
+    
+    # End def
+
+
+    def __iter__(self):
+        """ Iterate over the frames """
+        for n in range(self.frame_count):
+            yield self.get_frame(n)
+    
+    # End def
+
+
+    def get_frame(self, n):
+        """ Return the raw digit values for frame n """
+        offset = n * HT16K33.HT16K33_DIGITS
+        return self.frames[offset:offset + HT16K33.HT16K33_DIGITS]
+    
+    # End def
+
+# End class
+
+
+def marquee(text):
+    """ Return an animation scrolling text across the display (the text 
+        enters from the right and leaves on the left)
+    """
+    blank    = bytes(HT16K33.HT16K33_DIGITS)
+    segments = blank + bytes(HT16K33.text_segments(text)) + blank
+    
+    return Animation([segments[i:i + HT16K33.HT16K33_DIGITS] 
+                      for i in range(len(segments) - HT16K33.HT16K33_DIGITS + 1)])
+
+# End def
+
+
+def spinner():
+    """ Return an animation of a segment running around the display """
+    frames = []
+    
+    for (digit, segment) in SPINNER_PATH:
+        frame        = bytearray(HT16K33.HT16K33_DIGITS)
+        frame[digit] = segment
+        frames.append(frame)
+    
+    return Animation(frames)
+
+# End def
+
+
+def blink(text, count=3):
+    """ Return an animation alternating between text and a blank display """
+    return Animation([HT16K33.compile_text(text), bytes(HT16K33.HT16K33_DIGITS)] * count)
+
+# End def
+
+
+def countdown(start, stop=0):
+    """ Return an animation counting down from start to stop """
+    return Animation([HT16K33.compile_text("{0:4d}".format(value)) 
+                      for value in range(start, stop - 1, -1)])
+
+# End def
+
+
+class AnimationPlayer():
+    """ Play animations on a HT16K33 display at a fixed frame rate """
+    display          = None
+    frame_rate       = None
+    late_tolerance   = None
+    stop_event       = None
+    thread           = None
+    frames_shown     = None
+    missed_deadlines = None
+    dropped_frames   = None
+    
+    def __init__(self, display, frame_rate=10, late_tolerance=0.5):
+        """ Initialize variables """
+        if (frame_rate <= 0):
+            raise ValueError("Frame rate must be greater than 0")
+        
+        self.display          = display
+        self.frame_rate       = frame_rate
+        self.late_tolerance   = late_tolerance
+        self.stop_event       = threading.Event()
+        self.thread           = None
+        self.frames_shown     = 0
+        self.missed_deadlines = 0
+        self.dropped_frames   = 0
+    
+    # End def
+
+
+    def play(self, animation, loops=1):
+        """ Play the animation loops times (forever if loops is None) """
+        self.stop_event.clear()
+        self._play(animation, loops)
+
+    # End def
+
+
+    def _play(self, animation, loops):
+        """ Play the animation until done or until stop() is called """
+        period = 1.0 / self.frame_rate
+        
+        self.frames_shown     = 0
+        self.missed_deadlines = 0
+        self.dropped_frames   = 0
+        
+        if (len(animation) == 0):
+            return
+        
+        if loops is None:
+            total = None
+        else:
+            total = loops * len(animation)
+        
+        start = time.monotonic()
+        n     = 0
+        
+        while ((total is None) or (n < total)):
+            # Deadlines are computed from the start time, so any time spent
+            # writing a frame does not accumulate into drift
+            late = time.monotonic() - (start + (n * period))
+            
+            if (late < 0):
+                if self.stop_event.wait(-late):
+                    break
+            elif self.stop_event.is_set():
+                break
+            elif (late > (self.late_tolerance * period)):
+                self.missed_deadlines += 1
+                
+                # Drop the frame if the next frame is already due
+                if (late >= period):
+                    self.dropped_frames += 1
+                    n += 1
+                    continue
+            
+            self.display.set_digits_raw(animation.get_frame(n % len(animation)))
+            self.frames_shown += 1
+            n += 1
+
+    # End def
+
+
+    def start(self, animation, loops=None):
+        """ Play the animation in a background thread """
+        self.stop()
+        self.stop_event.clear()
+        
+        self.thread = threading.Thread(target=self._play, args=(animation, loops))
+        self.thread.daemon = True
+        self.thread.start()
+
+    # End def
+
+
+    def stop(self):
+        """ Stop the animation (and wait for the background thread) """
+        self.stop_event.set()
+        
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return the statistics for the last animation played """
+        return {"frames_shown"     : self.frames_shown,
+                "missed_deadlines" : self.missed_deadlines,
+                "dropped_frames"   : self.dropped_frames}
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Test HT16K33 Animation:")
+    
+    display = HT16K33.HT16K33(1, 0x70)
+    player  = AnimationPlayer(display, frame_rate=8)
+
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    try:
+        player.play(marquee("hello there 0123"))
+        print("    Marquee:   {0}".format(player.get_stats()))
+        
+        player.play(spinner(), loops=4)
+        print("    Spinner:   {0}".format(player.get_stats()))
+        
+        player.frame_rate = 1
+        player.play(countdown(5) + blink("   0", count=3))
+        print("    Countdown: {0}".format(player.get_stats()))
+        
+    except KeyboardInterrupt:
+        player.stop()
+
+    display.text("done")
+    display.close()
+    
+    print("Test Finished.")
+
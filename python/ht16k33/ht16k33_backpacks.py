@@ -0,0 +1,645 @@
+"""
+--------------------------------------------------------------------------
+HT16K33 Alphanumeric and Matrix Backpacks
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+HT16K33 Alphanumeric and Matrix Backpacks
+
+  Layout aware versions of the HT16K33 display for the Adafruit 14-segment
+quad alphanumeric backpack and the 16x8 LED matrix backpack.  A screen 
+update is rendered into the display RAM image and then sent to the display
+in one bulk write (only the span of registers that changed is sent).
+
+Software API:
+
+  HT16K33Alphanumeric(bus, address=0x70, ...)
+    - Same arguments as HT16K33()
+    - Each digit is 16 bits (two registers):  segments A - F, G1, G2, H, J,
+      K, L, M, N and the decimal point
+    - All printable ASCII characters are supported by text()
+    
+    set_digit(digit_number, data), set_digit_raw(digit_number, data),
+    set_digits_raw(data), update(value), update_signed(value), 
+    update_float(value, decimals=None), update_hex(value), text(value)
+      - Same as HT16K33 (raw values are 16 bits)
+    
+    set_colon(enable)
+      - There is no colon:  set_colon(False) does nothing and 
+        set_colon(True) raises ValueError
+
+  HT16K33Matrix16x8(bus, address=0x70, ...)
+    - Same arguments as HT16K33()
+    - Pixels are addressed by column x (0 - 15) and row y (0 - 7)
+    
+    set_pixel(x, y, on=True)
+      - Turn a pixel on / off
+    
+    get_pixel(x, y)
+      - Return True if the pixel is on
+    
+    fill(on=True)
+      - Turn all pixels on / off
+    
+    set_image(rows)
+      - Set all pixels from 8 row values (bit x of row y = pixel (x, y))
+    
+    update(value), update_signed(value), update_hex(value), text(value)
+      - Show up to 4 characters using a 3x5 pixel font (digits, letters
+        and common punctuation; lower case letters are shown as upper case)
+    
+    set_digit(digit_number, data), set_digit_raw(digit_number, data),
+    set_digits_raw(data), update_float(value, decimals=None)
+      - Same as HT16K33, with the 4 characters as the digits; a raw digit
+        value is the 3x5 glyph (bits 14 - 12 = top row, ..., bits 2 - 0 = 
+        bottom row; the high bit of each row is the left column) and bit 15
+        is a decimal point in the space to the right of the character
+    
+    set_colon(enable)
+      - There is no colon:  set_colon(False) does nothing and 
+        set_colon(True) raises ValueError
+
+--------------------------------------------------------------------------
+Background Information: 
+ 
+    * https://www.adafruit.com/product/1911  (quad alphanumeric display)
+    * https://www.adafruit.com/product/2037  (16x8 LED matrix)
+    * https://github.com/adafruit/Adafruit_LED_Backpack (14-segment font)
+
+"""
+import functools
+
+import ht16k33 as HT16K33
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# 14-segment font for ASCII characters 0x20 (" ") - 0x7E ("~")
+#   Bits:  0 - 5 = A - F; 6 = G1; 7 = G2; 8 = H; 9 = J; 10 = K; 11 = L; 
+#         12 = M; 13 = N; 14 = DP
+ALPHANUM_FONT             = [0x0000, 0x0006, 0x0220, 0x12CE,     #   ! " #
+                             0x12ED, 0x0C24, 0x235D, 0x0400,     # $ % & '
+                             0x2400, 0x0900, 0x3FC0, 0x12C0,     # ( ) * +
+                             0x0800, 0x00C0, 0x4000, 0x0C00,     # , - . /
+                             0x0C3F, 0x0006, 0x00DB, 0x008F,     # 0 1 2 3
+                             0x00E6, 0x2069, 0x00FD, 0x0007,     # 4 5 6 7
+                             0x00FF, 0x00EF, 0x1200, 0x0A00,     # 8 9 : ;
+                             0x2400, 0x00C8, 0x0900, 0x1083,     # < = > ?
+                             0x02BB, 0x00F7, 0x128F, 0x0039,     # @ A B C
+                             0x120F, 0x00F9, 0x0071, 0x00BD,     # D E F G
+                             0x00F6, 0x1209, 0x001E, 0x2470,     # H I J K
+                             0x0038, 0x0536, 0x2136, 0x003F,     # L M N O
+                             0x00F3, 0x203F, 0x20F3, 0x00ED,     # P Q R S
+                             0x1201, 0x003E, 0x0C30, 0x2836,     # T U V W
+                             0x2D00, 0x1500, 0x0C09, 0x0039,     # X Y Z [
+                             0x2100, 0x000F, 0x0C03, 0x0008,     # \ ] ^ _
+                             0x0100, 0x1058, 0x2078, 0x00D8,     # ` a b c
+                             0x088E, 0x0858, 0x0071, 0x048E,     # d e f g
+                             0x1070, 0x1000, 0x000E, 0x3600,     # h i j k
+                             0x0030, 0x10D4, 0x1050, 0x00DC,     # l m n o
+                             0x0170, 0x0486, 0x0050, 0x2088,     # p q r s
+                             0x0078, 0x001C, 0x2004, 0x2814,     # t u v w
+                             0x28C0, 0x200C, 0x0848, 0x0949,     # x y z {
+                             0x1200, 0x2489, 0x0520]             # | } ~
+
+ALPHANUM_FIRST_CHAR       = 0x20
+ALPHANUM_POINT_VALUE      = 0x4000
+ALPHANUM_HEX_DIGITS       = "0123456789ABCDEF"
+
+# 3x5 pixel font for the matrix:  5 rows per character, 3 bits per row 
+# (bit 2 is the left column)
+MATRIX_FONT               = { " " : (0b000, 0b000, 0b000, 0b000, 0b000),
+                              "0" : (0b111, 0b101, 0b101, 0b101, 0b111),
+                              "1" : (0b010, 0b110, 0b010, 0b010, 0b111),
+                              "2" : (0b111, 0b001, 0b111, 0b100, 0b111),
+                              "3" : (0b111, 0b001, 0b111, 0b001, 0b111),
+                              "4" : (0b101, 0b101, 0b111, 0b001, 0b001),
+                              "5" : (0b111, 0b100, 0b111, 0b001, 0b111),
+                              "6" : (0b111, 0b100, 0b111, 0b101, 0b111),
+                              "7" : (0b111, 0b001, 0b001, 0b001, 0b001),
+                              "8" : (0b111, 0b101, 0b111, 0b101, 0b111),
+                              "9" : (0b111, 0b101, 0b111, 0b001, 0b111),
+                              "A" : (0b010, 0b101, 0b111, 0b101, 0b101),
+                              "B" : (0b110, 0b101, 0b110, 0b101, 0b110),
+                              "C" : (0b011, 0b100, 0b100, 0b100, 0b011),
+                              "D" : (0b110, 0b101, 0b101, 0b101, 0b110),
+                              "E" : (0b111, 0b100, 0b110, 0b100, 0b111),
+                              "F" : (0b111, 0b100, 0b110, 0b100, 0b100),
+                              "G" : (0b011, 0b100, 0b101, 0b101, 0b011),
+                              "H" : (0b101, 0b101, 0b111, 0b101, 0b101),
+                              "I" : (0b111, 0b010, 0b010, 0b010, 0b111),
+                              "J" : (0b001, 0b001, 0b001, 0b101, 0b010),
+                              "K" : (0b101, 0b101, 0b110, 0b101, 0b101),
+                              "L" : (0b100, 0b100, 0b100, 0b100, 0b111),
+                              "M" : (0b101, 0b111, 0b111, 0b101, 0b101),
+                              "N" : (0b110, 0b101, 0b101, 0b101, 0b101),
+                              "O" : (0b010, 0b101, 0b101, 0b101, 0b010),
+                              "P" : (0b110, 0b101, 0b110, 0b100, 0b100),
+                              "Q" : (0b010, 0b101, 0b101, 0b110, 0b011),
+                              "R" : (0b110, 0b101, 0b110, 0b101, 0b101),
+                              "S" : (0b011, 0b100, 0b010, 0b001, 0b110),
+                              "T" : (0b111, 0b010, 0b010, 0b010, 0b010),
+                              "U" : (0b101, 0b101, 0b101, 0b101, 0b111),
+                              "V" : (0b101, 0b101, 0b101, 0b101, 0b010),
+                              "W" : (0b101, 0b101, 0b111, 0b111, 0b101),
+                              "X" : (0b101, 0b101, 0b010, 0b101, 0b101),
+                              "Y" : (0b101, 0b101, 0b010, 0b010, 0b010),
+                              "Z" : (0b111, 0b001, 0b010, 0b100, 0b111),
+                              "-" : (0b000, 0b000, 0b111, 0b000, 0b000),
+                              "+" : (0b000, 0b010, 0b111, 0b010, 0b000),
+                              "=" : (0b000, 0b111, 0b000, 0b111, 0b000),
+                              "_" : (0b000, 0b000, 0b000, 0b000, 0b111),
+                              "." : (0b000, 0b000, 0b000, 0b000, 0b010),
+                              "," : (0b000, 0b000, 0b000, 0b010, 0b100),
+                              ":" : (0b000, 0b010, 0b000, 0b010, 0b000),
+                              "'" : (0b010, 0b010, 0b000, 0b000, 0b000),
+                              "!" : (0b010, 0b010, 0b010, 0b000, 0b010),
+                              "?" : (0b110, 0b001, 0b010, 0b000, 0b010),
+                              "/" : (0b001, 0b001, 0b010, 0b100, 0b100),
+                              "(" : (0b010, 0b100, 0b100, 0b100, 0b010),
+                              ")" : (0b010, 0b001, 0b001, 0b001, 0b010),
+                              "*" : (0b000, 0b101, 0b010, 0b101, 0b000),
+                              "#" : (0b101, 0b111, 0b101, 0b111, 0b101),
+                              "%" : (0b101, 0b001, 0b010, 0b100, 0b101)
+                            }
+
+MATRIX_WIDTH              = 16
+MATRIX_HEIGHT             = 8
+MATRIX_CHAR_WIDTH         = 4        # 3 columns + 1 column of space
+MATRIX_CHAR_TOP           = 1        # Row of the top of the characters
+MATRIX_CHARS              = MATRIX_WIDTH // MATRIX_CHAR_WIDTH
+MATRIX_GLYPH_ROWS         = 5
+MATRIX_POINT_VALUE        = 0x8000
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=256)
+def compile_alphanum_text(value):
+    """Compile text into the four raw 16 bit digit values of the 
+    alphanumeric display.  A "." turns on the decimal point of the 
+    previous character.
+    
+    Will throw a ValueError if the text does not fit on the display or if 
+    characters are used that are not supported.
+    """
+    digits = []
+    
+    for i, char in enumerate(value):
+        if ((char == ".") and (i > 0) and (value[i - 1] != ".")):
+            digits[-1] |= ALPHANUM_POINT_VALUE
+            continue
+        
+        index = ord(char) - ALPHANUM_FIRST_CHAR
+        
+        if ((index < 0) or (index >= len(ALPHANUM_FONT))):
+            raise ValueError("Character {0} not supported".format(char))
+        
+        digits.append(ALPHANUM_FONT[index])
+    
+    if ((len(digits) < 1) or (len(digits) > HT16K33.HT16K33_DIGITS)):
+        raise ValueError("Must have between 1 and 4 characters")
+    
+    return tuple(digits + [0] * (HT16K33.HT16K33_DIGITS - len(digits)))
+
+# End def
+
+
+@functools.lru_cache(maxsize=256)
+def compile_matrix_text(value):
+    """Compile text into the 8 row values of the matrix display.
+    
+    Will throw a ValueError if the text does not fit on the display or if 
+    characters are used that are not supported.
+    """
+    if ((len(value) < 1) or (len(value) > MATRIX_CHARS)):
+        raise ValueError("Must have between 1 and 4 characters")
+    
+    rows = [0] * MATRIX_HEIGHT
+    
+    for i, char in enumerate(value.upper()):
+        try:
+            glyph = MATRIX_FONT[char]
+        except KeyError:
+            raise ValueError("Character {0} not supported".format(char))
+        
+        x = i * MATRIX_CHAR_WIDTH
+        
+        for j, bits in enumerate(glyph):
+            # Bit 2 of the glyph row is the left most column
+            for k in range(3):
+                if (bits & (0b100 >> k)):
+                    rows[MATRIX_CHAR_TOP + j] |= (1 << (x + k))
+    
+    return tuple(rows)
+
+# End def
+
+
+@functools.lru_cache(maxsize=256)
+def compile_matrix_digits(value):
+    """Compile text (4 characters) into the four raw digit values (3x5
+    glyphs) of the matrix display.
+    
+    Will throw a ValueError if characters are used that are not supported.
+    """
+    digits = []
+    
+    for char in value.upper():
+        try:
+            glyph = MATRIX_FONT[char]
+        except KeyError:
+            raise ValueError("Character {0} not supported".format(char))
+        
+        data = 0
+        
+        for bits in glyph:
+            data = (data << 3) | bits
+        
+        digits.append(data)
+    
+    return tuple(digits)
+
+# End def
+
+
+class HT16K33Alphanumeric(HT16K33.HT16K33):
+    """ HT16K33 14-segment quad alphanumeric display """
+    point_value = ALPHANUM_POINT_VALUE
+    
+    def encode(self, data, double_point=False):
+        """Encode a hex digit (0 - 15) as a 14-segment value"""
+        if ((data < 0) or (data > 15)):
+            raise ValueError("Digit value must be between 0 and 15.")
+        
+        ret_val = ALPHANUM_FONT[ord(ALPHANUM_HEX_DIGITS[data]) - ALPHANUM_FIRST_CHAR]
+        
+        if double_point:
+            ret_val |= ALPHANUM_POINT_VALUE
+        
+        return ret_val
+
+    # End def
+
+
+    def _set_digit_register(self, digit_number, data):
+        """Set the two registers of the digit in the buffer"""
+        self._set_register(2 * digit_number, data & 0xFF)
+        self._set_register((2 * digit_number) + 1, (data >> 8) & 0xFF)
+
+    # End def
+
+
+    def set_digit_raw(self, digit_number, data, double_point=False):
+        """Update the given digit of the display using a raw 16 bit value"""
+        with self.batch():
+            self._set_digit_register(digit_number, data)
+
+    # End def
+
+
+    def set_digits_raw(self, data):
+        """Update all four digits of the display using raw 16 bit values"""
+        with self.batch():
+            for i in range(HT16K33.HT16K33_DIGITS):
+                self._set_digit_register(i, data[i])
+
+    # End def
+
+
+    def set_colon(self, enable):
+        """There is no colon on the alphanumeric display:  turning it off does
+        nothing (e.g. in clear()); turning it on raises ValueError
+        """
+        if enable:
+            raise ValueError("Alphanumeric display does not have a colon")
+
+    # End def
+
+
+    def _signed_digits(self, value):
+        """Return the raw digit values for a value between -999 and 9999"""
+        if ((value < HT16K33.HT16K33_MIN_VALUE) or (value > HT16K33.HT16K33_MAX_VALUE)):
+            raise ValueError("Value is not between -999 and 9999")
+        
+        if (value < 0):
+            return compile_alphanum_text("-{0:03d}".format(-value))
+        
+        return compile_alphanum_text("{0:04d}".format(value))
+
+    # End def
+
+
+    def _hex_digits(self, value):
+        """Return the raw digit values for a value between 0x0000 and 0xFFFF"""
+        return compile_alphanum_text("{0:04X}".format(value))
+
+    # End def
+
+
+    def _compile_text(self, value):
+        """Return the raw digit values for the text"""
+        return compile_alphanum_text(value)
+
+    # End def
+
+# End class
+
+
+class HT16K33Matrix16x8(HT16K33.HT16K33):
+    """ HT16K33 16x8 LED matrix display """
+    point_value = MATRIX_POINT_VALUE
+    
+    def _check_pixel(self, x, y):
+        """Check that the pixel is on the display"""
+        if ((x < 0) or (x >= MATRIX_WIDTH) or (y < 0) or (y >= MATRIX_HEIGHT)):
+            raise ValueError("Pixel ({0}, {1}) is not on the display".format(x, y))
+
+    # End def
+
+
+    def _set_row(self, y, value):
+        """Set the two registers of the row in the buffer"""
+        self._set_register(2 * y, value & 0xFF)
+        self._set_register((2 * y) + 1, (value >> 8) & 0xFF)
+
+    # End def
+
+
+    def _get_row(self, y):
+        """Return the value of the row in the buffer"""
+        return self.buffer[2 * y] | (self.buffer[(2 * y) + 1] << 8)
+
+    # End def
+
+
+    def set_pixel(self, x, y, on=True):
+        """Turn the pixel at column x, row y on / off"""
+        self._check_pixel(x, y)
+        
+        with self.batch():
+            if on:
+                self._set_row(y, self._get_row(y) | (1 << x))
+            else:
+                self._set_row(y, self._get_row(y) & ~(1 << x))
+
+    # End def
+
+
+    def get_pixel(self, x, y):
+        """Return True if the pixel at column x, row y is on"""
+        self._check_pixel(x, y)
+        
+        return bool(self._get_row(y) & (1 << x))
+
+    # End def
+
+
+    def fill(self, on=True):
+        """Turn all pixels on / off"""
+        if on:
+            self.set_image([(1 << MATRIX_WIDTH) - 1] * MATRIX_HEIGHT)
+        else:
+            self.set_image([0] * MATRIX_HEIGHT)
+
+    # End def
+
+
+    def set_image(self, rows):
+        """Set all pixels from 8 row values (bit x of row y = pixel (x, y))"""
+        if (len(rows) != MATRIX_HEIGHT):
+            raise ValueError("Image must have 8 rows")
+        
+        with self.batch():
+            for y in range(MATRIX_HEIGHT):
+                self._set_row(y, rows[y])
+
+    # End def
+
+
+    def encode(self, data, double_point=False):
+        """Encode a hex digit (0 - 15) as a raw glyph value"""
+        if ((data < 0) or (data > 15)):
+            raise ValueError("Digit value must be between 0 and 15.")
+        
+        ret_val = compile_matrix_digits(ALPHANUM_HEX_DIGITS[data])[0]
+        
+        if double_point:
+            ret_val |= MATRIX_POINT_VALUE
+        
+        return ret_val
+
+    # End def
+
+
+    def _set_digit_glyph(self, digit_number, data):
+        """Draw the glyph of the digit in the buffer"""
+        if ((digit_number < 0) or (digit_number >= MATRIX_CHARS)):
+            raise ValueError("Digit must be between 0 and {0}".format(MATRIX_CHARS - 1))
+        
+        x = digit_number * MATRIX_CHAR_WIDTH
+        
+        for j in range(MATRIX_GLYPH_ROWS):
+            y    = MATRIX_CHAR_TOP + j
+            bits = (data >> (3 * (MATRIX_GLYPH_ROWS - 1 - j))) & 0b111
+            row  = self._get_row(y) & ~(((1 << MATRIX_CHAR_WIDTH) - 1) << x)
+            
+            # Bit 2 of the glyph row is the left most column
+            for k in range(3):
+                if (bits & (0b100 >> k)):
+                    row |= (1 << (x + k))
+            
+            # Decimal point in the space after the character
+            if ((j == MATRIX_GLYPH_ROWS - 1) and (data & MATRIX_POINT_VALUE)):
+                row |= (1 << (x + 3))
+            
+            self._set_row(y, row)
+
+    # End def
+
+
+    def set_digit_raw(self, digit_number, data, double_point=False):
+        """Update the given character of the display using a raw glyph value"""
+        with self.batch():
+            self._set_digit_glyph(digit_number, data)
+
+    # End def
+
+
+    def set_digits_raw(self, data):
+        """Update all four characters of the display using raw glyph values"""
+        with self.batch():
+            for i in range(MATRIX_CHARS):
+                self._set_digit_glyph(i, data[i])
+
+    # End def
+
+
+    def set_colon(self, enable):
+        """There is no colon on the matrix display:  turning it off does 
+        nothing (e.g. in clear()); turning it on raises ValueError
+        """
+        if enable:
+            raise ValueError("Matrix display does not have a colon")
+
+    # End def
+
+
+    def _signed_digits(self, value):
+        """Return the raw digit values for a value between -999 and 9999"""
+        if ((value < HT16K33.HT16K33_MIN_VALUE) or (value > HT16K33.HT16K33_MAX_VALUE)):
+            raise ValueError("Value is not between -999 and 9999")
+        
+        if (value < 0):
+            return compile_matrix_digits("-{0:03d}".format(-value))
+        
+        return compile_matrix_digits("{0:04d}".format(value))
+
+    # End def
+
+
+    def _hex_digits(self, value):
+        """Return the raw digit values for a value between 0x0000 and 0xFFFF"""
+        return compile_matrix_digits("{0:04X}".format(value))
+
+    # End def
+
+
+    def update(self, value):
+        """Update the value on the display (0 - 9999)"""
+        if ((value < 0) or (value > HT16K33.HT16K33_MAX_VALUE)):
+            raise ValueError("Value is not between 0 and 9999")
+        
+        self.text("{0:04d}".format(value))
+
+    # End def
+
+
+    def update_signed(self, value):
+        """Update the value on the display (-999 - 9999)"""
+        if ((value < HT16K33.HT16K33_MIN_VALUE) or (value > HT16K33.HT16K33_MAX_VALUE)):
+            raise ValueError("Value is not between -999 and 9999")
+        
+        if (value < 0):
+            self.text("-{0:03d}".format(-value))
+        else:
+            self.text("{0:04d}".format(value))
+
+    # End def
+
+
+    def update_float(self, value, decimals=None):
+        """Update the value on the display with a decimal point (see 
+        HT16K33.update_float())
+        """
+        with self.batch():
+            self.blank()
+            HT16K33.HT16K33.update_float(self, value, decimals)
+
+    # End def
+
+
+    def update_hex(self, value):
+        """Update the value on the display in hex (0x0000 - 0xFFFF)"""
+        if ((value < 0) or (value > HT16K33.HT16K33_MAX_HEX_VALUE)):
+            raise ValueError("Value is not between 0x0000 and 0xFFFF")
+        
+        self.text("{0:04X}".format(value))
+
+    # End def
+
+
+    def text(self, value):
+        """ Update the value on the display with text (1 - 4 characters)
+        
+        Will throw a ValueError if there are not the appropriate number of 
+        characters or if characters are used that are not supported.
+        """
+        self.set_image(compile_matrix_text(value))
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    delay = 0.5
+    
+    print("Test HT16K33 Alphanumeric Display:")
+    
+    display = HT16K33Alphanumeric(1, 0x70)
+    
+    for value in ["ABCD", "wxyz", "K.M.V.Z.", "#$%&"]:
+        display.text(value)
+        time.sleep(delay)
+    
+    display.update_float(3.14159)
+    time.sleep(delay)
+    
+    display.update_hex(0xBEEF)
+    time.sleep(delay)
+    
+    display.text("done")
+    display.close()
+    
+    print("Test HT16K33 Matrix Display:")
+    
+    matrix = HT16K33Matrix16x8(1, 0x71)
+    
+    for y in range(MATRIX_HEIGHT):
+        for x in range(MATRIX_WIDTH):
+            matrix.set_pixel(x, y)
+    
+    time.sleep(delay)
+    
+    for value in ["HI", "1234", "KWXZ"]:
+        matrix.text(value)
+        time.sleep(delay)
+    
+    matrix.text("DONE")
+    matrix.close()
+    
+    print("Test Finished.")
+
@@ -0,0 +1,211 @@
+"""
+--------------------------------------------------------------------------
+HT16K33 Startup Benchmark
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+HT16K33 Startup Benchmark
+
+  Measure the time from creating a HT16K33 display to the first rendered
+frame for each startup mode:
+  - full:  send all setup commands and blank the display (default)
+  - lazy:  send all setup commands; defer the clear to the first render
+           (lazy=True)
+  - warm:  lazy, with the settings saved by an earlier start during this
+           boot (lazy=True, state_file=...) so no setup commands are sent
+
+  By default the benchmark uses a FakeI2CBus that waits a fixed time per
+bus transaction (delay, in seconds) to stand in for the bus / process cost
+on the board.  Use "hardware" to run against a real display at 0x70 on 
+I2C bus 1 with both the I2CBus and I2CSetBus transports.
+
+Usage:
+
+  python3 ht16k33_benchmark.py [delay | hardware] [runs]
+
+"""
+import os
+import sys
+import time
+import tempfile
+
+import ht16k33 as HT16K33
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+MODES                       = ["full", "lazy", "warm"]
+
+DEFAULT_DELAY               = 0.005      # Seconds per simulated transaction
+DEFAULT_RUNS                = 20
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class DelayedI2CBus(HT16K33.FakeI2CBus):
+    """ FakeI2CBus that waits a fixed time for each bus transaction """
+    delay = None
+    
+    def __init__(self, delay):
+        """ Initialize variables """
+        HT16K33.FakeI2CBus.__init__(self)
+        
+        self.delay = delay
+    
+    # End def
+
+
+    def write_byte(self, address, value):
+        """Record a single command byte sent to the device"""
+        time.sleep(self.delay)
+        HT16K33.FakeI2CBus.write_byte(self, address, value)
+
+    # End def
+
+
+    def write_block_data(self, address, register, data):
+        """Write a block of bytes starting at the given register"""
+        time.sleep(self.delay)
+        HT16K33.FakeI2CBus.write_block_data(self, address, register, data)
+
+    # End def
+
+
+    def read_block_data(self, address, register, length):
+        """Read a block of bytes starting at the given register"""
+        time.sleep(self.delay)
+        return HT16K33.FakeI2CBus.read_block_data(self, address, register, length)
+
+    # End def
+
+
+    def write_many(self, messages):
+        """Write a list of (address, data) messages in one transaction"""
+        time.sleep(self.delay)
+        HT16K33.FakeI2CBus.write_many(self, messages)
+
+    # End def
+
+# End class
+
+
+def start_display(transport, mode, state_file):
+    """Create a display in the given mode and render the first frame.
+    
+    Returns (seconds, display statistics)
+    """
+    start = time.perf_counter()
+    
+    if (mode == "full"):
+        display = HT16K33.HT16K33(1, 0x70, transport=transport)
+    elif (mode == "lazy"):
+        display = HT16K33.HT16K33(1, 0x70, transport=transport, lazy=True)
+    else:
+        display = HT16K33.HT16K33(1, 0x70, transport=transport, lazy=True, 
+                                  state_file=state_file)
+    
+    display.text("----")
+    
+    elapsed = time.perf_counter() - start
+    stats   = display.get_stats()
+    
+    display.close()
+    
+    return (elapsed, stats)
+
+# End def
+
+
+def benchmark(transport, runs):
+    """Print the startup time of each mode for the transport"""
+    (fd, state_file) = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    
+    try:
+        # Save the display settings for the warm starts
+        start_display(transport, "warm", state_file)
+        
+        print("    {0:6s} {1:>10s} {2:>14s} {3:>10s} {4:>10s}".format(
+              "mode", "time (ms)", "transactions", "commands", "skipped"))
+        
+        for mode in MODES:
+            times = []
+            
+            for i in range(runs):
+                # Start from a display showing something else
+                transport.write_block_data(0x70, 0x00, bytes(HT16K33.HT16K33_RAM_SIZE))
+                
+                (elapsed, stats) = start_display(transport, mode, state_file)
+                times.append(elapsed)
+            
+            print("    {0:6s} {1:10.2f} {2:14d} {3:10d} {4:10d}".format(
+                  mode, 1000 * sum(times) / len(times), 
+                  stats["transactions"] + stats["commands_written"],
+                  stats["commands_written"], stats["commands_skipped"]))
+    finally:
+        os.remove(state_file)
+
+# End def
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    runs = DEFAULT_RUNS
+    
+    if (len(sys.argv) > 2):
+        runs = int(sys.argv[2])
+    
+    if ((len(sys.argv) > 1) and (sys.argv[1] == "hardware")):
+        for transport in [HT16K33.I2CBus(1), HT16K33.I2CSetBus(1)]:
+            print("{0}:".format(type(transport).__name__))
+            benchmark(transport, runs)
+            transport.close()
+    else:
+        delay = DEFAULT_DELAY
+        
+        if (len(sys.argv) > 1):
+            delay = float(sys.argv[1])
+        
+        print("FakeI2CBus ({0} ms per transaction):".format(1000 * delay))
+        benchmark(DelayedI2CBus(delay), runs)
+
@@ -0,0 +1,422 @@
+"""
+--------------------------------------------------------------------------
+HT16K33 Brightness and Blink Effects
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+HT16K33 Brightness and Blink Effects
+
+  Fades, pulses and alerts that use the hardware dimming and blink modes of
+the HT16K33 instead of redrawing the display.  A single scheduler thread 
+runs the current effect:
+  - A new effect replaces the current one (latest request wins)
+  - Commands are only sent when the brightness / blink rate changes
+  - At most max_rate command updates are sent per second
+  - The thread sleeps while no effect is running and while a constant 
+    effect (e.g. an alert) waits for its end time
+
+Software API:
+
+  DisplayEffects(display, max_rate=10)
+    - Provide the HT16K33 display
+    - Provide the maximum number of command updates per second
+    
+    set_brightness(brightness)
+      - Set the brightness (0 - 15)
+    
+    fade(brightness, duration)
+      - Fade from the current brightness to brightness over duration seconds
+    
+    pulse(period=2.0, low=HT16K33_BRIGHTNESS_DARKEST, high=HT16K33_BRIGHTNESS_HIGHEST, count=None)
+      - Fade between low and high brightness every period seconds; count 
+        pulses (forever if None), then restore the brightness
+    
+    alert(blink=HT16K33_BLINK_2HZ, duration=None, brightness=HT16K33_BRIGHTNESS_HIGHEST)
+      - Blink the display with the hardware blink for duration seconds 
+        (forever if None), then restore the brightness and blink rate
+    
+    cancel()
+      - Stop the current effect and restore the brightness and blink rate
+    
+    wait(timeout=None)
+      - Wait for the current effect to finish
+    
+    close()
+      - Stop the scheduler thread
+
+"""
+import time
+import threading
+
+import ht16k33 as HT16K33
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class Effect():
+    """ Brightness / blink effect
+    
+        start   - Start time (time.monotonic())
+        end     - End time (None runs until replaced)
+        final   - (brightness, blink) to set at the end of the effect
+        varying - True if the state changes over time
+    """
+    start   = None
+    end     = None
+    final   = None
+    varying = False
+    
+    def __init__(self, start, end, final):
+        """ Initialize variables """
+        self.start = start
+        self.end   = end
+        self.final = final
+    
+    # End def
+
+
+    def state(self, now):
+        """ Return the (brightness, blink) at time now """
+        return self.final
+
+    # End def
+
+# End class
+
+
+class Fade(Effect):
+    """ Fade between two brightness levels """
+    varying = True
+    
+    def __init__(self, start, duration, from_brightness, to_brightness, blink):
+        """ Initialize variables """
+        Effect.__init__(self, start, start + duration, (to_brightness, blink))
+        
+        self.from_brightness = from_brightness
+        self.to_brightness   = to_brightness
+        self.blink           = blink
+    
+    # End def
+
+
+    def state(self, now):
+        """ Return the (brightness, blink) at time now """
+        fraction   = (now - self.start) / (self.end - self.start)
+        brightness = self.from_brightness + ((self.to_brightness - self.from_brightness) * fraction)
+        
+        return (int(round(brightness)), self.blink)
+
+    # End def
+
+# End class
+
+
+class Pulse(Effect):
+    """ Fade between low and high brightness every period """
+    varying = True
+    
+    def __init__(self, start, period, low, high, count, final):
+        """ Initialize variables """
+        if count is None:
+            end = None
+        else:
+            end = start + (count * period)
+        
+        Effect.__init__(self, start, end, final)
+        
+        self.period = period
+        self.low    = low
+        self.high   = high
+    
+    # End def
+
+
+    def state(self, now):
+        """ Return the (brightness, blink) at time now """
+        # Triangle wave:  low -> high -> low
+        phase      = ((now - self.start) % self.period) / self.period
+        brightness = self.low + ((self.high - self.low) * (1.0 - abs((2.0 * phase) - 1.0)))
+        
+        return (int(round(brightness)), self.final[1])
+
+    # End def
+
+# End class
+
+
+class Alert(Effect):
+    """ Hardware blink at a fixed brightness """
+    
+    def __init__(self, start, duration, blink, brightness, final):
+        """ Initialize variables """
+        if duration is None:
+            end = None
+        else:
+            end = start + duration
+        
+        Effect.__init__(self, start, end, final)
+        
+        self.alert_state = (brightness, blink)
+    
+    # End def
+
+
+    def state(self, now):
+        """ Return the (brightness, blink) at time now """
+        return self.alert_state
+
+    # End def
+
+# End class
+
+
+class DisplayEffects():
+    """ Scheduler for HT16K33 brightness / blink effects """
+    display         = None
+    min_interval    = None
+    condition       = None
+    effect          = None
+    base_brightness = None
+    base_blink      = None
+    stopped         = None
+    thread          = None
+    
+    def __init__(self, display, max_rate=10):
+        """ Initialize variables; Start the scheduler thread """
+        if (max_rate <= 0):
+            raise ValueError("Rate must be greater than 0")
+        
+        self.display         = display
+        self.min_interval    = 1.0 / max_rate
+        self.condition       = threading.Condition()
+        self.effect          = None
+        self.stopped         = False
+        
+        # Brightness / blink rate to restore after pulses / alerts
+        self.base_brightness = display.brightness
+        self.base_blink      = display.blink
+        
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+    
+    # End def
+
+
+    def _post(self, effect):
+        """ Replace the current effect """
+        with self.condition:
+            self.effect = effect
+            self.condition.notify_all()
+
+    # End def
+
+
+    def set_brightness(self, brightness):
+        """ Set the brightness (0 - 15) """
+        self.display._check_brightness(brightness)
+        
+        now = time.monotonic()
+        
+        self.base_brightness = brightness
+        self._post(Effect(now, now, (brightness, self.base_blink)))
+
+    # End def
+
+
+    def fade(self, brightness, duration):
+        """ Fade from the current brightness to brightness over duration """
+        self.display._check_brightness(brightness)
+        
+        if (duration <= 0):
+            self.set_brightness(brightness)
+            return
+        
+        self.base_brightness = brightness
+        self._post(Fade(time.monotonic(), duration, self.display.brightness, brightness, self.base_blink))
+
+    # End def
+
+
+    def pulse(self, period=2.0, low=HT16K33.HT16K33_BRIGHTNESS_DARKEST, 
+                    high=HT16K33.HT16K33_BRIGHTNESS_HIGHEST, count=None):
+        """ Fade between low and high brightness every period """
+        self.display._check_brightness(low)
+        self.display._check_brightness(high)
+        
+        if (period <= 0):
+            raise ValueError("Period must be greater than 0")
+        
+        self._post(Pulse(time.monotonic(), period, low, high, count, 
+                         (self.base_brightness, self.base_blink)))
+
+    # End def
+
+
+    def alert(self, blink=HT16K33.HT16K33_BLINK_2HZ, duration=None, 
+                    brightness=HT16K33.HT16K33_BRIGHTNESS_HIGHEST):
+        """ Blink the display for duration seconds (forever if None) """
+        self.display._check_blink(blink)
+        self.display._check_brightness(brightness)
+        
+        self._post(Alert(time.monotonic(), duration, blink, brightness, 
+                         (self.base_brightness, self.base_blink)))
+
+    # End def
+
+
+    def cancel(self):
+        """ Stop the current effect; restore the brightness and blink rate """
+        now = time.monotonic()
+        
+        self._post(Effect(now, now, (self.base_brightness, self.base_blink)))
+
+    # End def
+
+
+    def wait(self, timeout=None):
+        """ Wait for the current effect to finish """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.effect is None, timeout)
+
+    # End def
+
+
+    def _run(self):
+        """ Run the effects until stopped """
+        last_command = None
+        
+        while True:
+            with self.condition:
+                while ((self.effect is None) and not self.stopped):
+                    self.condition.wait()
+                
+                if self.stopped:
+                    break
+                
+                effect = self.effect
+                now    = time.monotonic()
+                
+                # Rate limit the commands
+                if ((last_command is not None) and (now - last_command < self.min_interval)):
+                    self.condition.wait(self.min_interval - (now - last_command))
+                    continue
+                
+                done = ((effect.end is not None) and (now >= effect.end))
+                
+                if done:
+                    (brightness, blink) = effect.final
+                else:
+                    (brightness, blink) = effect.state(now)
+            
+            # Only changes are sent to the display
+            sent  = self.display.set_brightness(brightness)
+            sent |= self.display.set_blink(blink)
+            
+            if sent:
+                last_command = time.monotonic()
+            
+            with self.condition:
+                if (self.effect is not effect):
+                    continue
+                
+                if done:
+                    self.effect = None
+                    self.condition.notify_all()
+                elif effect.varying:
+                    self.condition.wait(self.min_interval)
+                elif effect.end is not None:
+                    self.condition.wait(max(0.0, effect.end - time.monotonic()))
+                else:
+                    self.condition.wait()
+
+    # End def
+
+
+    def close(self):
+        """ Stop the scheduler thread """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        
+        self.thread.join()
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Test HT16K33 Effects:")
+    
+    display = HT16K33.HT16K33(1, 0x70)
+    effects = DisplayEffects(display)
+    
+    display.text("FAdE")
+    effects.fade(HT16K33.HT16K33_BRIGHTNESS_DARKEST, 2.0)
+    effects.wait()
+    effects.fade(HT16K33.HT16K33_BRIGHTNESS_HIGHEST, 2.0)
+    effects.wait()
+
+    display.text("PULS")
+    effects.pulse(period=2.0, count=2)
+    effects.wait()
+
+    display.text("ALrt")
+    effects.alert(duration=3.0)
+    effects.wait()
+    
+    print("    {0}".format(display.get_stats()))
+    
+    effects.close()
+    display.text("done")
+    display.close()
+    
+    print("Test Finished.")
+
@@ -0,0 +1,286 @@
+"""
+--------------------------------------------------------------------------
+HT16K33 Keypad
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+HT16K33 Keypad
+
+  The HT16K33 scans a key matrix on its own, so a whole keypad can be read 
+with a single I2C read of the key RAM instead of polling one GPIO per 
+button.  The keypad reads the key RAM once per poll() and reports press / 
+release edges once a key has read the same value for debounce_count polls.
+
+Software API:
+
+  HT16K33Keypad(display, debounce_count=2, key_names=None, 
+                row_int=HT16K33_ROWINT_ROW, sleep_time=0.02)
+    - Provide the HT16K33 display the keypad is connected to
+    - A key must read the same value for debounce_count polls before an 
+      edge is reported
+    - key_names optionally maps key numbers to names (e.g. {0 : "1", ... });
+      keys are reported by number if they have no name
+    - row_int selects the mode of the ROW15/INT pin (see ht16k33.py)
+    - sleep_time is the time between polls in wait_for_press()
+    
+    poll()
+      - Read the key RAM once; return a list of (key, pressed) edges
+    
+    is_pressed(key)
+      - Return True if the key is pressed (debounced)
+    
+    get_pressed_keys()
+      - Return a list of the keys that are pressed (debounced)
+    
+    wait_for_press(timeout=None)
+      - Poll until a key is pressed; return the key (None on timeout)
+      - Function consumes time
+      
+    Callback Functions:
+      - set_on_press_callback(function)
+        - Executed with the key when a key is pressed
+      - set_on_release_callback(function)
+        - Executed with the key when a key is released
+
+"""
+import time
+
+import ht16k33 as HT16K33
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class HT16K33Keypad():
+    """ Debounced key scan input for a HT16K33 """
+    display             = None
+    debounce_count      = None
+    key_names           = None
+    key_numbers         = None
+    sleep_time          = None
+    
+    stable              = None    # Bit mask of the debounced key state
+    counts              = None    # Number of polls each changing key has been stable
+    
+    on_press_callback   = None
+    on_release_callback = None
+    
+    def __init__(self, display, debounce_count=2, key_names=None, 
+                 row_int=HT16K33.HT16K33_ROWINT_ROW, sleep_time=0.02):
+        """ Initialize variables and enable the key scan """
+        if (debounce_count < 1):
+            raise ValueError("Debounce count must be at least 1")
+        
+        self.display        = display
+        self.debounce_count = debounce_count
+        self.sleep_time     = sleep_time
+        self.stable         = 0
+        self.counts         = {}
+        
+        if key_names is None:
+            self.key_names   = {}
+            self.key_numbers = {}
+        else:
+            self.key_names   = dict(key_names)
+            self.key_numbers = {name : key for (key, name) in key_names.items()}
+        
+        self._setup(row_int)
+    
+    # End def
+
+
+    def _setup(self, row_int):
+        """ Set up the key scan on the chip """
+        self.display.set_row_int(row_int)
+        
+        # Read the key RAM to clear any latched keys
+        self.display.read_keys()
+
+    # End def
+
+
+    def _key_name(self, key):
+        """ Return the name of the key number """
+        return self.key_names.get(key, key)
+
+    # End def
+
+
+    def _key_number(self, key):
+        """ Return the key number of the key name """
+        return self.key_numbers.get(key, key)
+
+    # End def
+
+
+    def poll(self):
+        """ Read the key RAM once and return a list of (key, pressed) edges """
+        keys    = self.display.read_keys()
+        changed = keys ^ self.stable
+        edges   = []
+        
+        # Keys that match the debounced state start counting again
+        for key in list(self.counts):
+            if not (changed & (1 << key)):
+                del self.counts[key]
+        
+        while changed:
+            bit      = changed & -changed
+            key      = bit.bit_length() - 1
+            changed ^= bit
+            
+            count = self.counts.get(key, 0) + 1
+            
+            if (count >= self.debounce_count):
+                del self.counts[key]
+                self.stable ^= bit
+                edges.append((self._key_name(key), bool(keys & bit)))
+            else:
+                self.counts[key] = count
+        
+        for (key, pressed) in edges:
+            if pressed:
+                if self.on_press_callback is not None:
+                    self.on_press_callback(key)
+            else:
+                if self.on_release_callback is not None:
+                    self.on_release_callback(key)
+        
+        return edges
+
+    # End def
+
+
+    def is_pressed(self, key):
+        """ Is the key pressed (debounced)? """
+        return bool(self.stable & (1 << self._key_number(key)))
+
+    # End def
+
+
+    def get_pressed_keys(self):
+        """ Return a list of the keys that are pressed (debounced) """
+        return [self._key_name(key) for key in range(HT16K33.HT16K33_KEY_COUNT) 
+                if self.stable & (1 << key)]
+
+    # End def
+
+
+    def wait_for_press(self, timeout=None):
+        """ Poll the keypad until a key is pressed and return the key.  
+            Returns None if no key was pressed before the timeout.
+        """
+        if timeout is not None:
+            end_time = time.monotonic() + timeout
+        
+        while True:
+            for (key, pressed) in self.poll():
+                if pressed:
+                    return key
+            
+            if ((timeout is not None) and (time.monotonic() >= end_time)):
+                return None
+            
+            time.sleep(self.sleep_time)
+
+    # End def
+
+
+    # -----------------------------------------------------
+    # Callback Functions
+    # -----------------------------------------------------
+
+    def set_on_press_callback(self, function):
+        """ Function executed with the key when a key is pressed """
+        self.on_press_callback = function
+    
+    # End def
+
+    def set_on_release_callback(self, function):
+        """ Function executed with the key when a key is released """
+        self.on_release_callback = function
+    
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Test HT16K33 Keypad:")
+    
+    display = HT16K33.HT16K33(1, 0x70)
+    keypad  = HT16K33Keypad(display)
+
+    def on_press(key):
+        print("    Key {0} pressed".format(key))
+        display.update(key)
+    # End def
+
+    def on_release(key):
+        print("    Key {0} released".format(key))
+    # End def
+
+    keypad.set_on_press_callback(on_press)
+    keypad.set_on_release_callback(on_release)
+
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    print("Use Ctrl-C to Exit")
+    
+    try:
+        while True:
+            keypad.poll()
+            time.sleep(keypad.sleep_time)
+        
+    except KeyboardInterrupt:
+        pass
+
+    display.text("done")
+    display.close()
+    
+    print("Test Finished.")
+
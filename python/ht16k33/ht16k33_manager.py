@@ -0,0 +1,284 @@
+"""
+--------------------------------------------------------------------------
+HT16K33 Multi-Display Manager
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+HT16K33 Multi-Display Manager
+
+  Manage several HT16K33 displays (addresses 0x70 - 0x77) on one I2C bus.
+The manager opens the bus once and the displays only update their buffers;
+each tick() collects the changed registers of every display and sends them
+to the bus in a single pass (one I2C_RDWR ioctl with the I2CBus transport),
+so refreshing eight displays costs one system call instead of eight.
+
+Software API:
+
+  HT16K33Manager(bus, transport=None)
+    - Provide i2c bus that the displays are on
+    - Optionally provide the transport (by default an I2CBus() is opened)
+    
+    add_display(address, blink=HT16K33_BLINK_OFF, brightness=HT16K33_BRIGHTNESS_HIGHEST)
+      - Create and return a HT16K33 display at the given address.  The 
+        display is not written until the next tick().
+    
+    get_display(address)
+      - Return the display at the given address
+    
+    tick()
+      - Write the pending updates of all displays in one bus pass
+      - Returns the number of displays that were written
+    
+    start(rate=20)
+      - Call tick() rate times per second in a background thread
+    
+    stop()
+      - Stop the background thread
+    
+    get_stats()
+      - Return a dictionary with the number of ticks, bus passes and the 
+        statistics summed over all displays
+    
+    close()
+      - Stop the background thread, write pending updates and close the bus
+
+"""
+import time
+import threading
+
+import ht16k33 as HT16K33
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HT16K33_MIN_ADDRESS = 0x70
+HT16K33_MAX_ADDRESS = 0x77
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class HT16K33Manager():
+    """ Manage several HT16K33 displays on one I2C bus """
+    bus        = None
+    transport  = None
+    displays   = None
+    lock       = None
+    stop_event = None
+    thread     = None
+    ticks      = None
+    bus_passes = None
+    
+    def __init__(self, bus, transport=None):
+        """ Initialize variables; Open the bus """
+        self.bus        = bus
+        self.displays   = {}
+        self.lock       = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread     = None
+        self.ticks      = 0
+        self.bus_passes = 0
+        
+        if transport is None:
+            self.transport = HT16K33.I2CBus(bus)
+        else:
+            self.transport = transport
+    
+    # End def
+
+
+    def add_display(self, address, blink=HT16K33.HT16K33_BLINK_OFF, brightness=HT16K33.HT16K33_BRIGHTNESS_HIGHEST):
+        """ Create a display at the given address on the bus """
+        if ((address < HT16K33_MIN_ADDRESS) or (address > HT16K33_MAX_ADDRESS)):
+            raise ValueError("Address must be between 0x70 and 0x77")
+        
+        with self.lock:
+            if address in self.displays:
+                raise ValueError("Display 0x{0:x} already added".format(address))
+            
+            display = HT16K33.HT16K33(self.bus, address, blink, brightness, 
+                                      transport=self.transport, auto_flush=False)
+            
+            self.displays[address] = display
+        
+        return display
+
+    # End def
+
+
+    def get_display(self, address):
+        """ Return the display at the given address """
+        return self.displays[address]
+
+    # End def
+
+
+    def tick(self):
+        """ Write the pending updates of all displays in one bus pass """
+        with self.lock:
+            self.ticks += 1
+            pending     = []
+            
+            for address in sorted(self.displays):
+                display = self.displays[address]
+                update  = display._take_pending()
+                
+                if update is not None:
+                    pending.append((display, update))
+            
+            if (len(pending) == 0):
+                return 0
+            
+            messages = [(display.address, bytes([first]) + data) 
+                        for (display, (first, data, touched)) in pending]
+            
+            self.transport.write_many(messages)
+            self.bus_passes += 1
+            
+            for (display, update) in pending:
+                display._pending_written(*update)
+            
+            return len(pending)
+
+    # End def
+
+
+    def _run(self, rate):
+        """ Call tick() rate times per second until stopped """
+        period = 1.0 / rate
+        start  = time.monotonic()
+        n      = 0
+        
+        while not self.stop_event.is_set():
+            self.tick()
+            
+            # Skip any ticks that were missed rather than running them late
+            n     = max(n + 1, int((time.monotonic() - start) / period) + 1)
+            delay = (start + (n * period)) - time.monotonic()
+            
+            if (delay > 0):
+                self.stop_event.wait(delay)
+
+    # End def
+
+
+    def start(self, rate=20):
+        """ Call tick() rate times per second in a background thread """
+        if (rate <= 0):
+            raise ValueError("Rate must be greater than 0")
+        
+        self.stop()
+        self.stop_event.clear()
+        
+        self.thread = threading.Thread(target=self._run, args=(rate,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    # End def
+
+
+    def stop(self):
+        """ Stop the background thread """
+        self.stop_event.set()
+        
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return the statistics for the manager and all displays """
+        stats = {"ticks"         : self.ticks,
+                 "bus_passes"    : self.bus_passes,
+                 "bytes_written" : 0,
+                 "bytes_skipped" : 0,
+                 "transactions"  : 0}
+        
+        for display in self.displays.values():
+            for (key, value) in display.get_stats().items():
+                stats[key] = stats.get(key, 0) + value
+        
+        return stats
+
+    # End def
+
+
+    def close(self):
+        """ Stop the background thread; write pending updates; close the bus """
+        self.stop()
+        self.tick()
+        self.transport.close()
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Test HT16K33 Multi-Display Manager:")
+    
+    manager  = HT16K33Manager(1)
+    displays = [manager.add_display(address) for address in range(HT16K33_MIN_ADDRESS, HT16K33_MAX_ADDRESS + 1)]
+    
+    start = time.monotonic()
+    
+    for value in range(0, 1000):
+        for i, display in enumerate(displays):
+            display.update((value + i) % 10000)
+        
+        manager.tick()
+    
+    elapsed = time.monotonic() - start
+
+    print("    1000 ticks of {0} displays in {1:.3f}s".format(len(displays), elapsed))
+    print("    {0}".format(manager.get_stats()))
+    
+    for display in displays:
+        display.text("done")
+    
+    manager.close()
+    
+    print("Test Finished.")
+
@@ -38,10 +38,31 @@ such that the LED is ON when the output is "High"/"1" and OFF when the output is
 "Low" / "0", i.e. "low_off=True", or that the LED is OF when the output is 
 "High"/"1" and ON when the output is "Low" / "0", i.e. "low_off=False",
 
+  By default the LED uses Adafruit_BBIO.GPIO.  Any object with the same 
+setup() / input() / output() functions can be provided as the "backend" 
+instead, e.g. MmapGPIO from gpio_mmap.py, which writes the GPIO registers 
+directly.
+
+  blink() and pattern() hand the pattern to the kernel LED subsystem when 
+the LED has a kernel LED (/sys/class/leds/<name>, e.g. the USR LEDs) with 
+the "timer" / "pattern" trigger, so the LED blinks with no Python thread 
+and no wakeups.  Otherwise a software thread drives the pin.  Calling on(),
+off() or stop() ends the pattern.
+
+  The LED remembers the value it last wrote to the pin:  is_on() is answered 
+from memory (the pin is only read while the kernel drives the LED), and 
+on() / off() skip the write if the pin already has the value.  LEDGroup 
+changes several LEDs in one pass (with one write per GPIO bank if the 
+backend has an output_pins() function, e.g. MmapGPIO).
+
 Software API:
 
-  LED(pin, low_off=True)
+  LED(pin, low_off=True, backend=None, led_name=None, leds_root=LEDS_ROOT)
     - Provide pin that the LED is connected
+    - Optionally provide the GPIO backend (default Adafruit_BBIO.GPIO)
+    - Optionally provide the name of the kernel LED of the pin (by default
+      the USR LEDs use "beaglebone:green:usrN") and the directory of the 
+      kernel LEDs (e.g. a fake tree made by create_fake_leds())
     
     is_on()
       - Return a boolean value (i.e. True/False) if the LED is ON / OFF
@@ -52,7 +73,37 @@ Software API:
     off()
       - Turn the LED off    
 
+    blink(on_time, off_time=None)
+      - Blink the LED (times in seconds; off_time defaults to on_time)
+      - Returns True if the kernel blinks the LED, False if software does
+    
+    pattern(steps, repeat=-1)
+      - Repeat a list of (on, duration) steps (duration in seconds); 
+        repeat is the number of times to play the pattern (-1 forever)
+      - Returns True if the kernel plays the pattern, False if software does
+    
+    stop()
+      - Stop blinking / the pattern and turn the LED off
+    
+    get_write_stats()
+      - Return a dictionary with the number of pin writes and of writes 
+        skipped because the pin already had the value
+
+  LEDGroup(leds)
+    - Provide a dictionary of {name : LED}
+    
+    set(states)
+      - Turn LEDs on / off from a dictionary of {name : True / False}; 
+        returns the number of LEDs that were written
+
+  create_fake_leds(root, names=USR_LEDS.values())
+    - Create a fake /sys/class/leds tree for testing
+
 """
+import os
+import time
+import threading
+
 import Adafruit_BBIO.GPIO as GPIO
 
 # ------------------------------------------------------------------------
@@ -62,6 +113,14 @@ import Adafruit_BBIO.GPIO as GPIO
 HIGH          = GPIO.HIGH
 LOW           = GPIO.LOW
 
+LEDS_ROOT     = "/sys/class/leds"
+
+# Kernel LEDs of the PocketBeagle USR LEDs
+USR_LEDS      = {"USR0" : "beaglebone:green:usr0",
+                 "USR1" : "beaglebone:green:usr1",
+                 "USR2" : "beaglebone:green:usr2",
+                 "USR3" : "beaglebone:green:usr3"}
+
 # ------------------------------------------------------------------------
 # Global variables
 # ------------------------------------------------------------------------
@@ -72,13 +131,40 @@ LOW           = GPIO.LOW
 # Functions / Classes
 # ------------------------------------------------------------------------
 
+def create_fake_leds(root, names=USR_LEDS.values()):
+    """ Create a fake /sys/class/leds tree (for testing) """
+    for name in names:
+        path = os.path.join(root, name)
+        
+        os.makedirs(path, exist_ok=True)
+        
+        for (attribute, value) in [("trigger",        "[none] timer pattern heartbeat"),
+                                   ("brightness",     "0"),
+                                   ("max_brightness", "255")]:
+            with open(os.path.join(path, attribute), "w") as f:
+                f.write(value)
+
+# End def
+
+
 class LED():
     """ LED Class """
     pin             = None
     on_value        = None
     off_value       = None
+    gpio            = None
     
-    def __init__(self, pin=None, low_off=True):
+    led_path        = None    # Kernel LED directory (None if no kernel LED)
+    led_triggers    = None
+    pattern_mode    = None    # None, "kernel" or "software"
+    pattern_thread  = None
+    pattern_stop    = None
+    
+    value           = None    # Value last written to the pin (None if unknown)
+    writes          = None
+    skipped         = None
+    
+    def __init__(self, pin=None, low_off=True, backend=None, led_name=None, leds_root=LEDS_ROOT):
         """ Initialize variables and set up the LED """
         if (pin == None):
             raise ValueError("Pin not provided for LED()")
@@ -93,6 +179,27 @@ class LED():
         else:
             self.on_value  = LOW
             self.off_value = HIGH
+        
+        self.writes  = 0
+        self.skipped = 0
+        
+        if backend is None:
+            self.gpio = GPIO
+        else:
+            self.gpio = backend
+        
+        # Kernel LED used for blink() / pattern()
+        if led_name is None:
+            led_name = USR_LEDS.get(pin)
+        
+        self.led_triggers = []
+        
+        if led_name is not None:
+            path = os.path.join(leds_root, led_name)
+            
+            if os.path.isdir(path):
+                self.led_path     = path
+                self.led_triggers = self._read_led("trigger").replace("[", "").replace("]", "").split()
 
         # Initialize the hardware components        
         self._setup()
@@ -103,12 +210,10 @@ class LED():
     def _setup(self):
         """ Setup the hardware components. """
         # Initialize LED
-        GPIO.setup(self.pin, GPIO.OUT)
+        self.gpio.setup(self.pin, self.gpio.OUT)
         
         # Set default value as off
         self.off()
-        
-        self.off()
 
     # End def
 
@@ -119,31 +224,223 @@ class LED():
            Returns:  True  - LED is ON
                      False - LED is OFF
         """
+        # Read the pin only if the value is unknown (kernel pattern)
+        if self.value is None:
+            return self.gpio.input(self.pin) == self.on_value
         
-        # !!! NEED TO IMPLEMENT !!! #
-        return GPIO.input(self.pin) == self.on_value
-        # !!! NEED TO IMPLEMENT !!! #
+        return self.value == self.on_value
+
+    # End def
+
+
+    def _prepare(self, on):
+        """ Stop any pattern; return the value to write to turn the LED 
+           on / off (None if the pin already has the value)
+        """
+        if self.pattern_mode is not None:
+            self._stop_pattern()
+        
+        if on:
+            value = self.on_value
+        else:
+            value = self.off_value
+        
+        if (value == self.value):
+            self.skipped += 1
+            return None
+        
+        return value
+
+    # End def
+
+
+    def _output(self, value):
+        """ Write the value to the pin """
+        self.gpio.output(self.pin, value)
+        
+        self.value   = value
+        self.writes += 1
 
     # End def
 
     
     def on(self):
         """ Turn the LED ON """
-        GPIO.output(self.pin, self.on_value)
+        value = self._prepare(True)
+        
+        if value is not None:
+            self._output(value)
     
     # End def
     
     
     def off(self):
         """ Turn the LED OFF """
-        GPIO.output(self.pin, self.off_value)
+        value = self._prepare(False)
+        
+        if value is not None:
+            self._output(value)
     
     # End def
 
 
+    def get_write_stats(self):
+        """ Return the number of pin writes and skipped writes """
+        return {"writes" : self.writes, "skipped" : self.skipped}
+
+    # End def
+
+
+    def _read_led(self, attribute):
+        """ Read an attribute of the kernel LED """
+        with open(os.path.join(self.led_path, attribute)) as f:
+            return f.read().strip()
+
+    # End def
+
+
+    def _write_led(self, attribute, value):
+        """ Write an attribute of the kernel LED """
+        with open(os.path.join(self.led_path, attribute), "w") as f:
+            f.write(str(value))
+
+    # End def
+
+
+    def blink(self, on_time, off_time=None):
+        """ Blink the LED.
+        
+           Returns:  True  - The kernel blinks the LED
+                     False - A software thread blinks the LED
+        """
+        if off_time is None:
+            off_time = on_time
+        
+        self._stop_pattern()
+        
+        if "timer" in self.led_triggers:
+            # Setting the trigger creates the delay_on / delay_off attributes
+            self._write_led("trigger", "timer")
+            self._write_led("delay_on", int(round(on_time * 1000)))
+            self._write_led("delay_off", int(round(off_time * 1000)))
+            
+            # The kernel drives the pin
+            self.value        = None
+            self.pattern_mode = "kernel"
+            return True
+        
+        self._start_software([(True, on_time), (False, off_time)], -1)
+        
+        return False
+
+    # End def
+
+
+    def pattern(self, steps, repeat=-1):
+        """ Play a list of (on, duration) steps repeat times (-1 forever).
+        
+           Returns:  True  - The kernel plays the pattern
+                     False - A software thread plays the pattern
+        """
+        if not steps:
+            raise ValueError("Pattern has no steps")
+        
+        self._stop_pattern()
+        
+        if "pattern" in self.led_triggers:
+            brightness = self._read_led("max_brightness")
+            values     = []
+            
+            # Pairs of (brightness, time in ms); a zero time entry to the 
+            # same brightness makes each step a step instead of a fade
+            for (on, duration) in steps:
+                if on:
+                    level = brightness
+                else:
+                    level = 0
+                
+                values.extend([level, int(round(duration * 1000)), level, 0])
+            
+            self._write_led("trigger", "pattern")
+            self._write_led("repeat", repeat)
+            self._write_led("pattern", " ".join(str(value) for value in values))
+            
+            # The kernel drives the pin
+            self.value        = None
+            self.pattern_mode = "kernel"
+            return True
+        
+        self._start_software(list(steps), repeat)
+        
+        return False
+
+    # End def
+
+
+    def _start_software(self, steps, repeat):
+        """ Start a thread to play the pattern """
+        self.pattern_stop   = threading.Event()
+        self.pattern_thread = threading.Thread(target=self._run_pattern, 
+                                               args=(steps, repeat, self.pattern_stop))
+        self.pattern_mode   = "software"
+        
+        self.pattern_thread.daemon = True
+        self.pattern_thread.start()
+
+    # End def
+
+
+    def _run_pattern(self, steps, repeat, stop):
+        """ Play the pattern in software (pattern thread) """
+        next_time = time.monotonic()
+        count     = 0
+        
+        while (repeat < 0) or (count < repeat):
+            for (on, duration) in steps:
+                if on:
+                    self._output(self.on_value)
+                else:
+                    self._output(self.off_value)
+                
+                # Wait until the end of the step (no drift over time)
+                next_time += duration
+                
+                if stop.wait(max(0.0, next_time - time.monotonic())):
+                    return
+            
+            count += 1
+
+    # End def
+
+
+    def _stop_pattern(self):
+        """ Stop the kernel / software pattern """
+        if (self.pattern_mode == "kernel"):
+            self._write_led("trigger", "none")
+        elif (self.pattern_mode == "software"):
+            self.pattern_stop.set()
+            
+            if self.pattern_thread is not threading.current_thread():
+                self.pattern_thread.join()
+            
+            self.pattern_thread = None
+            self.pattern_stop   = None
+        
+        self.pattern_mode = None
+
+    # End def
+
+
+    def stop(self):
+        """ Stop blinking / the pattern and turn the LED off """
+        self.off()
+
+    # End def
+
+
     def cleanup(self):
         """ Cleanup the hardware components. """
-        # Turn LED off 
+        # Stop any pattern and turn LED off 
         self.off()
         
     # End def
@@ -151,6 +448,53 @@ class LED():
 # End class
 
 
+class LEDGroup():
+    """ Group of LEDs changed together """
+    leds            = None
+    
+    def __init__(self, leds):
+        """ Initialize variables """
+        self.leds = dict(leds)
+    
+    # End def
+
+
+    def set(self, states):
+        """ Turn LEDs on / off from {name : True / False}; return the 
+           number of LEDs written
+        """
+        changes = []
+        
+        for (name, on) in states.items():
+            led   = self.leds[name]
+            value = led._prepare(on)
+            
+            if value is not None:
+                changes.append((led, value))
+        
+        if not changes:
+            return 0
+        
+        gpio = changes[0][0].gpio
+        
+        # One write per GPIO bank if all LEDs use the same register backend
+        if hasattr(gpio, "output_pins") and all(led.gpio is gpio for (led, value) in changes):
+            gpio.output_pins({led.pin : value for (led, value) in changes})
+            
+            for (led, value) in changes:
+                led.value   = value
+                led.writes += 1
+        else:
+            for (led, value) in changes:
+                led._output(value)
+        
+        return len(changes)
+
+    # End def
+
+# End class
+
+
 
 # ------------------------------------------------------------------------
 # Main script
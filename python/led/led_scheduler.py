@@ -0,0 +1,483 @@
+"""
+--------------------------------------------------------------------------
+LED Scheduler
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+LED Scheduler
+
+  Software PWM brightness, breathing and chase patterns for LEDs on plain 
+GPIO pins, all run by a single scheduler thread (instead of one loop or 
+thread per LED).
+
+  Each LED task computes the time of its next edge.  The scheduler keeps 
+the edges of all tasks in a heap ordered by time, sleeps until the earliest
+one, and then runs every task whose edge is due in the same wakeup.  A 
+new task replaces the task of its LED(s); the replaced task is marked as 
+cancelled and its heap entry is skipped.  Edges are scheduled from the 
+ideal edge times, so the PWM frequency does not drift if the thread wakes 
+up late; whole periods that were missed are skipped.
+
+  LEDs at brightness 0.0 or 1.0 are written once and need no edges.  See 
+led_scheduler_benchmark.py for the achieved frequency, duty cycle error 
+and CPU cost.
+
+Software API:
+
+  LEDScheduler(frequency=100)
+    - Provide the PWM frequency (Hz) used for brightness / breathing
+    
+    set_brightness(led, brightness)
+      - Set the brightness of the LED (0.0 - 1.0)
+    
+    breathe(led, period=2.0)
+      - Fade the LED up and down every period seconds
+    
+    chase(leds, step_time=0.1)
+      - Turn on one LED of the list at a time, moving to the next LED every
+        step_time seconds
+    
+    stop(led)
+      - Stop the task of the LED and turn the LED off
+    
+    get_stats()
+      - Return a dictionary with the number of tasks, wakeups, edges and 
+        the maximum time an edge was late (in seconds)
+    
+    reset_stats()
+      - Reset the number of wakeups / edges and the maximum lateness
+    
+    close()
+      - Stop all tasks (LEDs off) and stop the scheduler thread
+
+"""
+import math
+import time
+import heapq
+import threading
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class Task():
+    """ Scheduled LED task
+    
+        leds      - LEDs driven by the task
+        cancelled - True once the task has been replaced / stopped
+    """
+    leds      = None
+    cancelled = False
+    
+    def __init__(self, leds):
+        """ Initialize variables """
+        self.leds = leds
+    
+    # End def
+
+
+    def run(self, edge_ns, now_ns):
+        """ Update the LEDs for the edge at edge_ns; return the time of the 
+            next edge (None if there are no more edges)
+        """
+        raise NotImplementedError
+
+    # End def
+
+# End class
+
+
+class PWM(Task):
+    """ Software PWM at a fixed duty cycle
+    
+        varying - True if the duty cycle changes over time
+    """
+    period_ns    = None
+    duty         = None
+    period_start = None
+    high         = False
+    varying      = False
+    
+    def __init__(self, led, period_ns, duty):
+        """ Initialize variables """
+        Task.__init__(self, [led])
+        
+        self.period_ns = period_ns
+        self.duty      = duty
+    
+    # End def
+
+
+    def get_duty(self, start_ns):
+        """ Return the duty cycle of the period starting at start_ns """
+        return self.duty
+
+    # End def
+
+
+    def run(self, edge_ns, now_ns):
+        """ Turn the LED on at the start of a period and off after the duty cycle """
+        led = self.leds[0]
+        
+        if self.high:
+            led.off()
+            self.high = False
+            
+            return self.period_start + self.period_ns
+        
+        # Skip whole periods that were missed, keeping the phase
+        edge_ns += ((now_ns - edge_ns) // self.period_ns) * self.period_ns
+        
+        self.period_start = edge_ns
+        duty              = self.get_duty(edge_ns)
+        
+        if (duty <= 0.0):
+            led.off()
+        elif (duty >= 1.0):
+            led.on()
+        else:
+            led.on()
+            self.high = True
+            
+            return edge_ns + int(duty * self.period_ns)
+        
+        # Constant duty cycle:  no more edges
+        if not self.varying:
+            return None
+        
+        return edge_ns + self.period_ns
+
+    # End def
+
+# End class
+
+
+class Breathe(PWM):
+    """ Software PWM with a duty cycle that fades up and down """
+    breathe_ns = None
+    start_ns   = None
+    varying    = True
+    
+    def __init__(self, led, period_ns, breathe_ns, start_ns):
+        """ Initialize variables """
+        PWM.__init__(self, led, period_ns, 0.0)
+        
+        self.breathe_ns = breathe_ns
+        self.start_ns   = start_ns
+    
+    # End def
+
+
+    def get_duty(self, start_ns):
+        """ Return the duty cycle of the period starting at start_ns """
+        phase = ((start_ns - self.start_ns) % self.breathe_ns) / self.breathe_ns
+        
+        # Raised cosine:  0 -> 1 -> 0; squared since the eye is more 
+        # sensitive to changes at low brightness
+        level = 0.5 - (0.5 * math.cos(2.0 * math.pi * phase))
+        
+        return level * level
+
+    # End def
+
+# End class
+
+
+class Chase(Task):
+    """ One LED on at a time, moving along the list """
+    step_ns = None
+    index   = None
+    
+    def __init__(self, leds, step_ns):
+        """ Initialize variables """
+        Task.__init__(self, list(leds))
+        
+        self.step_ns = step_ns
+        self.index   = -1
+    
+    # End def
+
+
+    def run(self, edge_ns, now_ns):
+        """ Move to the next LED """
+        if (self.index >= 0):
+            self.leds[self.index].off()
+        
+        self.index = (self.index + 1) % len(self.leds)
+        self.leds[self.index].on()
+        
+        # Skip whole steps that were missed, keeping the phase
+        edge_ns += ((now_ns - edge_ns) // self.step_ns) * self.step_ns
+        
+        return edge_ns + self.step_ns
+
+    # End def
+
+# End class
+
+
+class LEDScheduler():
+    """ Single thread that runs the LED tasks """
+    period_ns    = None
+    condition    = None
+    heap         = None
+    tasks        = None    # LED -> task
+    sequence     = None    # Orders heap entries with the same time
+    stopped      = None
+    thread       = None
+    
+    wakeups      = None
+    edges        = None
+    max_late_ns  = None
+    
+    def __init__(self, frequency=100):
+        """ Initialize variables; Start the scheduler thread """
+        if (frequency <= 0):
+            raise ValueError("Frequency must be greater than 0")
+        
+        self.period_ns   = int(1e9 / frequency)
+        self.condition   = threading.Condition()
+        self.heap        = []
+        self.tasks       = {}
+        self.sequence    = 0
+        self.stopped     = False
+        
+        self.reset_stats()
+        
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+    
+    # End def
+
+
+    def _cancel(self, leds):
+        """ Cancel the tasks of the LEDs (the lock must be held) """
+        for led in leds:
+            task = self.tasks.pop(led, None)
+            
+            if task is not None:
+                task.cancelled = True
+                
+                # Other LEDs of a chase are turned off and released
+                for other in task.leds:
+                    if other is not led:
+                        self.tasks.pop(other, None)
+                    
+                    other.off()
+
+    # End def
+
+
+    def _add(self, task):
+        """ Replace the tasks of the LEDs with the task; run it now """
+        with self.condition:
+            self._cancel(task.leds)
+            
+            for led in task.leds:
+                self.tasks[led] = task
+            
+            self.sequence += 1
+            heapq.heappush(self.heap, (time.monotonic_ns(), self.sequence, task))
+            
+            self.condition.notify()
+
+    # End def
+
+
+    def set_brightness(self, led, brightness):
+        """ Set the brightness of the LED (0.0 - 1.0) """
+        if (brightness < 0.0) or (brightness > 1.0):
+            raise ValueError("Brightness must be between 0.0 and 1.0")
+        
+        self._add(PWM(led, self.period_ns, brightness))
+
+    # End def
+
+
+    def breathe(self, led, period=2.0):
+        """ Fade the LED up and down every period seconds """
+        if (period <= 0):
+            raise ValueError("Period must be greater than 0")
+        
+        self._add(Breathe(led, self.period_ns, int(period * 1e9), time.monotonic_ns()))
+
+    # End def
+
+
+    def chase(self, leds, step_time=0.1):
+        """ Turn on one LED at a time, moving every step_time seconds """
+        if not leds:
+            raise ValueError("No LEDs provided for chase()")
+        
+        if (step_time <= 0):
+            raise ValueError("Step time must be greater than 0")
+        
+        self._add(Chase(leds, int(step_time * 1e9)))
+
+    # End def
+
+
+    def stop(self, led):
+        """ Stop the task of the LED and turn the LED off """
+        with self.condition:
+            self._cancel([led])
+            
+            led.off()
+
+    # End def
+
+
+    def _run(self):
+        """ Run the tasks until stopped """
+        with self.condition:
+            while not self.stopped:
+                # Remove cancelled tasks
+                while self.heap and self.heap[0][2].cancelled:
+                    heapq.heappop(self.heap)
+                
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                
+                now_ns = time.monotonic_ns()
+                
+                if (self.heap[0][0] > now_ns):
+                    self.condition.wait((self.heap[0][0] - now_ns) / 1e9)
+                    continue
+                
+                self.wakeups += 1
+                
+                # Run every edge that is due
+                while self.heap and (self.heap[0][0] <= now_ns):
+                    (edge_ns, sequence, task) = heapq.heappop(self.heap)
+                    
+                    if task.cancelled:
+                        continue
+                    
+                    self.edges      += 1
+                    self.max_late_ns = max(self.max_late_ns, now_ns - edge_ns)
+                    next_ns          = task.run(edge_ns, now_ns)
+                    
+                    if next_ns is not None:
+                        heapq.heappush(self.heap, (next_ns, sequence, task))
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return the number of tasks, wakeups, edges and the maximum lateness """
+        with self.condition:
+            return {"tasks"    : len(set(self.tasks.values())),
+                    "wakeups"  : self.wakeups,
+                    "edges"    : self.edges,
+                    "max_late" : self.max_late_ns / 1e9}
+
+    # End def
+
+
+    def reset_stats(self):
+        """ Reset the number of wakeups / edges and the maximum lateness """
+        with self.condition:
+            self.wakeups     = 0
+            self.edges       = 0
+            self.max_late_ns = 0
+
+    # End def
+
+
+    def close(self):
+        """ Stop all tasks and the scheduler thread """
+        with self.condition:
+            self._cancel(list(self.tasks))
+            
+            self.stopped = True
+            self.condition.notify_all()
+        
+        self.thread.join()
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import led as LED
+
+    print("LED Scheduler Test")
+    
+    leds      = [LED.LED(pin) for pin in ["P2_2", "P2_4", "P2_6", "P2_8"]]
+    scheduler = LEDScheduler()
+    
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    print("Use Ctrl-C to Exit")
+    
+    try:
+        while True:
+            print("    Brightness 10% / 40% / 70% / 100%")
+            for (led, brightness) in zip(leds, [0.1, 0.4, 0.7, 1.0]):
+                scheduler.set_brightness(led, brightness)
+            time.sleep(3)
+            
+            print("    Breathing")
+            for led in leds:
+                scheduler.breathe(led)
+            time.sleep(4)
+            
+            print("    Chase")
+            scheduler.chase(leds)
+            time.sleep(3)
+            
+            print("    {0}".format(scheduler.get_stats()))
+        
+    except KeyboardInterrupt:
+        pass
+
+    scheduler.close()
+
+    print("Test Complete")
+
@@ -0,0 +1,234 @@
+"""
+--------------------------------------------------------------------------
+LED Scheduler Benchmark
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+LED Scheduler Benchmark
+
+  Measure the software PWM of the LED scheduler as the number of LEDs 
+grows.  LED i of n is set to brightness (i + 1) / (n + 1) and every on / off
+write is timestamped.  For each configuration the benchmark reports:
+  - freq (Hz):    achieved PWM frequency (rising edges per second, mean 
+                  over the LEDs)
+  - duty err:     mean / maximum absolute difference between the measured 
+                  fraction of time on and the brightness
+  - wakeups/s:    scheduler wakeups per second
+  - max late:     maximum time an edge was late (ms)
+  - cpu (%):      process CPU time per second
+
+  "fake" mode (the default) records the writes without any hardware.  
+"hardware" mode drives LED_PINS (at most len(LED_PINS) LEDs).
+
+Usage:
+
+  python3 led_scheduler_benchmark.py [fake | hardware] [seconds]
+
+"""
+import sys
+import time
+
+import led_scheduler as LED_SCHEDULER
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+LED_PINS                    = ["P2_2", "P2_4", "P2_6", "P2_8"]
+
+LED_COUNTS                  = [1, 4, 16, 32, 64]
+FREQUENCY                   = 100
+DEFAULT_SECONDS             = 2.0
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class RecordingLED():
+    """ LED that records the time of each change (optionally drives a real LED) """
+    led      = None
+    state    = None
+    changes  = None
+    
+    def __init__(self, led=None):
+        """ Initialize variables """
+        self.led     = led
+        self.state   = False
+        self.changes = []
+    
+    # End def
+
+
+    def _set(self, state):
+        """ Record a change of the LED """
+        if self.led is not None:
+            if state:
+                self.led.on()
+            else:
+                self.led.off()
+        
+        if (state != self.state):
+            self.state = state
+            self.changes.append((time.monotonic_ns(), state))
+
+    # End def
+
+
+    def on(self):
+        """ Turn the LED ON """
+        self._set(True)
+    
+    # End def
+
+
+    def off(self):
+        """ Turn the LED OFF """
+        self._set(False)
+    
+    # End def
+
+
+    def measure(self, start_ns, end_ns):
+        """ Return the (rising edges, fraction of time on) between start_ns and end_ns """
+        rising  = 0
+        on_ns   = 0
+        state   = False
+        last_ns = start_ns
+        
+        for (change_ns, new_state) in self.changes:
+            if (change_ns <= start_ns):
+                state = new_state
+                continue
+            
+            if (change_ns >= end_ns):
+                break
+            
+            if state:
+                on_ns += change_ns - last_ns
+            
+            if new_state:
+                rising += 1
+            
+            state   = new_state
+            last_ns = change_ns
+        
+        if state:
+            on_ns += end_ns - last_ns
+        
+        return (rising, on_ns / (end_ns - start_ns))
+
+    # End def
+
+# End class
+
+
+def benchmark(count, seconds, hardware):
+    """ Run count LEDs for seconds; print the results """
+    if hardware:
+        import led as LED
+        
+        leds = [RecordingLED(LED.LED(pin)) for pin in LED_PINS[:count]]
+    else:
+        leds = [RecordingLED() for i in range(count)]
+    
+    scheduler   = LED_SCHEDULER.LEDScheduler(FREQUENCY)
+    brightness  = [(i + 1) / (len(leds) + 1) for i in range(len(leds))]
+    
+    for (led, value) in zip(leds, brightness):
+        scheduler.set_brightness(led, value)
+    
+    # Let the scheduler settle, then measure
+    time.sleep(0.2)
+    
+    scheduler.reset_stats()
+    
+    cpu_start   = time.process_time()
+    start_ns    = time.monotonic_ns()
+    
+    time.sleep(seconds)
+    
+    end_ns      = time.monotonic_ns()
+    cpu_end     = time.process_time()
+    stats       = scheduler.get_stats()
+    
+    scheduler.close()
+    
+    elapsed     = (end_ns - start_ns) / 1e9
+    frequencies = []
+    errors      = []
+    
+    for (led, value) in zip(leds, brightness):
+        (rising, duty) = led.measure(start_ns, end_ns)
+        
+        frequencies.append(rising / elapsed)
+        errors.append(abs(duty - value))
+    
+    print("    {0:6d} {1:10.1f} {2:10.4f} {3:10.4f} {4:10.1f} {5:10.2f} {6:8.2f}".format(
+          len(leds), 
+          sum(frequencies) / len(frequencies),
+          sum(errors) / len(errors), max(errors),
+          stats["wakeups"] / elapsed,
+          stats["max_late"] * 1000,
+          100.0 * (cpu_end - cpu_start) / elapsed))
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    seconds  = DEFAULT_SECONDS
+    hardware = False
+    counts   = LED_COUNTS
+    
+    if (len(sys.argv) > 2):
+        seconds = float(sys.argv[2])
+    
+    if ((len(sys.argv) > 1) and (sys.argv[1] == "hardware")):
+        hardware = True
+        counts   = [count for count in LED_COUNTS if count <= len(LED_PINS)]
+    
+    print("LED Scheduler Benchmark ({0} Hz PWM)".format(FREQUENCY))
+    print("    {0:>6s} {1:>10s} {2:>10s} {3:>10s} {4:>10s} {5:>10s} {6:>8s}".format(
+          "leds", "freq (Hz)", "duty err", "(max)", "wakeups/s", "late (ms)", "cpu (%)"))
+    
+    for count in counts:
+        benchmark(count, seconds, hardware)
+    
+    print("Benchmark Complete")
+
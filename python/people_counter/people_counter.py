@@ -47,6 +47,7 @@ import Adafruit_BBIO.GPIO as GPIO
 
 import ht16k33 as HT16K33
 import button as BUTTON
+import gesture as GESTURE
 
 
 # ------------------------------------------------------------------------
@@ -69,13 +70,18 @@ class PeopleCounter():
     """ People Counter """
     reset_time = None
     button     = None
+    gestures   = None
     display    = None
     
     def __init__(self, reset_time=2.0, button="P2_2", i2c_bus=1, i2c_address=0x70):
         """ Initialize variables and set up display """
         self.reset_time = reset_time
         self.button     = BUTTON.Button(button)
-        self.display    = HT16K33.HT16K33(i2c_bus, i2c_address)
+        # Every click counts right away; the reset happens once the button
+        # has been held for reset_time (not when it is released)
+        self.gestures   = GESTURE.GestureRecognizer(self.button, long_press_time=reset_time, max_clicks=1)
+        self.display    = HT16K33.HT16K33(i2c_bus, i2c_address, asynchronous=True, lazy=True,
+                                          state_file=HT16K33.HT16K33_STATE_FILE)
         
         self._setup()
     
@@ -94,21 +100,21 @@ class PeopleCounter():
     def run(self):
         """Execute the main program."""
         people_count                 = 0        # Number of people to be displayed
-        button_press_time            = 0.0      # Time button was pressed (in seconds)
         
         while(1):
-            # Wait for button press / release
-            self.button.wait_for_press()
-            # Get the press time
-            button_press_time = self.button.get_last_press_duration()
-            # Compare time to increment or reset people_count
-            if (button_press_time < self.reset_time):
+            # Wait for a click or a long press
+            gesture = self.gestures.wait_for_gesture()
+            # Increment or reset people_count
+            if (gesture.kind == GESTURE.CLICK):
                 if (people_count < HT16K33.HT16K33_MAX_VALUE):
                     people_count += 1
                 else:
                     people_count = 0
-            else:
+            elif (gesture.kind == GESTURE.LONG_PRESS):
                 people_count = 0
+            else:
+                # Release after a long press
+                continue
             # Update the display
             self.display.update(people_count)
     # End def
@@ -120,6 +126,9 @@ class PeopleCounter():
         # Set Display to something unique to show program is complete
         self.display.text("DEAD")
         
+        # Wait for the display to be written
+        self.display.close()
+        
         # Button does not need any cleanup code
         
     # End def
@@ -33,17 +33,43 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 SG90 Servo Driver
 
+  turn() moves the servo straight to the position.  turn_to() moves the 
+servo smoothly following a motion profile (see servo_motion.py) and returns
+right away with a concurrent.futures.Future that is done when the move 
+has finished.  The moves of all servos are run by one shared update 
+thread.  Duty cycle writes that would not change the duty cycle (at 
+DUTY_RESOLUTION) are skipped.
+
 API:
-  Servo(pin)
+  Servo(pin, default_position=0, pwm=None)
     - Provide pin that the Servo is connected
+    - Optionally provide the PWM module (default Adafruit_BBIO.PWM), e.g. 
+      SimulatedPWM() from servo_motion.py for testing
   
     turn(percentage)
       -   0 = Fully clockwise
       - 100 = Fully anti-clockwise
+      - Stops any move started by turn_to()
+    
+    turn_to(percentage, speed=DEFAULT_SPEED, profile=TRAPEZOID, acceleration=None)
+      - Move to the position at speed (% / s) following the profile 
+        (TRAPEZOID or S_CURVE); acceleration is in % / s^2 (trapezoid only)
+      - Returns a Future; its result is True when the servo reached the 
+        position, False if the move was replaced or stopped
+      - Function consumes no time
+    
+    stop()
+      - Stop a move started by turn_to() where the servo is
+    
+    get_write_stats()
+      - Return a dictionary with the number of duty cycle writes and of 
+        writes skipped because the duty cycle did not change
 
 """
 import Adafruit_BBIO.PWM as PWM
 
+import servo_motion as MOTION
+
 # ------------------------------------------------------------------------
 # Constants
 # ------------------------------------------------------------------------
@@ -53,6 +79,12 @@ SG90_POL                = 0                   # Rising Edge polarity
 SG90_MIN_DUTY           = 5                   # 1ms pulse (5% duty cycle)  -- Fully clockwise (right)
 SG90_MAX_DUTY           = 10                  # 2ms pulse (10% duty cycle) -- Fully anti-clockwise (left)
 
+DUTY_RESOLUTION         = 3                   # Decimal places of the duty cycle (0.001% = 0.2us)
+DEFAULT_SPEED           = 100                 # % / s
+
+TRAPEZOID               = MOTION.TRAPEZOID
+S_CURVE                 = MOTION.S_CURVE
+
 # ------------------------------------------------------------------------
 # Global variables
 # ------------------------------------------------------------------------
@@ -65,10 +97,15 @@ SG90_MAX_DUTY           = 10                  # 2ms pulse (10% duty cycle) -- Fu
 
 class Servo():
     """ CombinationLock """
-    pin       = None
-    position  = None
+    pin         = None
+    position    = None
+    pwm         = None
+    duty_cycle  = None
+    writes      = None
+    skipped     = None
+    updater     = None
     
-    def __init__(self, pin=None, default_position=0):
+    def __init__(self, pin=None, default_position=0, pwm=None):
         """ Initialize variables and set up the Servo """
         if (pin == None):
             raise ValueError("Pin not provided for Servo()")
@@ -76,6 +113,13 @@ class Servo():
             self.pin = pin
 
         self.position = default_position
+        self.writes   = 0
+        self.skipped  = 0
+        
+        if pwm is None:
+            self.pwm = PWM
+        else:
+            self.pwm = pwm
         
         self._setup(default_position)
     
@@ -85,7 +129,9 @@ class Servo():
     def _setup(self, default_position):
         """Setup the hardware components."""
         # Initialize Servo; Servo should be in default position
-        PWM.start(self.pin, self._duty_cycle_from_position(default_position), frequency=SG90_FREQ, polarity=SG90_POL)
+        self.duty_cycle = self._duty_cycle_from_position(default_position)
+        
+        self.pwm.start(self.pin, self.duty_cycle, frequency=SG90_FREQ, polarity=SG90_POL)
         
         # !!! NEED TO IMPLEMENT !!! #
         # !!! NEED TO IMPLEMENT !!! #
@@ -98,7 +144,9 @@ class Servo():
     
     def _duty_cycle_from_position(self, position):
         """ Return the duty cycle to set the provided position """
-        return ((SG90_MAX_DUTY - SG90_MIN_DUTY) * (position / 100)) + SG90_MIN_DUTY    
+        duty_cycle = ((SG90_MAX_DUTY - SG90_MIN_DUTY) * (position / 100)) + SG90_MIN_DUTY    
+        
+        return round(duty_cycle, DUTY_RESOLUTION)
         
     # End def
     
@@ -110,27 +158,74 @@ class Servo():
     # End def
     
 
+    def _write_position(self, position):
+        """ Record the position; set the duty cycle if it changed """
+        # Record the current position
+        self.position = position
+        
+        # Set PWM duty cycle based on position
+        duty_cycle = self._duty_cycle_from_position(position)
+        
+        if (duty_cycle == self.duty_cycle):
+            self.skipped += 1
+            return
+        
+        self.pwm.set_duty_cycle(self.pin, duty_cycle)
+        
+        self.duty_cycle  = duty_cycle
+        self.writes     += 1
+
+    # End def
+
+
     def turn(self, position):
         """ Turn Servo to the desired position based on percentage of motion range
         
               0% = Fully clockwise (right)
             100% = Fully anti-clockwise (left)      
         """
-        # Record the current position
-        self.position = position
+        self.stop()
         
-        # Set PWM duty cycle based on position
-        duty_cycle = self._duty_cycle_from_position(position)
+        self._write_position(position)
+    # End def
+
+
+    def turn_to(self, position, speed=DEFAULT_SPEED, profile=TRAPEZOID, acceleration=None):
+        """ Move the Servo to the position following the motion profile; 
+            return a Future that is done when the move has finished
+        """
+        if self.updater is None:
+            self.updater = MOTION.get_updater()
+        
+        motion = MOTION.make_profile(profile, position - self.position, speed, acceleration)
         
-        PWM.set_duty_cycle(self.pin, duty_cycle)
+        return self.updater.move(self, position, motion)
+    
+    # End def
+
+
+    def stop(self):
+        """ Stop a move started by turn_to() """
+        if self.updater is not None:
+            self.updater.stop(self)
+    
+    # End def
+
+
+    def get_write_stats(self):
+        """ Return the number of duty cycle writes and skipped writes """
+        return {"writes" : self.writes, "skipped" : self.skipped}
+    
     # End def
 
 
     def cleanup(self):
         """Cleanup the hardware components."""
         # Stop servo
-        PWM.stop(self.pin)
-        PWM.cleanup()
+        self.stop()
+        
+        self.pwm.stop(self.pin)
+        self.pwm.cleanup()
         
     # End def
 
@@ -163,6 +258,12 @@ if __name__ == '__main__':
             servo.turn(100)
             print("Current position = {0}%".format(servo.get_position()))
             time.sleep(1)
+            
+            # Move smoothly back and forth
+            for profile in [TRAPEZOID, S_CURVE]:
+                servo.turn_to(0, speed=100, profile=profile).result()
+                servo.turn_to(100, speed=100, profile=profile).result()
+                print("Current position = {0}% ({1})".format(servo.get_position(), profile))
         
     except KeyboardInterrupt:
         pass
@@ -0,0 +1,249 @@
+"""
+--------------------------------------------------------------------------
+Servo Coordinator
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Servo Coordinator
+
+  Move several servos together (e.g. an arm, or the bolts of a lock) so 
+that they all arrive at the same time.  The coordinator plans each move 
+with the motion profile (see servo_motion.py), takes the longest of the 
+move durations, and slows the other moves down to take the same time.  
+All moves are then started with the same start time on one MotionUpdater,
+whose single thread writes the duty cycles of all the servos in the same 
+tick.  No thread is created per servo.
+
+Software API:
+
+  ServoCoordinator(servos, updater=None)
+    - Provide a dictionary of {name : Servo}
+    - Optionally provide the MotionUpdater (default:  the shared updater)
+    
+    move(positions, speed=DEFAULT_SPEED, profile=TRAPEZOID, acceleration=None)
+      - Move servos to positions from a dictionary of {name : position}; 
+        the servo that has furthest to go moves at speed and the other 
+        servos arrive at the same time
+      - Returns a Future; its result is True when all the servos reached 
+        their positions, False if any move was replaced or stopped
+      - Function consumes no time
+    
+    turn(positions)
+      - Stop the moves and turn servos straight to the positions from a 
+        dictionary of {name : position}
+    
+    get_positions()
+      - Return a dictionary of {name : position}
+    
+    stop()
+      - Stop all moves where the servos are
+    
+    cleanup()
+      - Stop all moves and clean up the servos
+
+"""
+import threading
+import concurrent.futures
+
+import servo        as SERVO
+import servo_motion as MOTION
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DEFAULT_SPEED           = SERVO.DEFAULT_SPEED
+TRAPEZOID               = MOTION.TRAPEZOID
+S_CURVE                 = MOTION.S_CURVE
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def _combine_futures(futures):
+    """ Return a Future that is done when all of the futures are done; its
+        result is True if all of the results are True
+    """
+    combined  = concurrent.futures.Future()
+    remaining = [len(futures)]
+    lock      = threading.Lock()
+    
+    combined.set_running_or_notify_cancel()
+    
+    if not futures:
+        combined.set_result(True)
+        return combined
+    
+    def done(future):
+        with lock:
+            remaining[0] -= 1
+            finished      = (remaining[0] == 0)
+        
+        if finished:
+            combined.set_result(all(future.result() for future in futures))
+    # End def
+    
+    for future in futures:
+        future.add_done_callback(done)
+    
+    return combined
+
+# End def
+
+
+class ServoCoordinator():
+    """ Synchronized moves of many servos """
+    servos      = None
+    updater     = None
+    
+    def __init__(self, servos, updater=None):
+        """ Initialize variables """
+        self.servos = dict(servos)
+        
+        if updater is None:
+            self.updater = MOTION.get_updater()
+        else:
+            self.updater = updater
+        
+        # Servos stop their moves on this updater (e.g. in turn())
+        for servo in self.servos.values():
+            servo.updater = self.updater
+    
+    # End def
+
+
+    def move(self, positions, speed=DEFAULT_SPEED, profile=TRAPEZOID, acceleration=None):
+        """ Move the servos so they arrive at the same time; return a Future """
+        plans = []
+        
+        # Plan each move; the longest move sets the duration
+        for (name, position) in positions.items():
+            servo    = self.servos[name]
+            distance = position - servo.get_position()
+            motion   = MOTION.make_profile(profile, distance, speed, acceleration)
+            
+            plans.append((servo, position, distance, motion))
+        
+        duration = max([motion.duration for (servo, position, distance, motion) in plans] + [0.0])
+        moves    = []
+        
+        for (servo, position, distance, motion) in plans:
+            if (motion.duration < duration):
+                motion = MOTION.make_profile(profile, distance, speed, acceleration, duration)
+            
+            moves.append((servo, position, motion))
+        
+        return _combine_futures(self.updater.move_group(moves))
+
+    # End def
+
+
+    def turn(self, positions):
+        """ Turn the servos straight to the positions """
+        for (name, position) in positions.items():
+            self.servos[name].turn(position)
+
+    # End def
+
+
+    def get_positions(self):
+        """ Return the position of each servo """
+        return {name : servo.get_position() for (name, servo) in self.servos.items()}
+
+    # End def
+
+
+    def stop(self):
+        """ Stop all moves where the servos are """
+        for servo in self.servos.values():
+            self.updater.stop(servo)
+
+    # End def
+
+
+    def cleanup(self):
+        """ Stop all moves and clean up the servos """
+        for servo in self.servos.values():
+            servo.cleanup()
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    print("Servo Coordinator Test")
+
+    # Use "sim" to run without servos
+    if ((len(sys.argv) > 1) and (sys.argv[1] == "sim")):
+        pwm = MOTION.SimulatedPWM()
+    else:
+        pwm = None
+
+    servos      = {"base"  : SERVO.Servo("P1_36", pwm=pwm), 
+                   "elbow" : SERVO.Servo("P2_1", pwm=pwm)}
+    coordinator = ServoCoordinator(servos)
+
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    print("Use Ctrl-C to Exit")
+    
+    try:
+        for i in range(3):
+            for (positions, profile) in [({"base" : 100, "elbow" : 25}, TRAPEZOID),
+                                         ({"base" : 0,   "elbow" : 75}, S_CURVE)]:
+                start = time.monotonic()
+                
+                coordinator.move(positions, speed=100, profile=profile).result()
+                
+                print("    {0} in {1:.2f} s ({2})".format(coordinator.get_positions(), 
+                                                        time.monotonic() - start, profile))
+        
+    except KeyboardInterrupt:
+        pass
+
+    # Clean up hardware when exiting
+    coordinator.cleanup()
+
+    print("Test Complete")
+
@@ -0,0 +1,537 @@
+"""
+--------------------------------------------------------------------------
+Servo Motion
+--------------------------------------------------------------------------
+License:   
+Copyright 2024 - Mina Schepmann
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Servo Motion
+
+  Motion profiles and a shared update thread for smooth, non-blocking servo
+moves (see Servo.turn_to() in servo.py).  Instead of jumping to the target 
+(which causes current spikes and mechanical shock), a move follows a 
+motion profile:
+  - TRAPEZOID:  accelerate at a constant rate up to the speed, move at the
+                speed, then decelerate (shorter moves never reach the 
+                speed)
+  - S_CURVE:    minimum jerk move (position follows 10u^3 - 15u^4 + 6u^5),
+                so the acceleration also changes smoothly; the duration is
+                chosen so that the peak speed is the speed
+
+  A single MotionUpdater thread runs the moves of all servos.  It wakes up 
+at a fixed rate (by default the 50 Hz servo PWM rate, since the servo only
+sees a new duty cycle once per pulse) with absolute deadlines so the rate 
+does not drift, computes the position of every active move and writes it 
+to the servo.  The servo skips duty cycle writes that do not change the 
+duty cycle.  The thread sleeps while no move is active.
+
+  Each move has a concurrent.futures.Future whose result is True when the 
+servo reached the target, or False if the move was replaced by another 
+move or stopped.
+
+  SimulatedPWM can be used in place of Adafruit_BBIO.PWM to test servos
+without hardware; it records every duty cycle write.
+
+Software API:
+
+  TrapezoidProfile(distance, speed, acceleration, duration=None)
+  SCurveProfile(distance, speed, duration=None)
+    - Profile of a move of distance (%) at speed (% / s) (and acceleration
+      in % / s^2); if a duration is provided (at least the minimum 
+      duration), the move is slowed down to take the duration
+    
+    duration
+      - Duration of the move in seconds
+    
+    fraction(t)
+      - Return the fraction of the distance moved at time t (0.0 - 1.0)
+
+  make_profile(profile, distance, speed, acceleration=None, duration=None)
+    - Return the profile object for the profile name (TRAPEZOID / S_CURVE)
+
+  MotionUpdater(rate=UPDATE_RATE)
+    - Provide the number of updates per second
+    
+    move(servo, position, profile)
+      - Move the servo to position (%) following the profile; return a 
+        Future
+    
+    move_group(moves)
+      - Start a list of (servo, position, profile) moves at the same time;
+        return the list of Futures
+    
+    stop(servo)
+      - Stop the move of the servo where it is
+    
+    get_stats()
+      - Return a dictionary with the number of active moves, ticks and 
+        the maximum time a tick was late (in seconds)
+    
+    close()
+      - Stop all moves and the update thread
+
+  get_updater()
+    - Return the shared MotionUpdater (created when first used)
+
+  SimulatedPWM()
+    - start(pin, duty, frequency, polarity) / set_duty_cycle(pin, duty) / 
+      stop(pin) / cleanup() as Adafruit_BBIO.PWM
+    - duty[pin] is the current duty cycle; writes is a list of 
+      (time.monotonic_ns(), pin, duty) of every write
+
+"""
+import math
+import time
+import threading
+import concurrent.futures
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+TRAPEZOID             = "trapezoid"
+S_CURVE               = "s-curve"
+
+UPDATE_RATE           = 50                    # Updates per second
+
+# Peak speed of the minimum jerk profile is 1.875 * distance / duration
+S_CURVE_PEAK          = 1.875
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+_updater      = None
+_updater_lock = threading.Lock()
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class TrapezoidProfile():
+    """ Constant acceleration, constant speed, constant deceleration """
+    duration     = None
+    speed        = None
+    acceleration = None
+    ramp_time    = None
+    distance     = None
+    
+    def __init__(self, distance, speed, acceleration, duration=None):
+        """ Initialize variables """
+        if (speed <= 0) or (acceleration <= 0):
+            raise ValueError("Speed and acceleration must be greater than 0")
+        
+        distance = abs(distance)
+        
+        # Shorter moves never reach the speed (triangle profile)
+        if (distance < speed * speed / acceleration):
+            speed = math.sqrt(distance * acceleration)
+        
+        min_duration = (speed / acceleration)
+        
+        if (speed > 0):
+            min_duration += distance / speed
+        
+        # Slow down to take the duration:  distance = speed * (duration - speed / acceleration)
+        if (duration is not None) and (duration > min_duration):
+            root  = (acceleration * duration) ** 2 - (4 * acceleration * distance)
+            speed = ((acceleration * duration) - math.sqrt(max(0.0, root))) / 2
+        else:
+            duration = min_duration
+        
+        self.distance     = distance
+        self.speed        = speed
+        self.acceleration = acceleration
+        self.ramp_time    = speed / acceleration
+        self.duration     = duration
+    
+    # End def
+
+
+    def fraction(self, t):
+        """ Return the fraction of the distance moved at time t """
+        if (t >= self.duration) or (self.distance == 0):
+            return 1.0
+        
+        if (t <= 0):
+            return 0.0
+        
+        a = self.acceleration
+        
+        if (t < self.ramp_time):
+            moved = 0.5 * a * t * t
+        elif (t < self.duration - self.ramp_time):
+            moved = (0.5 * a * self.ramp_time * self.ramp_time) + (self.speed * (t - self.ramp_time))
+        else:
+            remaining = self.duration - t
+            moved     = self.distance - (0.5 * a * remaining * remaining)
+        
+        return min(1.0, moved / self.distance)
+
+    # End def
+
+# End class
+
+
+class SCurveProfile():
+    """ Minimum jerk (smooth acceleration) profile """
+    duration     = None
+    
+    def __init__(self, distance, speed, duration=None):
+        """ Initialize variables """
+        if (speed <= 0):
+            raise ValueError("Speed must be greater than 0")
+        
+        min_duration = S_CURVE_PEAK * abs(distance) / speed
+        
+        if (duration is not None) and (duration > min_duration):
+            self.duration = duration
+        else:
+            self.duration = min_duration
+    
+    # End def
+
+
+    def fraction(self, t):
+        """ Return the fraction of the distance moved at time t """
+        if (t >= self.duration):
+            return 1.0
+        
+        if (t <= 0):
+            return 0.0
+        
+        u = t / self.duration
+        
+        return u * u * u * (10 - (15 * u) + (6 * u * u))
+
+    # End def
+
+# End class
+
+
+def make_profile(profile, distance, speed, acceleration=None, duration=None):
+    """ Return the profile object for the profile name """
+    if (profile == TRAPEZOID):
+        # By default reach the speed in 1/4 second
+        if acceleration is None:
+            acceleration = 4 * speed
+        
+        return TrapezoidProfile(distance, speed, acceleration, duration)
+    
+    if (profile == S_CURVE):
+        return SCurveProfile(distance, speed, duration)
+    
+    raise ValueError("Unknown profile: {0}".format(profile))
+
+# End def
+
+
+class Move():
+    """ Active move of a servo """
+    servo     = None
+    start     = None
+    target    = None
+    profile   = None
+    start_ns  = None
+    future    = None
+    
+    def __init__(self, servo, target, profile, start_ns):
+        """ Initialize variables """
+        self.servo    = servo
+        self.start    = servo.get_position()
+        self.target   = target
+        self.profile  = profile
+        self.start_ns = start_ns
+        self.future   = concurrent.futures.Future()
+        
+        self.future.set_running_or_notify_cancel()
+    
+    # End def
+
+
+    def position(self, now_ns):
+        """ Return the position at time now_ns """
+        fraction = self.profile.fraction((now_ns - self.start_ns) / 1e9)
+        
+        return self.start + ((self.target - self.start) * fraction)
+
+    # End def
+
+
+    def done(self, now_ns):
+        """ Has the move finished at time now_ns? """
+        return (now_ns - self.start_ns) >= (self.profile.duration * 1e9)
+
+    # End def
+
+# End class
+
+
+class MotionUpdater():
+    """ Single thread that runs the moves of all servos """
+    period_ns    = None
+    condition    = None
+    moves        = None    # servo -> Move
+    stopped      = None
+    thread       = None
+    
+    ticks        = None
+    max_late_ns  = None
+    
+    def __init__(self, rate=UPDATE_RATE):
+        """ Initialize variables; Start the update thread """
+        if (rate <= 0):
+            raise ValueError("Rate must be greater than 0")
+        
+        self.period_ns   = int(1e9 / rate)
+        self.condition   = threading.Condition()
+        self.moves       = {}
+        self.stopped     = False
+        self.ticks       = 0
+        self.max_late_ns = 0
+        
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+    
+    # End def
+
+
+    def _end(self, servo, reached):
+        """ Remove the move of the servo (the lock must be held) """
+        move = self.moves.pop(servo, None)
+        
+        if move is not None:
+            move.future.set_result(reached)
+
+    # End def
+
+
+    def move_group(self, moves):
+        """ Start a list of (servo, position, profile) moves together; 
+            return the list of Futures
+        """
+        futures = []
+        
+        with self.condition:
+            if self.stopped:
+                raise RuntimeError("MotionUpdater is closed")
+            
+            start_ns = time.monotonic_ns()
+            
+            for (servo, position, profile) in moves:
+                # A new move replaces the current move of the servo
+                self._end(servo, False)
+                
+                move = Move(servo, position, profile, start_ns)
+                
+                self.moves[servo] = move
+                futures.append(move.future)
+            
+            self.condition.notify()
+        
+        return futures
+
+    # End def
+
+
+    def move(self, servo, position, profile):
+        """ Move the servo to position following the profile; return a Future """
+        return self.move_group([(servo, position, profile)])[0]
+
+    # End def
+
+
+    def stop(self, servo):
+        """ Stop the move of the servo where it is """
+        with self.condition:
+            self._end(servo, False)
+
+    # End def
+
+
+    def _run(self):
+        """ Update the moves at a fixed rate until stopped """
+        next_ns = None
+        
+        with self.condition:
+            while not self.stopped:
+                if not self.moves:
+                    next_ns = None
+                    self.condition.wait()
+                    continue
+                
+                now_ns = time.monotonic_ns()
+                
+                if next_ns is None:
+                    next_ns = now_ns
+                
+                if (next_ns > now_ns):
+                    self.condition.wait((next_ns - now_ns) / 1e9)
+                    continue
+                
+                self.ticks      += 1
+                self.max_late_ns = max(self.max_late_ns, now_ns - next_ns)
+                
+                # Update every servo in one pass
+                for (servo, move) in list(self.moves.items()):
+                    if move.done(now_ns):
+                        servo._write_position(move.target)
+                        self._end(servo, True)
+                    else:
+                        servo._write_position(move.position(now_ns))
+                
+                # Skip ticks that were missed
+                next_ns += self.period_ns
+                
+                if (next_ns <= now_ns):
+                    next_ns = now_ns + self.period_ns
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return the number of moves, ticks and the maximum lateness """
+        with self.condition:
+            return {"moves"    : len(self.moves),
+                    "ticks"    : self.ticks,
+                    "max_late" : self.max_late_ns / 1e9}
+
+    # End def
+
+
+    def close(self):
+        """ Stop all moves and the update thread """
+        with self.condition:
+            for servo in list(self.moves):
+                self._end(servo, False)
+            
+            self.stopped = True
+            self.condition.notify_all()
+        
+        self.thread.join()
+
+    # End def
+
+# End class
+
+
+def get_updater():
+    """ Return the shared MotionUpdater """
+    global _updater
+    
+    with _updater_lock:
+        if _updater is None:
+            _updater = MotionUpdater()
+        
+        return _updater
+
+# End def
+
+
+class SimulatedPWM():
+    """ Stand-in for Adafruit_BBIO.PWM that records the duty cycle writes """
+    duty      = None
+    frequency = None
+    writes    = None
+    
+    def __init__(self):
+        """ Initialize variables """
+        self.duty      = {}
+        self.frequency = {}
+        self.writes    = []
+    
+    # End def
+
+
+    def _write(self, pin, duty):
+        """ Record a duty cycle write """
+        self.duty[pin] = duty
+        self.writes.append((time.monotonic_ns(), pin, duty))
+
+    # End def
+
+
+    def start(self, pin, duty, frequency=2000, polarity=0):
+        """ Start PWM on the pin """
+        self.frequency[pin] = frequency
+        self._write(pin, duty)
+
+    # End def
+
+
+    def set_duty_cycle(self, pin, duty):
+        """ Set the duty cycle of the pin """
+        if pin not in self.duty:
+            raise RuntimeError("PWM not started on {0}".format(pin))
+        
+        self._write(pin, duty)
+
+    # End def
+
+
+    def stop(self, pin):
+        """ Stop PWM on the pin """
+        self.duty.pop(pin, None)
+
+    # End def
+
+
+    def cleanup(self):
+        """ Stop PWM on all pins """
+        self.duty.clear()
+
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print("Servo Motion Profile Test:  0% -> 100% at 100% / s")
+    
+    profiles = [make_profile(TRAPEZOID, 100, 100), make_profile(S_CURVE, 100, 100)]
+    
+    for (name, profile) in zip([TRAPEZOID, S_CURVE], profiles):
+        print("    {0:10s} duration = {1:.3f} s".format(name, profile.duration))
+    
+    print("    {0:>6s} {1:>10s} {2:>10s}".format("t (s)", TRAPEZOID, S_CURVE))
+    
+    for i in range(0, 23):
+        t = i * 0.1
+        
+        print("    {0:6.1f} {1:10.1f} {2:10.1f}".format(t, 100 * profiles[0].fraction(t), 100 * profiles[1].fraction(t)))
+    
+    print("Test Complete")
+